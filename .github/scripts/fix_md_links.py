@@ -2,81 +2,547 @@
 """
 Fix markdown links to use .html extension and add base URL prefix.
 This script is used during GitHub Pages deployment to ensure internal links work correctly.
+
+Markdown links [text](url) and HTML <a href="url"> attributes are rewritten
+in one scan of each file. Both rewrites only ever turn a trailing '.md' of
+a link path into '.html', so the scan collects the positions of those
+suffixes for both kinds of link on the original text and applies them in
+one go. This gives the same bytes as rewriting markdown links first and
+HTML links second.
+
+A manifest records the size, modification time and digest of every file
+after it was rewritten. The rewrite is idempotent, so a file whose size
+and modification time still match is skipped without being read, and a
+file whose content still matches the digest is skipped without being
+rewritten. Pass --jobs N to rewrite files across N processes.
+
+With --check, every internal link is validated after the rewrite against
+an index of the site built in the same walk: the heading anchors of every
+markdown page and every published file, images included. Broken links are
+reported with their line numbers.
 """
 
+import os
 import re
+import sys
+import json
+import time
+import bisect
+import hashlib
+import argparse
+import posixpath
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Directories left out of the site, as in _config.yml; names starting with '.' are skipped too.
+# utils/moral_landscape/process_moral_landscapes.py applies the same rule.
+EXCLUDED_DIRS = ('_site', 'node_modules', 'utils', 'vendor')
+
+# Markdown link [text](url); group 2 is the URL
+MARKDOWN_LINK = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+
+# HTML anchor <a ... href="url" ...>; group 2 is the URL
+HTML_LINK = re.compile(r'(<a\s+[^>]*href=")([^"]+)("(?:[^>]*)>)')
+
+# Positions where either kind of link can start
+LINK_START = re.compile(r'\[|<a\s')
+
+# External links (http://, https://, mailto:, etc.)
+URL_SCHEME = re.compile(r'[a-zA-Z][a-zA-Z0-9+.-]*:')
+
+# Default manifest location; Jekyll does not publish dotfiles
+DEFAULT_MANIFEST = '.link-manifest.json'
+MANIFEST_VERSION = 1
+
+# ATX heading, optionally ending in closing hashes and a kramdown {#id}
+ATX_HEADING = re.compile(r'^ {0,3}#{1,6}[ \t]+(.*?)(?:[ \t]+#+)?[ \t]*$')
+SETEXT_UNDERLINE = re.compile(r'^ {0,3}(=+|-+)[ \t]*$')
+HEADING_ID = re.compile(r'[ \t]*\{#([^}\s]+)\}$')
+FENCE = re.compile(r'^ {0,3}(`{3,}|~{3,})')
+
+# Explicit HTML anchors, e.g. <a name="x"> or <div id="x">
+HTML_ANCHOR = re.compile(r'<[a-zA-Z][^>]*?\s(?:id|name)="([^"]+)"')
+
+# Unicode categories kept in heading slugs (\p{Word} in kramdown's GFM parser)
+SLUG_CATEGORIES = ('L', 'M', 'Nd', 'Nl', 'Pc')
+
+# Pages served for a directory URL
+DIRECTORY_INDEXES = ('index.md', 'index.html', 'README.md')
 
-def fix_links_in_file(file_path):
-    """Replace .md links with .html and add / base URL prefix."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+
+def is_excluded(name):
+    """Check whether a directory or file name is left out of the site."""
+    return name.startswith('.') or name in EXCLUDED_DIRS
+
+
+def find_markdown_files(root='.', site_files=None):
+    """
+    Yield markdown files below root, pruning excluded directories during the walk.
     
-    original_content = content
+    Args:
+        root: Directory to search
+        site_files: Optional set that receives the '/'-separated path of
+            every file found in the same walk, for build_link_index()
     
-    def process_url(url):
-        """Process a URL to replace .md with .html and add / prefix."""
-        # Skip external links (http://, https://, mailto:, etc.)
-        if re.match(r'^[a-zA-Z][a-zA-Z0-9+.-]*:', url):
-            return url
-        
-        # Skip pure anchors
-        if url.startswith('#'):
-            return url
+    Yields:
+        Paths of markdown files relative to root
+    """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not is_excluded(d))
+        base = Path(os.path.relpath(dirpath, root))
+        for filename in sorted(filenames):
+            if is_excluded(filename):
+                continue
+            if site_files is not None:
+                site_files.add((base / filename).as_posix())
+            if filename.endswith('.md'):
+                yield base / filename
+
+
+def md_suffix_position(content, start, end):
+    """
+    Find the '.md' suffix a link URL should lose.
+    
+    Args:
+        content: Text containing the URL
+        start, end: Span of the URL in content
+    
+    Returns:
+        Index of the '.md' to replace with '.html', or None if the URL is
+        external, a pure anchor, or does not point at a markdown file
+    """
+    if content.startswith('#', start, end) or URL_SCHEME.match(content, start, end):
+        return None
+    
+    # Ignore the anchor (e.g., Argumentation.md#-descriptive)
+    anchor = content.find('#', start, end)
+    path_end = end if anchor == -1 else anchor
+    
+    if path_end - start >= 3 and content.startswith('.md', path_end - 3, path_end):
+        return path_end - 3
+    return None
+
+
+def iter_links(content):
+    """
+    Yield markdown links and HTML anchors in the order they appear.
+    
+    Markdown links do not overlap one another and neither do HTML anchors,
+    as with re.sub(), but a markdown link may contain an HTML anchor or the
+    other way round.
+    
+    Args:
+        content: Markdown text
+    
+    Yields:
+        Match objects of MARKDOWN_LINK or HTML_LINK; group 2 is the URL
+    """
+    markdown_next = 0
+    html_next = 0
+    
+    for start in LINK_START.finditer(content):
+        position = start.start()
+        if content[position] == '[':
+            if position < markdown_next:
+                continue
+            match = MARKDOWN_LINK.match(content, position)
+            if match:
+                markdown_next = match.end()
+                yield match
+        else:
+            if position < html_next:
+                continue
+            match = HTML_LINK.match(content, position)
+            if match:
+                html_next = match.end()
+                yield match
+
+
+def rewrite_links(content):
+    """
+    Replace .md links with .html in markdown links and HTML anchors.
+    
+    Args:
+        content: Markdown text
+    
+    Returns:
+        Tuple of (rewritten text, number of links found, number of links changed)
+    """
+    edits = set()
+    links = 0
+    
+    for match in iter_links(content):
+        links += 1
+        suffix = md_suffix_position(content, match.start(2), match.end(2))
+        if suffix is not None:
+            edits.add(suffix)
+    
+    if not edits:
+        return content, links, 0
+    
+    parts = []
+    last = 0
+    for suffix in sorted(edits):
+        parts.append(content[last:suffix])
+        parts.append('.html')
+        last = suffix + 3
+    parts.append(content[last:])
+    return ''.join(parts), links, len(edits)
+
+
+def heading_slug(text):
+    """
+    Generate the anchor kramdown's GFM parser gives a heading.
+    
+    Args:
+        text: Raw heading text
+    
+    Returns:
+        Lowercase text with everything but word characters, hyphens and
+        spaces removed, and spaces turned into hyphens
+    """
+    kept = [c for c in text.lower()
+            if c in '- ' or unicodedata.category(c).startswith(SLUG_CATEGORIES)]
+    return ''.join(kept).replace(' ', '-')
+
+
+def heading_anchors(content):
+    """
+    Collect the anchors a markdown page defines.
+    
+    Args:
+        content: Markdown text
+    
+    Returns:
+        Set of heading slugs (numbered like kramdown when repeated),
+        explicit {#id} heading ids and HTML id/name attributes
+    """
+    anchors = set(HTML_ANCHOR.findall(content))
+    counts = {}
+    fence = None
+    previous = ''
+    for line in content.split('\n'):
+        # Headings inside fenced code blocks are not headings
+        opening = FENCE.match(line)
+        if fence is not None:
+            if opening and opening.group(1)[0] == fence[0] and len(opening.group(1)) >= len(fence):
+                fence = None
+            previous = ''
+            continue
+        if opening:
+            fence = opening.group(1)
+            previous = ''
+            continue
         
-        # Handle URLs with anchors (e.g., Argumentation.md#-descriptive)
-        anchor = ''
-        if '#' in url:
-            url, anchor = url.split('#', 1)
-            anchor = '#' + anchor
+        heading = ATX_HEADING.match(line)
+        if heading:
+            text = heading.group(1)
+        elif previous.strip() and SETEXT_UNDERLINE.match(line):
+            text = previous.strip()
+        else:
+            previous = line
+            continue
+        previous = ''
         
-        # Replace .md with .html
-        if url.endswith('.md'):
-            url = url[:-3] + '.html'
+        explicit = HEADING_ID.search(text)
+        if explicit:
+            anchors.add(explicit.group(1))
+            continue
+        slug = heading_slug(text)
+        count = counts.get(slug, -1) + 1
+        counts[slug] = count
+        anchors.add(f"{slug}-{count}" if count else slug)
+    return anchors
+
+
+def read_pages(md_files):
+    """
+    Read markdown files for check_links().
+    
+    Args:
+        md_files: Markdown files of the site
+    
+    Returns:
+        Dict mapping each page's '/'-separated path to its text
+    """
+    texts = {}
+    for md_file in md_files:
+        with open(md_file, 'r', encoding='utf-8') as f:
+            texts[Path(md_file).as_posix()] = f.read()
+    return texts
+
+
+def build_link_index(texts, site_files):
+    """
+    Build the site index that links are validated against.
+    
+    Args:
+        texts: Dict mapping each page's '/'-separated path to its text
+        site_files: '/'-separated paths of every published file
+    
+    Returns:
+        Tuple of (dict mapping each page to its anchor set, set of directories)
+    """
+    anchors = {page: heading_anchors(content) for page, content in texts.items()}
+    
+    directories = {''}
+    for path in site_files:
+        parent = posixpath.dirname(path)
+        while parent not in directories:
+            directories.add(parent)
+            parent = posixpath.dirname(parent)
+    return anchors, directories
+
+
+def check_link(url, page, anchors, site_files, directories):
+    """
+    Check one rewritten link against the site index.
+    
+    Args:
+        url: Link URL after the rewrite
+        page: '/'-separated path of the page containing the link
+        anchors: Page anchors from build_link_index()
+        site_files: '/'-separated paths of every published file
+        directories: Directories from build_link_index()
+    
+    Returns:
+        Reason the link is broken, or None if it resolves
+    """
+    if not url or URL_SCHEME.match(url):
+        return None
+    
+    path, _, fragment = url.partition('#')
+    path = path.split('?', 1)[0]
+    
+    if not path:
+        target = page
+    else:
+        if path.startswith('/'):
+            target = posixpath.normpath(path.lstrip('/') or '.')
+        else:
+            target = posixpath.normpath(posixpath.join(posixpath.dirname(page), path))
+        if target == '.':
+            target = ''
+        if target == '..' or target.startswith('../'):
+            return 'points outside the site'
         
-        return url + anchor
-    
-    def replace_markdown_link(match):
-        text = match.group(1)
-        url = match.group(2)
-        processed_url = process_url(url)
-        return f'[{text}]({processed_url})'
-    
-    def replace_html_link(match):
-        before = match.group(1)  # Everything before the URL (includes opening quote)
-        url = match.group(2)
-        after = match.group(3)  # Everything after the URL (includes closing quote)
-        processed_url = process_url(url)
-        return f'{before}{processed_url}{after}'
-    
-    # Replace all markdown links [text](url)
-    content = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', replace_markdown_link, content)
-    
-    # Replace all HTML anchor href attributes
-    content = re.sub(r'(<a\s+[^>]*href=")([^"]+)("(?:[^>]*)>)', replace_html_link, content)
-    
-    if content != original_content:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        print(f'✓ Fixed links in: {file_path}')
+        if target.endswith('.html') and target[:-5] + '.md' in anchors:
+            target = target[:-5] + '.md'
+        elif target in directories:
+            for index in DIRECTORY_INDEXES:
+                candidate = posixpath.join(target, index) if target else index
+                if candidate in site_files:
+                    target = candidate
+                    break
+            else:
+                return 'directory has no index page'
+        elif target not in site_files:
+            return 'no such page' if target.endswith('.html') else 'no such file'
+    
+    if fragment and target in anchors and fragment not in anchors[target]:
+        return f"no anchor '#{fragment}' in {target}"
+    return None
+
+
+def check_links(texts, site_files):
+    """
+    Validate every internal link of the site and report broken ones.
+    
+    Args:
+        texts: Dict mapping each page's '/'-separated path to its text, as
+            left by the rewrite
+        site_files: '/'-separated paths of every published file
+    
+    Returns:
+        Tuple of (number of links checked, number of broken links)
+    """
+    anchors, directories = build_link_index(texts, site_files)
+    
+    checked = broken = 0
+    for page, content in texts.items():
+        line_starts = None
+        for match in iter_links(content):
+            checked += 1
+            url = match.group(2)
+            reason = check_link(url, page, anchors, site_files, directories)
+            if reason is None:
+                continue
+            if line_starts is None:
+                line_starts = [0] + [m.end() for m in re.finditer('\n', content)]
+            line = bisect.bisect_right(line_starts, match.start(2))
+            print(f"{page}:{line}: broken link '{url}': {reason}")
+            broken += 1
+    return checked, broken
+
+
+def fix_links_in_file(file_path, known_digest=None):
+    """
+    Replace .md links with .html and add / base URL prefix.
+    
+    Args:
+        file_path: Markdown file to rewrite in place
+        known_digest: Digest of the file after its last rewrite, if any
+    
+    Returns:
+        Dict with 'path', 'links', 'changed', 'skipped', 'ms' and the
+        'size', 'mtime_ns' and 'digest' of the file as left on disk
+    """
+    start = time.perf_counter()
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    
+    links = changed = 0
+    skipped = digest == known_digest
+    if not skipped:
+        # Decode like open(..., 'r') so line endings are handled as before
+        content = raw.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        new_content, links, changed = rewrite_links(content)
+        if changed:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(new_content)
+            with open(file_path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+    
+    stat = os.stat(file_path)
+    return {
+        'path': str(file_path),
+        'links': links,
+        'changed': changed,
+        'skipped': skipped,
+        'ms': (time.perf_counter() - start) * 1000,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'digest': digest
+    }
+
+
+def _fix_links_worker(task):
+    """Process pool entry point for fix_links_in_file()."""
+    return fix_links_in_file(*task)
+
+
+def load_manifest(path):
+    """
+    Load the manifest of previously rewritten files.
+    
+    Args:
+        path: Manifest file, or None to run without one
+    
+    Returns:
+        Dict mapping file paths to their 'size', 'mtime_ns' and 'digest'
+    """
+    if path is None or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Warning: ignoring unreadable manifest {path}: {e}")
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('files', {})
+
+
+def save_manifest(path, entries):
+    """
+    Write the manifest atomically.
+    
+    Args:
+        path: Manifest file
+        entries: Dict mapping file paths to their 'size', 'mtime_ns' and 'digest'
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'files': entries}, f, indent=1, sort_keys=True)
+        f.write('\n')
+    os.replace(temp_path, path)
+
+
+def report(result):
+    """Print the outcome for one file."""
+    if result['changed']:
+        print(f"✓ Fixed links in: {result['path']} ({result['changed']}/{result['links']} links, {result['ms']:.1f} ms)")
+    elif result['skipped']:
+        print(f"  Already rewritten: {result['path']} ({result['ms']:.1f} ms)")
     else:
-        print(f'  No changes needed: {file_path}')
+        print(f"  No changes needed: {result['path']} ({result['links']} links, {result['ms']:.1f} ms)")
 
 
 def main():
     """Process all markdown files in the repository."""
+    parser = argparse.ArgumentParser(description="Replace .md links with .html for GitHub Pages.")
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of processes rewriting files (default: 1)')
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST,
+                        help=f'Manifest of rewritten files (default: {DEFAULT_MANIFEST})')
+    parser.add_argument('--no-manifest', action='store_true',
+                        help='Process every file and do not read or write a manifest')
+    parser.add_argument('--check', action='store_true',
+                        help='Validate every internal link and heading anchor after rewriting')
+    parser.add_argument('--strict', action='store_true',
+                        help='With --check, exit with status 1 if any link is broken')
+    args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    manifest_path = None if args.no_manifest else args.manifest
+    
     print("Fixing markdown links for GitHub Pages...")
     
-    # Process all markdown files
-    for md_file in Path('.').rglob('*.md'):
-        # Skip excluded directories
-        if any(part in str(md_file) for part in ['_site', 'node_modules', '.github', 'utils', 'vendor']):
-            continue
-        fix_links_in_file(md_file)
+    start = time.perf_counter()
+    manifest = load_manifest(manifest_path)
+    entries = {}
+    tasks = []
+    scanned = skipped = 0
+    site_files = set()
+    md_files = []
+    for md_file in find_markdown_files('.', site_files):
+        md_files.append(md_file)
+        scanned += 1
+        key = str(md_file)
+        known = manifest.get(key)
+        if known:
+            # Unchanged since the last rewrite: skip without reading
+            stat = os.stat(md_file)
+            if stat.st_size == known['size'] and stat.st_mtime_ns == known['mtime_ns']:
+                entries[key] = known
+                skipped += 1
+                continue
+        tasks.append((md_file, known['digest'] if known else None))
+    
+    if args.jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(tasks))) as pool:
+            chunksize = max(1, len(tasks) // (args.jobs * 4))
+            results = list(pool.map(_fix_links_worker, tasks, chunksize=chunksize))
+    else:
+        results = [fix_links_in_file(*task) for task in tasks]
+    
+    rewritten = links_changed = 0
+    for result in results:
+        report(result)
+        skipped += result['skipped']
+        rewritten += bool(result['changed'])
+        links_changed += result['changed']
+        entries[result['path']] = {key: result[key] for key in ('size', 'mtime_ns', 'digest')}
+    
+    if manifest_path is not None:
+        save_manifest(manifest_path, entries)
+    
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"\nDone! {scanned} files scanned, {skipped} skipped, {rewritten} rewritten, "
+          f"{links_changed} links changed in {elapsed_ms:.1f} ms")
     
-    print("\nDone!")
+    if args.check:
+        start = time.perf_counter()
+        checked, broken = check_links(read_pages(md_files), site_files)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"Checked {checked} links in {len(md_files)} files: {broken} broken ({elapsed_ms:.1f} ms)")
+        if broken and args.strict:
+            return 1
+    return 0
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
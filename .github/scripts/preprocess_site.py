@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Preprocess the site for GitHub Pages in one pass over the markdown files.
+
+This runs the deploy steps that used to walk the tree separately as
+in-memory stages over each file:
+
+    landscapes  render stale moral landscape blocks and add missing image tags
+    links       replace .md links with .html (see fix_md_links.py)
+
+Every markdown file is found in one walk, read once and written at most
+once. Orphaned images are deleted afterwards, and with --check every link
+is validated against the site. The time spent in each stage is reported.
+
+With --shard-dir, images rendered by `process_moral_landscapes.py --shard K/N`
+runs are taken from the shard outputs instead of being rendered here.
+
+Usage:
+    python3 .github/scripts/preprocess_site.py [--check] [--strict] [--render-mode MODE] [--shard-dir DIR]
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / 'utils' / 'moral_landscape'))
+
+import fix_md_links
+from landscape_options import PLOT_MODES
+from process_moral_landscapes import MoralLandscapeProcessor
+
+# Stages in the order their timings are reported
+STAGES = ('walk', 'read', 'landscapes', 'links', 'write', 'cleanup', 'check')
+
+
+def refresh_images(site_files, images_dir):
+    """
+    Replace the images of a site file set with what is on disk now.
+    
+    Args:
+        site_files: '/'-separated paths of every published file
+        images_dir: Images directory, relative to the site root
+    
+    Returns:
+        The updated set, including images rendered or deleted in this run
+    """
+    prefix = Path(images_dir).as_posix() + '/'
+    site_files = {path for path in site_files if not path.startswith(prefix)}
+    if os.path.isdir(images_dir):
+        with os.scandir(images_dir) as entries:
+            site_files.update(prefix + entry.name for entry in entries
+                              if entry.is_file() and not fix_md_links.is_excluded(entry.name))
+    return site_files
+
+
+def main():
+    """Preprocess every markdown file of the site."""
+    parser = argparse.ArgumentParser(description="Render moral landscapes and fix links for GitHub Pages.")
+    parser.add_argument('--check', action='store_true',
+                        help='Validate every internal link and heading anchor afterwards')
+    parser.add_argument('--strict', action='store_true',
+                        help='With --check, exit with status 1 if any link is broken')
+    parser.add_argument('--render-mode', choices=list(PLOT_MODES), default=None,
+                        help="Force every still image to this plot mode (default: each block's render.mode)")
+    parser.add_argument('--shard-dir', default=None,
+                        help='Use the images rendered by --shard runs of process_moral_landscapes.py in this directory')
+    args = parser.parse_args()
+    
+    timings = dict.fromkeys(STAGES, 0.0)
+    
+    def timed(stage, func, *func_args):
+        start = time.perf_counter()
+        result = func(*func_args)
+        timings[stage] += time.perf_counter() - start
+        return result
+    
+    processor = MoralLandscapeProcessor(images_dir="images")
+    processor.render_mode = args.render_mode
+    shard_renders = None
+    if args.shard_dir:
+        try:
+            shard_renders = processor.load_shard_renders(args.shard_dir)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+    
+    site_files = set()
+    md_files = timed('walk', lambda: list(fix_md_links.find_markdown_files('.', site_files)))
+    print(f"Found {len(md_files)} markdown file(s)")
+    
+    texts = {}
+    referenced_images = set()
+    modified_count = links_changed = 0
+    for md_file in md_files:
+        print(f"\nProcessing {md_file}...")
+        
+        def read():
+            with open(md_file, 'r', encoding='utf-8') as f:
+                return f.read()
+        content = timed('read', read)
+        
+        def landscapes(text):
+            referenced_images.update(processor.collect_referenced_images(md_file, text))
+            rendered_images = None
+            if shard_renders is not None:
+                rendered_images = processor.shard_rendered_images(text, shard_renders)
+            return processor.update_landscape_tags(md_file, text, rendered_images)
+        new_content = timed('landscapes', landscapes, content)
+        
+        new_content, links, changed = timed('links', fix_md_links.rewrite_links, new_content)
+        if changed:
+            print(f"  ✓ Fixed {changed}/{links} links")
+        links_changed += changed
+        
+        if new_content != content:
+            def write():
+                with open(md_file, 'w', encoding='utf-8') as f:
+                    f.write(new_content)
+            timed('write', write)
+            modified_count += 1
+            print(f"  ✓ File updated")
+        texts[md_file.as_posix()] = new_content
+    
+    print(f"\n{'='*50}")
+    print("Checking for orphaned images...")
+    deleted_count = timed('cleanup', processor.cleanup_orphaned_images, referenced_images)
+    processor.save_render_timings()
+    if deleted_count > 0:
+        print(f"Deleted {deleted_count} orphaned image(s)")
+    else:
+        print("No orphaned images found")
+    
+    broken = 0
+    if args.check:
+        def check():
+            return fix_md_links.check_links(texts, refresh_images(site_files, processor.images_dir))
+        checked, broken = timed('check', check)
+        print(f"Checked {checked} links: {broken} broken")
+    
+    print(f"\n{'='*50}")
+    print(f"Preprocessing complete!")
+    print(f"Modified {modified_count} file(s), {links_changed} link(s) rewritten")
+    for stage in STAGES:
+        if stage != 'check' or args.check:
+            print(f"  {stage:<11}{timings[stage] * 1000:9.1f} ms")
+    print(f"  {'total':<11}{sum(timings.values()) * 1000:9.1f} ms")
+    print(f"{'='*50}")
+    
+    return 1 if broken and args.strict else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
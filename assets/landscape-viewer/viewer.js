@@ -0,0 +1,276 @@
+/*
+ * Moral landscape viewer.
+ *
+ * Loads a <name>.mesh.json payload written by utils/moral_landscape/landscape_web.py,
+ * decodes its uint16 height buffer and draws the surface, labels and actions
+ * with WebGL. The camera uses Matplotlib's elevation/azimuth convention so the
+ * initial view matches the static image.
+ */
+(function () {
+    'use strict';
+
+    // Matplotlib's default 3D box aspect is 4:4:3
+    var BOX = [1, 1, 0.75];
+
+    var canvas = document.getElementById('canvas');
+    var stage = document.getElementById('stage');
+    var gl = canvas.getContext('webgl', { antialias: true });
+    if (!gl || !gl.getExtension('OES_element_index_uint')) {
+        stage.textContent = 'This viewer needs WebGL.';
+        return;
+    }
+
+    function compile(vertexSource, fragmentSource) {
+        var program = gl.createProgram();
+        [[gl.VERTEX_SHADER, vertexSource], [gl.FRAGMENT_SHADER, fragmentSource]].forEach(function (pair) {
+            var shader = gl.createShader(pair[0]);
+            gl.shaderSource(shader, pair[1]);
+            gl.compileShader(shader);
+            gl.attachShader(program, shader);
+        });
+        gl.linkProgram(program);
+        return program;
+    }
+
+    var surfaceProgram = compile(
+        'attribute vec3 position; attribute vec3 normal; attribute vec3 color;' +
+        'uniform mat4 matrix; varying vec3 vColor; varying vec3 vNormal;' +
+        'void main() { gl_Position = matrix * vec4(position, 1.0); vColor = color; vNormal = normal; }',
+        'precision mediump float; varying vec3 vColor; varying vec3 vNormal; uniform vec3 light;' +
+        'void main() { float shade = 0.55 + 0.45 * abs(dot(normalize(vNormal), light));' +
+        ' gl_FragColor = vec4(vColor * shade, 1.0); }'
+    );
+    var lineProgram = compile(
+        'attribute vec3 position; attribute vec4 color; uniform mat4 matrix; varying vec4 vColor;' +
+        'void main() { gl_Position = matrix * vec4(position, 1.0); vColor = color; }',
+        'precision mediump float; varying vec4 vColor; void main() { gl_FragColor = vColor; }'
+    );
+
+    function hexToRgb(hex) {
+        var value = parseInt(hex.slice(1), 16);
+        return [(value >> 16 & 255) / 255, (value >> 8 & 255) / 255, (value & 255) / 255];
+    }
+
+    function buffer(target, data) {
+        var handle = gl.createBuffer();
+        gl.bindBuffer(target, handle);
+        gl.bufferData(target, data, gl.STATIC_DRAW);
+        return handle;
+    }
+
+    // Column-major 4x4 matrix helpers
+    function perspective(fovy, aspect, near, far) {
+        var f = 1 / Math.tan(fovy / 2), nf = 1 / (near - far);
+        return [f / aspect, 0, 0, 0, 0, f, 0, 0, 0, 0, (far + near) * nf, -1, 0, 0, 2 * far * near * nf, 0];
+    }
+
+    function lookAt(eye, up) {
+        var z = normalize(eye), x = normalize(cross(up, z)), y = cross(z, x);
+        return [x[0], y[0], z[0], 0, x[1], y[1], z[1], 0, x[2], y[2], z[2], 0,
+                -dot(x, eye), -dot(y, eye), -dot(z, eye), 1];
+    }
+
+    function multiply(a, b) {
+        var out = new Array(16);
+        for (var col = 0; col < 4; col++) {
+            for (var row = 0; row < 4; row++) {
+                var sum = 0;
+                for (var k = 0; k < 4; k++) sum += a[k * 4 + row] * b[col * 4 + k];
+                out[col * 4 + row] = sum;
+            }
+        }
+        return out;
+    }
+
+    function cross(a, b) { return [a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0]]; }
+    function dot(a, b) { return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]; }
+    function normalize(v) { var n = Math.hypot(v[0], v[1], v[2]) || 1; return [v[0] / n, v[1] / n, v[2] / n]; }
+
+    function load(meta, heightBuffer) {
+        var rows = meta.shape[0], cols = meta.shape[1];
+        var xr = meta.x_range, yr = meta.y_range, zr = meta.z_range;
+        var quantized = new Uint16Array(heightBuffer);
+        var stops = meta.colormap.map(hexToRgb);
+
+        // Data coordinates to the normalized box
+        function toBox(x, y, z) {
+            return [
+                BOX[0] * (2 * (x - xr[0]) / (xr[1] - xr[0]) - 1),
+                BOX[1] * (2 * (y - yr[0]) / (yr[1] - yr[0]) - 1),
+                BOX[2] * (2 * (z - zr[0]) / ((zr[1] - zr[0]) || 1) - 1)
+            ];
+        }
+
+        var count = rows * cols;
+        var positions = new Float32Array(count * 3), colors = new Float32Array(count * 3), normals = new Float32Array(count * 3);
+        for (var i = 0; i < count; i++) {
+            var t = quantized[i] / 65535;
+            positions[i * 3] = BOX[0] * (2 * (i % cols) / (cols - 1) - 1);
+            positions[i * 3 + 1] = BOX[1] * (2 * Math.floor(i / cols) / (rows - 1) - 1);
+            positions[i * 3 + 2] = BOX[2] * (2 * t - 1);
+            var s = t * (stops.length - 1), lo = Math.floor(s), hi = Math.min(lo + 1, stops.length - 1), f = s - lo;
+            for (var c = 0; c < 3; c++) colors[i * 3 + c] = stops[lo][c] * (1 - f) + stops[hi][c] * f;
+        }
+        for (var r = 0; r < rows; r++) {
+            for (var q = 0; q < cols; q++) {
+                var left = r * cols + Math.max(q - 1, 0), right = r * cols + Math.min(q + 1, cols - 1);
+                var down = Math.max(r - 1, 0) * cols + q, up = Math.min(r + 1, rows - 1) * cols + q;
+                var dx = [positions[right * 3] - positions[left * 3], 0, positions[right * 3 + 2] - positions[left * 3 + 2]];
+                var dy = [0, positions[up * 3 + 1] - positions[down * 3 + 1], positions[up * 3 + 2] - positions[down * 3 + 2]];
+                var n = normalize(cross(dx, dy)), index = (r * cols + q) * 3;
+                normals[index] = n[0]; normals[index + 1] = n[1]; normals[index + 2] = n[2];
+            }
+        }
+        var indices = new Uint32Array((rows - 1) * (cols - 1) * 6), k = 0;
+        for (r = 0; r < rows - 1; r++) {
+            for (q = 0; q < cols - 1; q++) {
+                var a = r * cols + q;
+                indices.set([a, a + 1, a + cols, a + 1, a + cols + 1, a + cols], k);
+                k += 6;
+            }
+        }
+
+        // Action polylines (dashed ones drawn as alternating segments) and label leader lines
+        var lineVertices = [];
+        function addLine(from, to, rgba) {
+            lineVertices.push.apply(lineVertices, from.concat(rgba, to, rgba));
+        }
+        meta.actions.forEach(function (action) {
+            var rgba = hexToRgb(action.color).concat([action.alpha]);
+            var points = action.points.map(function (p) { return toBox(p[0], p[1], p[2]); });
+            var segment = 0;
+            for (var j = 0; j < points.length - 1; j++) {
+                var steps = action.dashed ? 16 : 1;
+                for (var m = 0; m < steps; m++, segment++) {
+                    if (action.dashed && segment % 2) continue;
+                    var from = [], to = [];
+                    for (var d = 0; d < 3; d++) {
+                        from.push(points[j][d] + (points[j + 1][d] - points[j][d]) * m / steps);
+                        to.push(points[j][d] + (points[j + 1][d] - points[j][d]) * (m + 1) / steps);
+                    }
+                    addLine(from, to, rgba);
+                }
+            }
+        });
+        meta.labels.forEach(function (label) {
+            addLine(toBox.apply(null, label.position), toBox.apply(null, label.point), hexToRgb(label.color).concat([1]));
+        });
+
+        var overlays = [];
+        function overlay(className, text, color, point) {
+            var element = document.createElement('div');
+            element.className = className;
+            element.textContent = text;
+            element.style.borderColor = color;
+            if (className === 'marker') element.style.color = color;
+            stage.appendChild(element);
+            overlays.push({ element: element, point: point });
+        }
+        meta.labels.forEach(function (label) {
+            overlay('marker', '★', label.marker, toBox.apply(null, label.point));
+            overlay('label', label.text, label.color, toBox.apply(null, label.position));
+        });
+        meta.actions.forEach(function (action) {
+            var middle = action.points[Math.floor(action.points.length / 2)];
+            overlay('action', action.text, action.color, toBox(middle[0], middle[1], middle[2] + 0.5));
+        });
+        document.getElementById('title').textContent = meta.title || '';
+
+        var surface = {
+            position: buffer(gl.ARRAY_BUFFER, positions),
+            normal: buffer(gl.ARRAY_BUFFER, normals),
+            color: buffer(gl.ARRAY_BUFFER, colors),
+            index: buffer(gl.ELEMENT_ARRAY_BUFFER, indices),
+            count: indices.length
+        };
+        var lines = { vertices: buffer(gl.ARRAY_BUFFER, new Float32Array(lineVertices)), count: lineVertices.length / 7 };
+
+        var camera = { elevation: meta.view.elevation, azimuth: meta.view.azimuth, distance: 4.2 };
+
+        function attribute(program, name, handle, size, stride, offset) {
+            var location = gl.getAttribLocation(program, name);
+            gl.bindBuffer(gl.ARRAY_BUFFER, handle);
+            gl.enableVertexAttribArray(location);
+            gl.vertexAttribPointer(location, size, gl.FLOAT, false, stride || 0, offset || 0);
+        }
+
+        function draw() {
+            var width = stage.clientWidth, height = stage.clientHeight, ratio = window.devicePixelRatio || 1;
+            canvas.width = width * ratio;
+            canvas.height = height * ratio;
+            gl.viewport(0, 0, canvas.width, canvas.height);
+            gl.clearColor(1, 1, 1, 1);
+            gl.clear(gl.COLOR_BUFFER_BIT | gl.DEPTH_BUFFER_BIT);
+            gl.enable(gl.DEPTH_TEST);
+            gl.enable(gl.BLEND);
+            gl.blendFunc(gl.SRC_ALPHA, gl.ONE_MINUS_SRC_ALPHA);
+
+            var el = camera.elevation * Math.PI / 180, az = camera.azimuth * Math.PI / 180;
+            var eye = [Math.cos(el) * Math.cos(az), Math.cos(el) * Math.sin(az), Math.sin(el)].map(function (v) {
+                return v * camera.distance;
+            });
+            var matrix = multiply(perspective(Math.PI / 5, width / height, 0.1, 50), lookAt(eye, [0, 0, 1]));
+
+            gl.useProgram(surfaceProgram);
+            gl.uniformMatrix4fv(gl.getUniformLocation(surfaceProgram, 'matrix'), false, matrix);
+            gl.uniform3fv(gl.getUniformLocation(surfaceProgram, 'light'), normalize([0.3, -0.4, 1]));
+            attribute(surfaceProgram, 'position', surface.position, 3);
+            attribute(surfaceProgram, 'normal', surface.normal, 3);
+            attribute(surfaceProgram, 'color', surface.color, 3);
+            gl.bindBuffer(gl.ELEMENT_ARRAY_BUFFER, surface.index);
+            gl.drawElements(gl.TRIANGLES, surface.count, gl.UNSIGNED_INT, 0);
+
+            // Lines and labels stay visible through the surface, as in the static render
+            gl.disable(gl.DEPTH_TEST);
+            gl.useProgram(lineProgram);
+            gl.uniformMatrix4fv(gl.getUniformLocation(lineProgram, 'matrix'), false, matrix);
+            attribute(lineProgram, 'position', lines.vertices, 3, 28, 0);
+            attribute(lineProgram, 'color', lines.vertices, 4, 28, 12);
+            gl.drawArrays(gl.LINES, 0, lines.count);
+
+            overlays.forEach(function (item) {
+                var p = item.point;
+                var clip = [0, 1, 2, 3].map(function (row) {
+                    return matrix[row] * p[0] + matrix[4 + row] * p[1] + matrix[8 + row] * p[2] + matrix[12 + row];
+                });
+                item.element.style.left = ((clip[0] / clip[3] + 1) / 2 * width) + 'px';
+                item.element.style.top = ((1 - clip[1] / clip[3]) / 2 * height) + 'px';
+            });
+        }
+
+        var drag = null;
+        stage.addEventListener('pointerdown', function (event) {
+            drag = { x: event.clientX, y: event.clientY };
+            stage.setPointerCapture(event.pointerId);
+        });
+        stage.addEventListener('pointermove', function (event) {
+            if (!drag) return;
+            camera.azimuth -= (event.clientX - drag.x) * 0.4;
+            camera.elevation = Math.max(-89, Math.min(89, camera.elevation + (event.clientY - drag.y) * 0.4));
+            drag = { x: event.clientX, y: event.clientY };
+            requestAnimationFrame(draw);
+        });
+        stage.addEventListener('pointerup', function () { drag = null; });
+        stage.addEventListener('wheel', function (event) {
+            event.preventDefault();
+            camera.distance = Math.max(1.5, Math.min(12, camera.distance * Math.exp(event.deltaY * 0.001)));
+            requestAnimationFrame(draw);
+        }, { passive: false });
+        window.addEventListener('resize', function () { requestAnimationFrame(draw); });
+        draw();
+    }
+
+    var src = new URLSearchParams(window.location.search).get('src');
+    if (!src) {
+        stage.textContent = 'Pass a landscape with ?src=/images/<name>.mesh.json';
+        return;
+    }
+    var metaUrl = new URL(src, window.location.href);
+    fetch(metaUrl).then(function (response) { return response.json(); }).then(function (meta) {
+        return fetch(new URL(meta.heights, metaUrl)).then(function (response) {
+            return response.arrayBuffer();
+        }).then(function (heights) { load(meta, heights); });
+    }).catch(function (error) {
+        stage.textContent = 'Could not load landscape: ' + error;
+    });
+})();
@@ -0,0 +1,108 @@
+"""
+Byte-budgeted LRU cache for NumPy arrays.
+
+Used to memoize grids, surfaces and noise fields across renders within one
+process. Cached arrays are made read-only so shared values cannot be
+modified in place by callers.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple, Union
+
+import numpy as np
+
+
+CacheValue = Union[np.ndarray, Tuple[np.ndarray, ...]]
+
+
+class ArrayCache:
+    """Thread-safe LRU cache of arrays (or tuples of arrays) bounded by total bytes."""
+    
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_bytes: Total size of cached arrays before least recently used
+                entries are evicted. Values larger than this are not cached.
+        """
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Tuple[CacheValue, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[CacheValue]:
+        """
+        Look up a cached value, counting a hit or a miss.
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value or None if not present
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key: Hashable, value: CacheValue) -> CacheValue:
+        """
+        Store a value, evicting least recently used entries to stay in budget.
+        
+        Args:
+            key: Cache key
+            value: Array or tuple of arrays; made read-only in place
+            
+        Returns:
+            The stored value, for convenient chaining
+        """
+        arrays = value if isinstance(value, tuple) else (value,)
+        for array in arrays:
+            array.flags.writeable = False
+        size = sum(array.nbytes for array in arrays)
+        if size > self.max_bytes:
+            return value
+        
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+        return value
+    
+    def clear(self) -> None:
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dictionary with entries, bytes, max_bytes, hits, misses and evictions
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
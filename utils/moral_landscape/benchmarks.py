@@ -0,0 +1,442 @@
+"""
+Benchmarks for the moral landscape renderer.
+
+Usage:
+    python benchmarks.py noise [--resolutions 150 500 1000] [--repeat 5]
+    python benchmarks.py cache [--resolution 400] [--repeat 3]
+    python benchmarks.py animation [--frames 36] [--dpis 60 80 100] [--jobs 1 4]
+    python benchmarks.py svg [--resolutions 100 150] [--noise-levels 0 0.1] [--repeat 3]
+    python benchmarks.py modes [--resolutions 100 200] [--repeat 3]
+    python benchmarks.py tiles [--dpis 300 600 900] [--tile-memory 64]
+    python benchmarks.py grid [--resolutions 2000 4000] [--features 40]
+    python benchmarks.py features [--counts 10 100 500] [--repeat 5]
+"""
+
+import io
+import gc
+import sys
+import time
+import tempfile
+import argparse
+import multiprocessing
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import landscape_noise
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    """
+    Time a function, returning the best of several runs.
+    
+    Args:
+        func: Function to time
+        repeat: Number of runs
+        
+    Returns:
+        Fastest run time in seconds
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def proc_status(field: str) -> int:
+    """Read a memory field of /proc/self/status (Linux only), in bytes."""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field + ':'):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError(f"{field} not found in /proc/self/status")
+
+
+def peak_rss_growth(func: Callable[[], object]) -> Tuple[float, object]:
+    """
+    Run a function and measure how far it raises the peak resident set size.
+    
+    The peak is reset through /proc/self/clear_refs first, so this only
+    works on Linux.
+    
+    Args:
+        func: Function to run
+        
+    Returns:
+        Tuple of (peak RSS above the RSS before the call in bytes, the function's result)
+    """
+    gc.collect()
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+    before = proc_status('VmRSS')
+    result = func()
+    return proc_status('VmHWM') - before, result
+
+
+def print_table(headers: List[str], rows: List[List[str]]) -> None:
+    """Print rows as a left-aligned text table."""
+    widths = [max(len(str(cell)) for cell in column) for column in zip(headers, *rows)]
+    for row in [headers, ['-' * w for w in widths]] + rows:
+        print('  '.join(str(cell).ljust(w) for cell, w in zip(row, widths)))
+
+
+def bench_noise(args: argparse.Namespace) -> None:
+    """Compare the legacy randn path with the seeded and smooth noise engines."""
+    rows = []
+    for resolution in args.resolutions:
+        shape = (resolution, resolution)
+        
+        def cold(noise_type):
+            landscape_noise.NOISE_CACHE.clear()
+            landscape_noise.LATTICE_CACHE.clear()
+            return landscape_noise.noise_field(shape, 1, noise_type)
+        
+        timings = {
+            'randn (float64)': best_time(lambda: np.random.randn(*shape), args.repeat),
+            'white (float32)': best_time(lambda: cold('white'), args.repeat),
+            'value (float32)': best_time(lambda: cold('value'), args.repeat),
+            'cached': best_time(lambda: landscape_noise.noise_field(shape, 1, 'value'), args.repeat),
+        }
+        for name, seconds in timings.items():
+            rows.append([
+                f"{resolution}x{resolution}",
+                name,
+                f"{seconds * 1000:.3f}",
+                f"{seconds * 1e9 / (resolution * resolution):.2f}",
+            ])
+    print_table(['grid', 'noise', 'ms', 'ns/pixel'], rows)
+
+
+def bench_cache(args: argparse.Namespace) -> None:
+    """Compare a cold render with label-only and style-only re-renders."""
+    import yaml
+    from moral_landscape_generator import cache_stats, clear_caches
+    from process_moral_landscapes import MoralLandscapeProcessor
+    
+    processor = MoralLandscapeProcessor(images_dir=args.images_dir)
+    config = yaml.safe_load(CACHE_BENCH_YAML.format(resolution=args.resolution))
+    
+    def build(title, colormap):
+        config['landscape']['title'] = title
+        config['landscape']['style']['colormap'] = colormap
+        return processor.build_landscape(config)
+    
+    rows = []
+    for name, title, colormap in [('cold', 'A', 'viridis'),
+                                  ('label edit', 'B', 'viridis'),
+                                  ('style edit', 'B', 'RdYlGn')]:
+        if name == 'cold':
+            seconds = best_time(lambda: (clear_caches(), build(title, colormap)), args.repeat)
+        else:
+            seconds = best_time(lambda: build(title, colormap), args.repeat)
+        rows.append([f"{args.resolution}", name, f"{seconds * 1000:.1f}"])
+    print_table(['resolution', 'build', 'ms'], rows)
+    print()
+    for name, stats in cache_stats().items():
+        print(f"{name}: {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['entries']} entries, {stats['bytes'] / 1e6:.1f} MB")
+
+
+def bench_animation(args: argparse.Namespace) -> None:
+    """Measure animation frame rate and output size across dpi and frame-job counts."""
+    import yaml
+    from process_moral_landscapes import MoralLandscapeProcessor
+    
+    processor = MoralLandscapeProcessor(images_dir=args.images_dir)
+    config = yaml.safe_load(CACHE_BENCH_YAML.format(resolution=100))
+    config['render']['output_file'] = f"bench.{args.format}"
+    
+    rows = []
+    for dpi in args.dpis:
+        for jobs in args.jobs:
+            config['render']['animation'] = {'frames': args.frames, 'azimuth': [0, 360], 'dpi': dpi}
+            processor.frame_jobs = jobs
+            start = time.perf_counter()
+            data = processor.render_animation(config)
+            seconds = time.perf_counter() - start
+            rows.append([f"{dpi}", f"{jobs}", f"{args.frames / seconds:.1f}", f"{len(data) / 1e6:.2f}"])
+    print()
+    print_table(['dpi', 'jobs', 'frames/s (incl. encode)', 'MB'], rows)
+
+
+def bench_svg(args: argparse.Namespace) -> None:
+    """Compare PNG, plain SVG and colour-banded SVG output in time, size and element count."""
+    import yaml
+    from process_moral_landscapes import MoralLandscapeProcessor
+    
+    processor = MoralLandscapeProcessor(images_dir=args.images_dir)
+    rows = []
+    for resolution in args.resolutions:
+        for noise_level in args.noise_levels:
+            config = yaml.safe_load(SVG_BENCH_YAML.format(resolution=resolution, noise_level=noise_level))
+            for name, output_file in [('png', 'bench.png'),
+                                      ('svg (plot_surface)', None),
+                                      ('svg (banded)', 'bench.svg')]:
+                if output_file is None:
+                    # Plain savefig('.svg') of the raster figure
+                    config['render']['output_file'] = 'bench.png'
+                    
+                    def render():
+                        buffer = io.BytesIO()
+                        processor.build_landscape(config).fig.savefig(buffer, format='svg', bbox_inches='tight')
+                        return buffer.getvalue()
+                else:
+                    config['render']['output_file'] = output_file
+                    render = lambda: processor.render_landscape_image(config)
+                
+                data = []
+                seconds = best_time(lambda: data.append(render()), args.repeat)
+                paths = data[-1].count(b'<path') if name != 'png' else ''
+                rows.append([f"{resolution}", f"{noise_level}", name, f"{seconds * 1000:.0f}",
+                             f"{len(data[-1]) / 1e3:.0f}", f"{paths}"])
+    print_table(['resolution', 'noise', 'output', 'ms', 'KB', '<path>'], rows)
+
+
+def bench_modes(args: argparse.Namespace) -> None:
+    """Compare surface, contour and heatmap renders in time and size, at 300 dpi and at each mode's default dpi."""
+    import yaml
+    from process_moral_landscapes import MoralLandscapeProcessor
+    
+    processor = MoralLandscapeProcessor(images_dir=args.images_dir)
+    rows = []
+    for resolution in args.resolutions:
+        config = yaml.safe_load(SVG_BENCH_YAML.format(resolution=resolution, noise_level=0.1))
+        config['render']['output_file'] = 'bench.png'
+        for mode in ['surface', 'contour', 'heatmap']:
+            config['render']['mode'] = mode
+            for dpi in [300, None]:
+                if dpi is None:
+                    config['render'].pop('dpi', None)
+                else:
+                    config['render']['dpi'] = dpi
+                data = []
+                seconds = best_time(lambda: data.append(processor.render_landscape_image(config)), args.repeat)
+                rows.append([f"{resolution}", mode, f"{processor.get_render_dpi(config['render'])}",
+                             f"{seconds * 1000:.0f}", f"{len(data[-1]) / 1e3:.0f}"])
+    print_table(['resolution', 'mode', 'dpi', 'ms', 'KB'], rows)
+
+
+def bench_tiles(args: argparse.Namespace) -> None:
+    """Compare peak memory of single-canvas and tiled PNG renders of a 14x10 inch figure across dpi."""
+    import yaml
+    from process_moral_landscapes import MoralLandscapeProcessor
+    
+    processor = MoralLandscapeProcessor(images_dir=args.images_dir)
+    config = yaml.safe_load(SVG_BENCH_YAML.format(resolution=150, noise_level=0.1))
+    config['landscape']['style']['figsize'] = [14, 10]
+    config['render']['output_file'] = 'bench.png'
+    landscape = processor.build_landscape(config)
+    max_bytes = int(args.tile_memory * 2 ** 20)
+    
+    rows = []
+    for dpi in args.dpis:
+        for name, budget in [('single', None), ('tiled', max_bytes)]:
+            start = time.perf_counter()
+            peak, data = peak_rss_growth(lambda: landscape.render(format='png', dpi=dpi, max_bytes=budget))
+            seconds = time.perf_counter() - start
+            rows.append([f"{dpi}", name, f"{landscape.canvas_bytes(dpi) / 2 ** 20:.0f}",
+                         f"{peak / 2 ** 20:.0f}", f"{seconds:.1f}", f"{len(data) / 1e6:.1f}"])
+            del data
+    print_table(['dpi', 'render', 'canvas MB', 'peak RSS MB', 's', 'PNG MB'], rows)
+
+
+def measure_grid(resolution: int, features: int, dtype: Optional[str], storage: str) -> Tuple[int, float, float, float]:
+    """
+    Synthesize one surface and measure it, meant to run in a fresh process.
+    
+    Args:
+        resolution: Grid points per side
+        features: Number of peaks
+        dtype: Grid dtype, or None for the former float64 meshgrid synthesis
+        storage: 'memory' or 'memmap'
+        
+    Returns:
+        Tuple of (Z bytes, peak RSS growth in bytes, anonymous RSS growth
+        left once Z exists in bytes, seconds)
+    """
+    from moral_landscape_generator import MoralLandscape
+    
+    rng = np.random.default_rng(0)
+    peaks = [tuple(p) for p in np.column_stack([rng.uniform(-5, 5, (features, 2)),
+                                                rng.uniform(1, 5, features)])]
+    
+    def legacy():
+        # The former synthesis: float64 meshgrids and full-size temporaries per feature
+        x = np.linspace(-5, 5, resolution)
+        X, Y = np.meshgrid(x, x)
+        Z = np.zeros_like(X)
+        for px, py, height in peaks:
+            Z += height * np.exp(-((X - px)**2 + (Y - py)**2) / 2)
+        Z += 0.1 * landscape_noise.noise_field(Z.shape, 1)
+        return Z
+    
+    def generate():
+        landscape = MoralLandscape(resolution=resolution, headless=True)
+        return landscape.generate_landscape(peaks=peaks, noise_level=0.1, seed=1,
+                                            dtype=dtype, storage=storage)[2]
+    
+    anon_before = proc_status('RssAnon')
+    start = time.perf_counter()
+    peak, Z = peak_rss_growth(legacy if dtype is None else generate)
+    seconds = time.perf_counter() - start
+    return Z.nbytes, peak, proc_status('RssAnon') - anon_before, seconds
+
+
+def bench_grid(args: argparse.Namespace) -> None:
+    """Compare peak memory and time of surface synthesis across dtypes and grid storage."""
+    variants = [('legacy float64', None, 'memory'), ('float64', 'float64', 'memory'),
+                ('float32', 'float32', 'memory'), ('float32 memmap', 'float32', 'memmap')]
+    rows = []
+    # A fresh process per measurement, since freed memory is not always returned to the OS
+    context = multiprocessing.get_context('spawn')
+    for resolution in args.resolutions:
+        for name, dtype, storage in variants:
+            with context.Pool(1) as pool:
+                nbytes, peak, anon, seconds = pool.apply(measure_grid, (resolution, args.features, dtype, storage))
+            rows.append([f"{resolution}x{resolution}", name, f"{nbytes / 2 ** 20:.0f}",
+                         f"{peak / 2 ** 20:.0f}", f"{anon / 2 ** 20:.0f}", f"{seconds:.2f}"])
+    print_table(['grid', 'synthesis', 'Z MB', 'peak RSS MB', 'anon RSS MB', 's'], rows)
+
+
+def bench_features(args: argparse.Namespace) -> None:
+    """Time the per-block work before plotting on configs with many features."""
+    import yaml
+    from process_moral_landscapes import MoralLandscapeProcessor
+    
+    processor = MoralLandscapeProcessor(images_dir=args.images_dir)
+    rng = np.random.default_rng(0)
+    rows = []
+    for count in args.counts:
+        kinds = ['peaks', 'troughs', 'neutrals']
+        config = {
+            'landscape': {'resolution': 100, 'snap_to_surface': True, 'action_path': 'surface'},
+            'render': {'output_file': 'bench.png', 'view': {'elevation': 25, 'azimuth': 45}},
+        }
+        for i in range(count):
+            config.setdefault(kinds[i % 3], []).append({
+                'coords': [float(v) for v in rng.uniform(-5, 5, 2)] + [float(rng.uniform(1, 5))],
+                'label': f"F{i}",
+                'label_offset': [0.5, 0.5, 1],
+            })
+        config['moral_actions'] = [{'source': f"F{i}", 'target': f"F{(i + 1) % count}", 'label': f"A{i}"}
+                                   for i in range(count)]
+        config = processor.parse_yaml_config(yaml.safe_dump(config))
+        
+        model = processor.build_model(config)
+        landscape = processor.generate_surface(model)
+        timings = {
+            'build_model': best_time(lambda: processor.build_model(config), args.repeat),
+            'generate_surface': best_time(lambda: processor.generate_surface(model), args.repeat),
+            'resolve_annotations': best_time(lambda: processor.resolve_annotations(model, landscape), args.repeat),
+        }
+        for name, seconds in timings.items():
+            rows.append([f"{count}", name, f"{seconds * 1000:.2f}"])
+    print_table(['features', 'step', 'ms'], rows)
+
+
+# Landscape used by the SVG benchmark: a few overlapping features, like the site's landscapes
+SVG_BENCH_YAML = """
+landscape:
+  resolution: {resolution}
+  noise_level: {noise_level}
+  style:
+    colormap: viridis
+peaks:
+  - coords: [-2, -3, 9]
+    label: "Peak"
+  - coords: [3, -2, 7]
+troughs:
+  - coords: [0, 3, 6]
+    label: "Trough"
+  - coords: [3, 2, 9]
+render:
+  output_file: "bench.svg"
+  dpi: 300
+  view:
+    elevation: 25
+    azimuth: 45
+"""
+
+
+# Landscape used by the cache benchmark: many features so synthesis is visible
+CACHE_BENCH_YAML = """
+landscape:
+  resolution: {resolution}
+  noise_level: 0.2
+  style:
+    colormap: viridis
+peaks:
+""" + "".join(f"  - coords: [{i % 9 - 4}, {i // 9 - 2}, {i % 5 + 1}]\n" for i in range(40)) + """
+render:
+  output_file: "bench.png"
+  view:
+    elevation: 25
+    azimuth: 45
+"""
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the moral landscape renderer.")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    
+    noise_parser = subparsers.add_parser('noise', help='Noise field synthesis')
+    noise_parser.add_argument('--resolutions', type=int, nargs='+', default=[150, 500, 1000])
+    noise_parser.add_argument('--repeat', type=int, default=5)
+    noise_parser.set_defaults(func=bench_noise)
+    
+    cache_parser = subparsers.add_parser('cache', help='Grid and surface caches across re-renders')
+    cache_parser.add_argument('--resolution', type=int, default=400)
+    cache_parser.add_argument('--repeat', type=int, default=3)
+    cache_parser.add_argument('--images-dir', default=tempfile.gettempdir())
+    cache_parser.set_defaults(func=bench_cache)
+    
+    animation_parser = subparsers.add_parser('animation', help='Animated GIF/WebP rendering')
+    animation_parser.add_argument('--frames', type=int, default=36)
+    animation_parser.add_argument('--dpis', type=int, nargs='+', default=[60, 80, 100])
+    animation_parser.add_argument('--jobs', type=int, nargs='+', default=[1, 4])
+    animation_parser.add_argument('--format', choices=['gif', 'webp'], default='gif')
+    animation_parser.add_argument('--images-dir', default=tempfile.gettempdir())
+    animation_parser.set_defaults(func=bench_animation)
+    
+    svg_parser = subparsers.add_parser('svg', help='Vector output against the PNG path')
+    svg_parser.add_argument('--resolutions', type=int, nargs='+', default=[100, 150])
+    svg_parser.add_argument('--noise-levels', type=float, nargs='+', default=[0.0, 0.1])
+    svg_parser.add_argument('--repeat', type=int, default=3)
+    svg_parser.add_argument('--images-dir', default=tempfile.gettempdir())
+    svg_parser.set_defaults(func=bench_svg)
+    
+    modes_parser = subparsers.add_parser('modes', help='Surface against contour and heatmap renders')
+    modes_parser.add_argument('--resolutions', type=int, nargs='+', default=[100, 200])
+    modes_parser.add_argument('--repeat', type=int, default=3)
+    modes_parser.add_argument('--images-dir', default=tempfile.gettempdir())
+    modes_parser.set_defaults(func=bench_modes)
+    
+    tiles_parser = subparsers.add_parser('tiles', help='Peak memory of single-canvas against tiled PNG renders')
+    tiles_parser.add_argument('--dpis', type=int, nargs='+', default=[300, 600, 900])
+    tiles_parser.add_argument('--tile-memory', type=float, default=64, help='Tile memory budget in MB')
+    tiles_parser.add_argument('--images-dir', default=tempfile.gettempdir())
+    tiles_parser.set_defaults(func=bench_tiles)
+    
+    grid_parser = subparsers.add_parser('grid', help='Peak memory of surface synthesis by dtype and storage')
+    grid_parser.add_argument('--resolutions', type=int, nargs='+', default=[2000, 4000])
+    grid_parser.add_argument('--features', type=int, default=40)
+    grid_parser.set_defaults(func=bench_grid)
+    
+    features_parser = subparsers.add_parser('features', help='Per-block model, surface and annotation work by feature count')
+    features_parser.add_argument('--counts', type=int, nargs='+', default=[10, 100, 500])
+    features_parser.add_argument('--repeat', type=int, default=5)
+    features_parser.add_argument('--images-dir', default=tempfile.gettempdir())
+    features_parser.set_defaults(func=bench_features)
+    
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
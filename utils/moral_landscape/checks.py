@@ -0,0 +1,196 @@
+"""
+Regression checks for the moral landscape renderer.
+
+Each check builds what it needs in a temporary directory, prints what it
+verified and exits with status 1 on the first failure.
+
+Usage:
+    python checks.py svg-rerun
+    python checks.py concurrency [--landscapes 24] [--workers 8]
+    python checks.py value-noise [--resolution 1200] [--scale 8]
+"""
+
+import sys
+import tempfile
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+# Markdown page with a single SVG landscape block
+SVG_PAGE = """# SVG check
+
+```yaml moralgraph
+landscape:
+  resolution: 30
+peaks:
+  - coords: [0, 0, 5]
+    label: "Peak"
+render:
+  output_file: "svg_check.svg"
+  dpi: 72
+  view:
+    elevation: 25
+    azimuth: 45
+```
+"""
+
+
+# Output formats and plot modes the concurrency check cycles through
+CONCURRENCY_VARIANTS = [('png', 'surface'), ('svg', 'surface'), ('png', 'contour'), ('png', 'heatmap')]
+
+
+def fail(message: str) -> None:
+    """Report a failed check and exit with status 1."""
+    print(f"FAIL: {message}")
+    sys.exit(1)
+
+
+def check_svg_rerun(args: argparse.Namespace) -> None:
+    """Check that a second run keeps an SVG block's hash and does not render it again."""
+    from process_moral_landscapes import MoralLandscapeProcessor
+    
+    with tempfile.TemporaryDirectory() as root:
+        Path(root, 'page.md').write_text(SVG_PAGE, encoding='utf-8')
+        processor = MoralLandscapeProcessor(images_dir=str(Path(root, 'images')))
+        image_file = processor.images_dir / 'svg_check.svg'
+        hash_file = processor.get_hash_file_path('svg_check.svg')
+        
+        processor.process_all(root)
+        if not image_file.exists():
+            fail("first run did not write svg_check.svg")
+        if not hash_file.exists():
+            fail("first run deleted the hash file of svg_check.svg as orphaned")
+        rendered_at = image_file.stat().st_mtime_ns
+        
+        plan = processor.plan_all(root)
+        if plan['renders'] or plan['orphans']:
+            fail(f"--plan still reports work after the first run: {plan['renders']} {plan['orphans']}")
+        
+        processor.process_all(root)
+        if image_file.stat().st_mtime_ns != rendered_at:
+            fail("second run rendered svg_check.svg again")
+        
+        Path(root, 'page.md').write_text("# No landscapes\n", encoding='utf-8')
+        processor.process_all(root)
+        if image_file.exists() or hash_file.exists():
+            fail("an unreferenced SVG image or its hash file was not cleaned up")
+    
+    print("OK: SVG blocks are skipped on re-runs and cleaned up once unreferenced")
+
+
+def concurrency_configs(count: int) -> List[dict]:
+    """
+    Build distinct, small landscape configurations for the concurrency check.
+    
+    Args:
+        count: Number of configurations
+        
+    Returns:
+        List of YAML configuration dicts
+    """
+    configs = []
+    for i in range(count):
+        image_format, mode = CONCURRENCY_VARIANTS[i % len(CONCURRENCY_VARIANTS)]
+        configs.append({
+            'landscape': {
+                'resolution': 40,
+                'noise_level': 0.2,
+                'noise_type': 'value' if i % 2 else 'white',
+                'snap_to_surface': True,
+            },
+            'peaks': [{'coords': [-2 + i % 5, 2, 4 + i % 3], 'label': f"Peak {i}"}],
+            'troughs': [{'coords': [2, -2 + i % 4, 3], 'label': f"Trough {i}"}],
+            'moral_actions': [{'source': f"Trough {i}", 'target': f"Peak {i}", 'label': "Climb"}],
+            'render': {
+                'output_file': f"concurrency_{i}.{image_format}",
+                'dpi': 60,
+                'mode': mode,
+                'view': {'elevation': 20 + i % 30, 'azimuth': 10 * i},
+            },
+        })
+    return configs
+
+
+def render_config(config: dict) -> Optional[bytes]:
+    """Render a configuration with a fresh processor; used in threads and pool workers."""
+    from process_moral_landscapes import MoralLandscapeProcessor
+    
+    with tempfile.TemporaryDirectory() as images_dir:
+        return MoralLandscapeProcessor(images_dir=images_dir).render_landscape_image(config)
+
+
+def check_concurrency(args: argparse.Namespace) -> None:
+    """Check that landscapes rendered at once in threads and processes match serial renders byte for byte."""
+    configs = concurrency_configs(args.landscapes)
+    expected = [render_config(config) for config in configs]
+    for config, image_data in zip(configs, expected):
+        if not image_data:
+            fail(f"serial render of {config['render']['output_file']} failed")
+    
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        threaded = list(pool.map(render_config, configs))
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        pooled = list(pool.map(render_config, configs))
+    
+    for name, results in (('threads', threaded), ('processes', pooled)):
+        for config, image_data, reference in zip(configs, results, expected):
+            if image_data != reference:
+                fail(f"{config['render']['output_file']} rendered in {name} differs from the serial render")
+    
+    print(f"OK: {len(configs)} landscapes rendered on {args.workers} threads and "
+          f"{args.workers} processes match their serial renders byte for byte")
+
+
+def check_value_noise(args: argparse.Namespace) -> None:
+    """Check that value noise never repeats and that streamed blocks match the whole field."""
+    import numpy as np
+    from landscape_noise import NOISE_CACHE, noise_blocks, value_noise
+    
+    resolution, scale = args.resolution, args.scale
+    field = value_noise((resolution, resolution), 1, scale)
+    # A wrapping lattice repeats the field after a whole number of lattice cells
+    for cells in range(1, int(resolution / 2 / scale) + 1):
+        shift = int(round(cells * scale))
+        if np.array_equal(field[:, :-shift], field[:, shift:]) or np.array_equal(field[:-shift], field[shift:]):
+            fail(f"value noise at {resolution}x{resolution} repeats every {shift} grid points")
+    
+    # Large enough that noise_blocks() synthesizes it block by block instead of via noise_field()
+    rows = NOISE_CACHE.max_bytes // (resolution * np.dtype(np.float32).itemsize) + 1
+    blocks = np.concatenate([block for _, block in noise_blocks((rows, resolution), 1, 'value', scale)])
+    if not np.array_equal(blocks, value_noise((rows, resolution), 1, scale)):
+        fail(f"value noise streamed in blocks differs from the whole {rows}x{resolution} field")
+    
+    print(f"OK: value noise at {resolution}x{resolution} (scale {scale}) does not repeat, "
+          f"and a {rows}x{resolution} field streamed in blocks matches the whole field")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description="Run regression checks of the moral landscape renderer.")
+    subparsers = parser.add_subparsers(dest='check', required=True)
+    
+    svg_parser = subparsers.add_parser('svg-rerun', help='SVG images keep their hash files between runs')
+    svg_parser.set_defaults(func=check_svg_rerun)
+    
+    concurrency_parser = subparsers.add_parser('concurrency',
+                                               help='Concurrent renders give the same bytes as serial ones')
+    concurrency_parser.add_argument('--landscapes', type=int, default=24, help='Landscapes to render (default: 24)')
+    concurrency_parser.add_argument('--workers', type=int, default=8, help='Threads and processes to render with (default: 8)')
+    concurrency_parser.set_defaults(func=check_concurrency)
+    
+    noise_parser = subparsers.add_parser('value-noise', help='Value noise does not tile at high resolutions')
+    noise_parser.add_argument('--resolution', type=int, default=1200, help='Grid resolution to check (default: 1200)')
+    noise_parser.add_argument('--scale', type=float, default=8.0, help='Lattice spacing in grid points (default: 8)')
+    noise_parser.set_defaults(func=check_value_noise)
+    
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
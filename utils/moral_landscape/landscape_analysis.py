@@ -0,0 +1,337 @@
+"""
+Analytic metrics for moral landscapes.
+
+Finds the true extrema of a generated surface (which can differ from the
+hand-placed peaks and troughs once kernels overlap and noise is added),
+partitions the surface into descent basins, and reports basin areas and
+the saddle heights that separate them. Minima that are absorbed into a
+deeper basin at low prominence are treated as noise. Everything is vectorized NumPy on
+the Z grid, so a full analysis costs a few passes over the grid.
+"""
+
+import csv
+import io
+import json
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from moral_landscape_generator import MoralLandscape
+
+
+# Offsets of the 3x3 neighbourhood, in sliding-window order
+NEIGHBOUR_OFFSETS = np.array([(dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1)])
+
+# CSV columns written by to_csv()
+CSV_FIELDS = [
+    'source', 'output_file', 'kind', 'label', 'x', 'y', 'z', 'edge',
+    'area', 'saddle_height', 'prominence', 'declared_z', 'offset'
+]
+
+
+def neighbourhood_windows(Z: np.ndarray, fill: float) -> np.ndarray:
+    """
+    Get the 3x3 neighbourhood of every grid cell as a view.
+    
+    Args:
+        Z: Height grid
+        fill: Value used outside the grid
+        
+    Returns:
+        (rows, cols, 9) array of neighbourhood heights
+    """
+    padded = np.pad(Z, 1, mode='constant', constant_values=fill)
+    return sliding_window_view(padded, (3, 3)).reshape(Z.shape + (9,))
+
+
+def local_extrema(Z: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Find strict local maxima and minima with 3x3 max/min filters.
+    
+    Flat cells (equal to every neighbour) are not reported.
+    
+    Args:
+        Z: Height grid
+        
+    Returns:
+        Dictionary with 'peaks' and 'troughs' as (K, 2) arrays of (row, col)
+    """
+    maxima = neighbourhood_windows(Z, -np.inf).max(axis=2)
+    minima = neighbourhood_windows(Z, np.inf).min(axis=2)
+    not_flat = maxima > minima
+    return {
+        'peaks': np.argwhere((Z == maxima) & not_flat),
+        'troughs': np.argwhere((Z == minima) & not_flat),
+    }
+
+
+def descent_basins(Z: np.ndarray) -> np.ndarray:
+    """
+    Label every cell with the local minimum its steepest-descent path reaches.
+    
+    Each cell points to its lowest strictly lower neighbour; pointer jumping
+    then resolves every chain in O(log n) vectorized passes.
+    
+    Args:
+        Z: Height grid
+        
+    Returns:
+        Integer grid of flat indices of each cell's sink
+    """
+    rows, cols = Z.shape
+    windows = neighbourhood_windows(Z, np.inf)
+    lowest = windows.argmin(axis=2)
+    
+    # Cells with no strictly lower neighbour are their own sink
+    has_lower = windows.min(axis=2) < Z
+    row_index, col_index = np.indices(Z.shape)
+    target_row = row_index + np.where(has_lower, NEIGHBOUR_OFFSETS[lowest, 0], 0)
+    target_col = col_index + np.where(has_lower, NEIGHBOUR_OFFSETS[lowest, 1], 0)
+    pointer = (target_row * cols + target_col).ravel()
+    
+    while True:
+        jumped = pointer[pointer]
+        if np.array_equal(jumped, pointer):
+            break
+        pointer = jumped
+    return pointer.reshape(rows, cols)
+
+
+def basin_saddles(Z: np.ndarray, basins: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find the lowest pass between every pair of adjacent basins.
+    
+    Args:
+        Z: Height grid
+        basins: Sink labels from descent_basins()
+        
+    Returns:
+        Tuple of (pairs, heights, cells) sorted by height: (K, 2) basin
+        sink pairs, the saddle height of each pair and the flat index of
+        its pass cell
+    """
+    flat_index = np.arange(Z.size).reshape(Z.shape)
+    keys, heights, cells = [], [], []
+    for a, b in ((np.s_[:, :-1], np.s_[:, 1:]), (np.s_[:-1, :], np.s_[1:, :])):
+        label_a, label_b = basins[a].ravel(), basins[b].ravel()
+        boundary = label_a != label_b
+        if not boundary.any():
+            continue
+        z_a, z_b = Z[a].ravel()[boundary], Z[b].ravel()[boundary]
+        keys.append(np.stack([np.minimum(label_a, label_b)[boundary],
+                              np.maximum(label_a, label_b)[boundary]], axis=1))
+        heights.append(np.maximum(z_a, z_b))
+        cells.append(np.where(z_a >= z_b, flat_index[a].ravel()[boundary], flat_index[b].ravel()[boundary]))
+    
+    if not keys:
+        return np.empty((0, 2), dtype=np.intp), np.empty(0), np.empty(0, dtype=np.intp)
+    keys = np.concatenate(keys)
+    heights = np.concatenate(heights)
+    cells = np.concatenate(cells)
+    
+    # Sort by basin pair, then height, and keep the lowest crossing of each pair
+    order = np.lexsort((heights, keys[:, 1], keys[:, 0]))
+    keys, heights, cells = keys[order], heights[order], cells[order]
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = np.any(keys[1:] != keys[:-1], axis=1)
+    keys, heights, cells = keys[first], heights[first], cells[first]
+    
+    order = np.argsort(heights, kind='stable')
+    return keys[order], heights[order], cells[order]
+
+
+def merge_basins(Z: np.ndarray, basins: np.ndarray) -> Dict[int, dict]:
+    """
+    Merge basins in order of saddle height to measure how significant each minimum is.
+    
+    When two basins meet at a saddle, the shallower one is absorbed into the
+    deeper one; its prominence is the saddle height minus its own minimum.
+    Noise creates many minima but they are absorbed at low prominence, so
+    the prominence separates true troughs from grid noise.
+    
+    Args:
+        Z: Height grid
+        basins: Sink labels from descent_basins()
+        
+    Returns:
+        Mapping sink flat index to a dict with 'area' (cells drained when
+        absorbed), 'saddle_height', 'saddle' (flat index of the pass cell),
+        'prominence' and 'into' (sink it drains into); the last four are
+        None for the global minimum
+    """
+    sinks, counts = np.unique(basins, return_counts=True)
+    sinks = sinks.tolist()
+    parent = dict(zip(sinks, sinks))
+    area = dict(zip(sinks, counts.tolist()))
+    sink_z = dict(zip(sinks, Z.ravel()[sinks].tolist()))
+    merged: Dict[int, dict] = {}
+    
+    def find(sink):
+        while parent[sink] != sink:
+            parent[sink] = parent[parent[sink]]
+            sink = parent[sink]
+        return sink
+    
+    pairs, heights, cells = basin_saddles(Z, basins)
+    for (a, b), height, cell in zip(pairs.tolist(), heights.tolist(), cells.tolist()):
+        root_a, root_b = find(a), find(b)
+        if root_a == root_b:
+            continue
+        if (sink_z[root_a], root_a) < (sink_z[root_b], root_b):
+            root_a, root_b = root_b, root_a
+        merged[root_a] = {
+            'area': area[root_a],
+            'saddle_height': height,
+            'saddle': cell,
+            'prominence': height - sink_z[root_a],
+            'into': root_b,
+        }
+        parent[root_a] = root_b
+        area[root_b] += area[root_a]
+    
+    for sink in parent:
+        if sink not in merged:
+            merged[sink] = {'area': area[sink], 'saddle_height': None, 'saddle': None,
+                            'prominence': None, 'into': None}
+    return merged
+
+
+def analyze_landscape(
+    landscape: MoralLandscape,
+    declared: Optional[List[dict]] = None,
+    min_prominence: Optional[float] = None
+) -> dict:
+    """
+    Compute extrema, basin areas and saddle heights of a generated landscape.
+    
+    Args:
+        landscape: MoralLandscape after generate_landscape()
+        declared: Optional hand-placed features, as dicts with 'kind'
+            ('peak', 'trough' or 'neutral'), 'label', 'x', 'y' and 'z', to
+            compare against the detected extrema
+        min_prominence: Extrema less prominent than this are treated as
+            noise (default: four times the landscape noise level)
+            
+    Returns:
+        Dictionary with 'peaks', 'troughs', 'saddles' and 'declared' lists
+        and the raw 'candidates' counts found by the neighbourhood filters
+    """
+    if landscape.Z is None:
+        raise ValueError("Must call generate_landscape first")
+    if min_prominence is None:
+        min_prominence = 4 * landscape.noise_level
+    
+    Z = landscape.Z
+    rows, cols = Z.shape
+    cell_area = (
+        (landscape.x_range[1] - landscape.x_range[0]) / (landscape.resolution - 1) *
+        (landscape.y_range[1] - landscape.y_range[0]) / (landscape.resolution - 1)
+    )
+    X, Y = np.broadcast_arrays(landscape.X, landscape.Y, Z)[:2]
+    z_flat = Z.ravel()
+    
+    def point(index, kind):
+        # Extrema on the grid boundary may only be artefacts of the plotted range
+        r, c = divmod(int(index), cols)
+        return {'kind': kind, 'x': float(X[r, c]), 'y': float(Y[r, c]),
+                'z': float(z_flat[index]), 'edge': r in (0, rows - 1) or c in (0, cols - 1)}
+    
+    features = {}
+    saddle_list = []
+    for kind, sign in (('trough', 1), ('peak', -1)):
+        # Peaks are the troughs of the inverted surface
+        surface = Z if sign == 1 else -Z
+        features[kind] = []
+        for sink, info in merge_basins(surface, descent_basins(surface)).items():
+            if info['prominence'] is not None and info['prominence'] < min_prominence:
+                continue
+            feature = point(sink, kind)
+            feature['area'] = info['area'] * cell_area
+            feature['saddle_height'] = None if info['saddle'] is None else float(z_flat[info['saddle']])
+            feature['prominence'] = info['prominence']
+            features[kind].append(feature)
+            
+            if info['saddle'] is not None:
+                saddle = point(info['saddle'], f'{kind}_saddle')
+                saddle['between'] = [point(sink, kind), point(info['into'], kind)]
+                saddle_list.append(saddle)
+    
+    peaks = sorted(features['peak'], key=lambda p: -p['z'])
+    troughs = sorted(features['trough'], key=lambda t: t['z'])
+    saddle_list.sort(key=lambda s: s['z'])
+    
+    declared_list = []
+    if declared:
+        surface_z = landscape.sample([d['x'] for d in declared], [d['y'] for d in declared])
+        for feature, z in zip(declared, surface_z.tolist()):
+            entry = dict(feature, surface_z=z, nearest=None, offset=None)
+            candidates = peaks if feature['kind'] == 'peak' else troughs if feature['kind'] == 'trough' else []
+            if candidates:
+                distances = np.hypot(
+                    np.array([c['x'] for c in candidates]) - feature['x'],
+                    np.array([c['y'] for c in candidates]) - feature['y']
+                )
+                nearest = int(distances.argmin())
+                entry['nearest'] = candidates[nearest]
+                entry['offset'] = float(distances[nearest])
+            declared_list.append(entry)
+    
+    extrema = local_extrema(Z)
+    return {
+        'peaks': peaks,
+        'troughs': troughs,
+        'saddles': saddle_list,
+        'declared': declared_list,
+        'candidates': {kind: len(cells) for kind, cells in extrema.items()},
+        'min_prominence': min_prominence,
+    }
+
+
+def to_json(reports: List[dict]) -> str:
+    """
+    Serialize analysis reports as JSON.
+    
+    Args:
+        reports: Dicts with 'source', 'output_file' and 'analysis' keys
+        
+    Returns:
+        JSON string
+    """
+    return json.dumps(reports, indent=2, ensure_ascii=False)
+
+
+def to_csv(reports: List[dict]) -> str:
+    """
+    Serialize analysis reports as CSV, one row per extremum, saddle or declared feature.
+    
+    Args:
+        reports: Dicts with 'source', 'output_file' and 'analysis' keys
+        
+    Returns:
+        CSV string with CSV_FIELDS columns
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    for report in reports:
+        analysis = report['analysis']
+        base = {'source': report['source'], 'output_file': report['output_file']}
+        for row in analysis['peaks'] + analysis['troughs'] + analysis['saddles']:
+            writer.writerow(dict(base, **row))
+        for feature in analysis['declared']:
+            nearest = feature['nearest'] or {}
+            writer.writerow(dict(
+                base,
+                kind=f"declared_{feature['kind']}",
+                label=feature['label'],
+                x=feature['x'],
+                y=feature['y'],
+                z=feature['surface_z'],
+                declared_z=feature['z'],
+                offset=feature['offset'],
+                area=nearest.get('area'),
+                saddle_height=nearest.get('saddle_height'),
+                prominence=nearest.get('prominence'),
+            ))
+    return buffer.getvalue()
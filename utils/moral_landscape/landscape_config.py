@@ -0,0 +1,168 @@
+"""
+Parsed, immutable model of a moral landscape YAML block.
+
+The processor validates a block as a plain dict, then builds a
+LandscapeModel from it once. Surface synthesis, labelling and action lookup
+all read the model instead of walking the peaks, troughs and neutrals dicts
+again: feature positions, signed heights and kinds are packed into NumPy
+arrays, and the per-feature and per-action options live in slotted,
+frozen dataclasses.
+
+Like landscape_options, this module does not import Matplotlib.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+# Feature kinds, in the order their YAML lists appear; indices are stored in LandscapeModel.kinds
+FEATURE_KINDS = ('peak', 'trough', 'neutral')
+
+# YAML list holding each feature kind
+FEATURE_KEYS = ('peaks', 'troughs', 'neutrals')
+
+
+@dataclass(frozen=True, slots=True)
+class Feature:
+    """Drawing options of one peak, trough or neutral point."""
+    
+    label: Optional[str]
+    label_offset: Optional[Tuple[float, float, float]]
+    z_index: Optional[int]
+    fontsize: int
+
+
+@dataclass(frozen=True, slots=True)
+class Action:
+    """A moral action, with its endpoints resolved to feature indices."""
+    
+    label: str
+    source: str
+    target: str
+    source_index: Optional[int]
+    target_index: Optional[int]
+    z_index: Optional[int]
+    color: Optional[str]
+    linewidth: Optional[float]
+    linestyle: Optional[str]
+    alpha: Optional[float]
+    fontsize: int
+    path: str
+
+
+@dataclass(frozen=True, slots=True)
+class LandscapeModel:
+    """
+    Everything the processor needs to synthesize and annotate a landscape.
+    
+    Features are stored in YAML order (peaks, then troughs, then neutrals)
+    as parallel arrays: centres (N, 2) of x and y, amplitudes (N,) of
+    signed heights (troughs negative, so each is also the height its marker
+    is drawn at), and kinds (N,) of indices into FEATURE_KINDS. The arrays
+    are read-only.
+    """
+    
+    resolution: int
+    x_range: Tuple[float, float]
+    y_range: Tuple[float, float]
+    noise_level: float
+    seed: int
+    noise_type: str
+    noise_scale: float
+    snap_to_surface: bool
+    centres: np.ndarray
+    amplitudes: np.ndarray
+    kinds: np.ndarray
+    features: Tuple[Feature, ...]
+    actions: Tuple[Action, ...]
+    
+    @classmethod
+    def from_config(cls, config: dict, seed: int) -> 'LandscapeModel':
+        """
+        Build the model of a validated configuration.
+        
+        Args:
+            config: Parsed YAML configuration that passed schema validation
+            seed: Noise seed of the block (explicit or derived from its geometry)
+        
+        Returns:
+            LandscapeModel of the block
+        """
+        landscape_config = config.get('landscape', {})
+        default_fontsize = landscape_config.get('style', {}).get('label_fontsize', 11)
+        
+        points = []
+        kinds = []
+        for kind, key in enumerate(FEATURE_KEYS):
+            points.extend(config.get(key, []))
+            kinds.extend([kind] * len(config.get(key, [])))
+        
+        coords = np.array([point['coords'] for point in points], dtype=float).reshape(-1, 3)
+        kinds = np.array(kinds, dtype=np.int8)
+        centres = coords[:, :2]
+        amplitudes = np.where(kinds == FEATURE_KINDS.index('trough'), -coords[:, 2], coords[:, 2])
+        for array in (centres, amplitudes, kinds):
+            array.flags.writeable = False
+        
+        features = tuple(
+            Feature(
+                label=point.get('label'),
+                label_offset=tuple(point['label_offset']) if point.get('label_offset') else None,
+                z_index=point.get('z_index'),
+                fontsize=point.get('fontsize', default_fontsize)
+            )
+            for point in points
+        )
+        
+        # A label used twice refers to its last feature
+        index_of: Dict[Optional[str], int] = {feature.label: i for i, feature in enumerate(features)}
+        default_path = landscape_config.get('action_path', 'straight')
+        actions = tuple(
+            Action(
+                label=action['label'],
+                source=action['source'],
+                target=action['target'],
+                source_index=index_of.get(action['source']),
+                target_index=index_of.get(action['target']),
+                z_index=action.get('z_index'),
+                color=action.get('color'),
+                linewidth=action.get('linewidth'),
+                linestyle=action.get('linestyle'),
+                alpha=action.get('alpha'),
+                fontsize=action.get('fontsize', 10),  # Default for action arrows is 10
+                path=action.get('path', default_path)
+            )
+            for action in config.get('moral_actions', [])
+        )
+        
+        return cls(
+            resolution=landscape_config.get('resolution', 100),
+            x_range=tuple(landscape_config.get('x_range', [-5, 5])),
+            y_range=tuple(landscape_config.get('y_range', [-5, 5])),
+            noise_level=landscape_config.get('noise_level', 0.1),
+            seed=seed,
+            noise_type=landscape_config.get('noise_type', 'white'),
+            noise_scale=landscape_config.get('noise_scale', 8.0),
+            snap_to_surface=landscape_config.get('snap_to_surface', False),
+            centres=centres,
+            amplitudes=amplitudes,
+            kinds=kinds,
+            features=features,
+            actions=actions
+        )
+    
+    def feature_points(self, kind: str) -> np.ndarray:
+        """
+        Get the features of one kind as generate_landscape() takes them.
+        
+        Args:
+            kind: 'peak', 'trough' or 'neutral'
+        
+        Returns:
+            (M, 3) array of (x, y, height) rows, with troughs as positive depths
+        """
+        mask = self.kinds == FEATURE_KINDS.index(kind)
+        heights = -self.amplitudes[mask] if kind == 'trough' else self.amplitudes[mask]
+        return np.column_stack([self.centres[mask], heights])
@@ -0,0 +1,194 @@
+"""
+Noise fields for moral landscapes.
+
+Provides reproducible noise for MoralLandscape.generate_landscape():
+- 'white': independent standard-normal values at every grid point
+- 'value': smooth value noise, interpolated from a coarse random lattice
+  that covers the whole field, so the noise never repeats
+
+All fields are float32, seeded through np.random.Generator and cached, so
+re-rendering the same landscape never pays for noise synthesis twice.
+"""
+
+import math
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from array_cache import ArrayCache
+
+
+NOISE_TYPES = ('white', 'value')
+
+# Caches of finished noise fields and of the lattices behind value noise
+NOISE_CACHE = ArrayCache(max_bytes=64 * 1024 * 1024)
+LATTICE_CACHE = ArrayCache(max_bytes=16 * 1024 * 1024)
+
+
+def value_lattice(shape: Tuple[int, int], seed: int, scale: float) -> np.ndarray:
+    """
+    Get the random lattice behind a value-noise field.
+    
+    The lattice has a point every scale grid points over the whole field
+    (plus one beyond each edge), so the field never wraps around and repeats.
+    
+    Args:
+        shape: Grid shape of the field
+        seed: Non-negative integer seed
+        scale: Lattice spacing in grid points
+        
+    Returns:
+        Read-only (ceil(rows / scale) + 2, ceil(cols / scale) + 2) float32 array
+    """
+    rows, cols = shape
+    lattice_shape = (math.ceil(rows / scale) + 2, math.ceil(cols / scale) + 2)
+    key = (seed, scale, lattice_shape)
+    lattice = LATTICE_CACHE.get(key)
+    if lattice is not None:
+        return lattice
+    
+    lattice = np.empty(lattice_shape, dtype=np.float32)
+    np.random.default_rng((seed, int(scale * 1000))).standard_normal(dtype=np.float32, out=lattice)
+    return LATTICE_CACHE.put(key, lattice)
+
+
+def _fade(t: np.ndarray) -> np.ndarray:
+    """Smoothstep weights for interpolating between lattice points."""
+    return t * t * (3 - 2 * t)
+
+
+def value_noise(shape: Tuple[int, int], seed: int, scale: float = 8.0) -> np.ndarray:
+    """
+    Synthesize smooth value noise by interpolating a coarse random lattice.
+    
+    Interpolation is separable: lattice rows are first interpolated to the
+    output columns, then those rows are blended to the output rows, so the
+    cost is two gathers per output pixel.
+    
+    Args:
+        shape: Grid shape of the field
+        seed: Non-negative integer seed
+        scale: Lattice spacing in grid points (larger = smoother)
+        
+    Returns:
+        Writable float32 array of the given shape
+    """
+    rows, cols = shape
+    return _value_noise_rows(value_lattice(shape, seed, scale), 0, rows, cols, scale)
+
+
+def _value_noise_rows(lattice: np.ndarray, start: int, stop: int, cols: int, scale: float) -> np.ndarray:
+    """Synthesize rows start to stop of a value-noise field from its lattice."""
+    def axis_weights(first, last):
+        position = np.arange(first, last, dtype=np.float32) / np.float32(scale)
+        cell = np.floor(position)
+        weight = _fade(position - cell)
+        return cell.astype(np.intp), weight
+    
+    x0, wx = axis_weights(0, cols)
+    y0, wy = axis_weights(start, stop)
+    
+    # Interpolate along x on the lattice rows these output rows fall between,
+    # then along y at full size
+    first = y0[0]
+    lattice = lattice[first:y0[-1] + 2]
+    lattice_rows = lattice[:, x0] + (lattice[:, x0 + 1] - lattice[:, x0]) * wx
+    field = lattice_rows[y0 - first]
+    field += (lattice_rows[y0 - first + 1] - field) * wy[:, None]
+    return field
+
+
+def white_noise(shape: Tuple[int, int], seed: int) -> np.ndarray:
+    """
+    Draw standard-normal white noise into a preallocated float32 buffer.
+    
+    Args:
+        shape: Grid shape of the field
+        seed: Non-negative integer seed
+        
+    Returns:
+        Writable float32 array of the given shape
+    """
+    field = np.empty(shape, dtype=np.float32)
+    np.random.default_rng(seed).standard_normal(dtype=np.float32, out=field)
+    return field
+
+
+def noise_field(
+    shape: Tuple[int, int],
+    seed: int,
+    noise_type: str = 'white',
+    scale: float = 8.0
+) -> np.ndarray:
+    """
+    Get a reproducible noise field, reusing cached fields when possible.
+    
+    Args:
+        shape: Grid shape of the field
+        seed: Non-negative integer seed
+        noise_type: 'white' or 'value'
+        scale: Lattice spacing in grid points for 'value' noise
+        
+    Returns:
+        Read-only float32 array of the given shape
+    """
+    if noise_type not in NOISE_TYPES:
+        raise ValueError(f"Unknown noise type {noise_type!r}; expected one of {NOISE_TYPES}")
+    
+    shape = tuple(shape)
+    key = (shape, seed, noise_type, scale if noise_type == 'value' else None)
+    field = NOISE_CACHE.get(key)
+    if field is not None:
+        return field
+    
+    if noise_type == 'value':
+        field = value_noise(shape, seed, scale)
+    else:
+        field = white_noise(shape, seed)
+    return NOISE_CACHE.put(key, field)
+
+
+def noise_blocks(
+    shape: Tuple[int, int],
+    seed: int,
+    noise_type: str = 'white',
+    scale: float = 8.0,
+    block_rows: int = 256
+) -> Iterator[Tuple[slice, np.ndarray]]:
+    """
+    Get the same field as noise_field() as a sequence of row blocks.
+    
+    Fields small enough for NOISE_CACHE come from noise_field(). Larger
+    ones, which would not be cached anyway, are synthesized block by block
+    so the whole field never has to be held at once.
+    
+    Args:
+        shape: Grid shape of the field
+        seed: Non-negative integer seed
+        noise_type: 'white' or 'value'
+        scale: Lattice spacing in grid points for 'value' noise
+        block_rows: Rows per block
+        
+    Yields:
+        (row slice, float32 block of the field at those rows)
+    """
+    rows, cols = shape
+    if rows * cols * np.dtype(np.float32).itemsize <= NOISE_CACHE.max_bytes:
+        field = noise_field(shape, seed, noise_type, scale)
+        for start in range(0, rows, block_rows):
+            yield slice(start, start + block_rows), field[start:start + block_rows]
+        return
+    if noise_type not in NOISE_TYPES:
+        raise ValueError(f"Unknown noise type {noise_type!r}; expected one of {NOISE_TYPES}")
+    
+    # Drawing in blocks from one generator gives the same values as one draw
+    rng = np.random.default_rng(seed)
+    lattice = value_lattice(shape, seed, scale) if noise_type == 'value' else None
+    for start in range(0, rows, block_rows):
+        stop = min(start + block_rows, rows)
+        if lattice is not None:
+            block = _value_noise_rows(lattice, start, stop, cols, scale)
+        else:
+            block = np.empty((stop - start, cols), dtype=np.float32)
+            rng.standard_normal(dtype=np.float32, out=block)
+        yield slice(start, stop), block
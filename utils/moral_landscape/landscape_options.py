@@ -0,0 +1,21 @@
+"""
+Option values shared by the renderer and the processor.
+
+This module imports nothing, so the processor can validate YAML blocks and
+plan a run without loading Matplotlib.
+"""
+
+# Action path modes accepted by add_action_paths()
+ACTION_PATH_MODES = ('straight', 'surface', 'steepest')
+
+# Plot modes: the 3D surface, or a flat overview drawn by plot_landscape_2d()
+PLOT_MODES = ('surface', 'contour', 'heatmap')
+
+# Suffixes of the web payload files written next to the rendered image
+WEB_SUFFIXES = ('.mesh.json', '.mesh.bin')
+
+# Canvas bytes a PNG render may hold at once before it is rendered in strips
+TILE_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# How the Z grid of a landscape is held: an ordinary array, or np.memmap over a temporary file
+GRID_STORAGE = ('memory', 'memmap')
@@ -0,0 +1,140 @@
+"""
+Streaming PNG output for moral landscapes.
+
+PNGStreamWriter encodes an RGBA image handed to it a band of rows at a
+time, so an image far larger than memory allows can be written from
+strips rendered one after another. Rows are filtered the way libpng does
+by default (the filter giving the smallest sum of absolute values wins,
+per row) and compressed with a single zlib stream split over IDAT chunks.
+"""
+
+import struct
+import zlib
+from typing import BinaryIO, Dict, Optional
+
+import numpy as np
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Bytes per pixel of RGBA output
+RGBA_BYTES = 4
+
+# Rows filtered at once, which bounds the filter temporaries
+FILTER_BLOCK_ROWS = 16
+
+# Compressed bytes collected before an IDAT chunk is written
+IDAT_CHUNK_SIZE = 256 * 1024
+
+
+def filter_rows(rows: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """
+    Apply the best PNG filter to each row of a band.
+    
+    All five filters (None, Sub, Up, Average, Paeth) are evaluated for
+    every row at once; each row keeps the one whose output, read as signed
+    bytes, has the smallest sum of absolute values.
+    
+    Args:
+        rows: (n, width * 4) uint8 array of RGBA rows
+        previous: The row above the band (zeros for the first row of the image)
+    
+    Returns:
+        (n, 1 + width * 4) uint8 array, each row prefixed by its filter type
+    """
+    x = rows.astype(np.int16)
+    up = np.empty_like(x)
+    up[0] = previous
+    up[1:] = x[:-1]
+    left = np.zeros_like(x)
+    left[:, RGBA_BYTES:] = x[:, :-RGBA_BYTES]
+    up_left = np.zeros_like(x)
+    up_left[:, RGBA_BYTES:] = up[:, :-RGBA_BYTES]
+    
+    estimate = left + up - up_left
+    distance_left = np.abs(estimate - left)
+    distance_up = np.abs(estimate - up)
+    distance_up_left = np.abs(estimate - up_left)
+    paeth = np.where((distance_left <= distance_up) & (distance_left <= distance_up_left), left,
+                     np.where(distance_up <= distance_up_left, up, up_left))
+    
+    candidates = np.stack([x, x - left, x - up, x - ((left + up) >> 1), x - paeth]).astype(np.uint8)
+    scores = np.abs(candidates.view(np.int8).astype(np.int32)).sum(axis=2)
+    best = scores.argmin(axis=0)
+    
+    filtered = np.empty((len(rows), rows.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = best
+    filtered[:, 1:] = candidates[best, np.arange(len(rows))]
+    return filtered
+
+
+class PNGStreamWriter:
+    """Write an 8-bit RGBA PNG whose rows arrive in bands, top to bottom."""
+    
+    def __init__(self, fileobj: BinaryIO, width: int, height: int, dpi: Optional[int] = None,
+                 text: Optional[Dict[str, str]] = None, compress_level: int = 6):
+        """
+        Start the PNG and write its header chunks.
+        
+        Args:
+            fileobj: Binary file object to write to
+            width: Image width in pixels
+            height: Image height in pixels
+            dpi: Resolution stored in a pHYs chunk (None leaves it out)
+            text: Keywords and values stored in tEXt chunks
+            compress_level: zlib compression level
+        """
+        self.fileobj = fileobj
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._previous = np.zeros(width * RGBA_BYTES, dtype=np.uint8)
+        self._compressor = zlib.compressobj(compress_level)
+        self._pending = []
+        self._pending_size = 0
+        
+        fileobj.write(PNG_SIGNATURE)
+        self._write_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+        if dpi is not None:
+            pixels_per_metre = int(dpi / 0.0254 + 0.5)
+            self._write_chunk(b'pHYs', struct.pack('>IIB', pixels_per_metre, pixels_per_metre, 1))
+        for keyword, value in (text or {}).items():
+            self._write_chunk(b'tEXt', keyword.encode('latin-1') + b'\0' + value.encode('latin-1'))
+    
+    def _write_chunk(self, kind: bytes, data: bytes) -> None:
+        """Write one PNG chunk with its length and CRC."""
+        self.fileobj.write(struct.pack('>I', len(data)) + kind + data)
+        self.fileobj.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(kind))))
+    
+    def _add_compressed(self, data: bytes, flush: bool = False) -> None:
+        """Collect compressed bytes, writing an IDAT chunk once enough have arrived."""
+        if data:
+            self._pending.append(data)
+            self._pending_size += len(data)
+        if self._pending_size >= IDAT_CHUNK_SIZE or (flush and self._pending_size):
+            self._write_chunk(b'IDAT', b''.join(self._pending))
+            self._pending = []
+            self._pending_size = 0
+    
+    def write_rows(self, rows: np.ndarray) -> None:
+        """
+        Encode the next band of rows.
+        
+        Args:
+            rows: (n, width, 4) uint8 array of RGBA pixels
+        """
+        rows = rows.reshape(len(rows), self.width * RGBA_BYTES)
+        if self.rows_written + len(rows) > self.height:
+            raise ValueError(f"PNG has {self.height} rows; got {self.rows_written + len(rows)}")
+        for start in range(0, len(rows), FILTER_BLOCK_ROWS):
+            block = rows[start:start + FILTER_BLOCK_ROWS]
+            self._add_compressed(self._compressor.compress(filter_rows(block, self._previous).tobytes()))
+            self._previous = block[-1].copy()
+        self.rows_written += len(rows)
+    
+    def close(self) -> None:
+        """Finish the image data and write the closing chunk."""
+        if self.rows_written != self.height:
+            raise ValueError(f"PNG has {self.height} rows; only {self.rows_written} were written")
+        self._add_compressed(self._compressor.flush(), flush=True)
+        self._write_chunk(b'IEND', b'')
@@ -0,0 +1,138 @@
+"""
+Vector (SVG) output helpers for moral landscapes.
+
+In an SVG every polygon of the surface becomes a <path> element with its own
+style. Colouring the quads by a few height bands (height_bands()) leaves
+only a handful of distinct styles, which compact_svg() turns into shared
+CSS classes; together with rounded coordinates that keeps the file small.
+"""
+
+import re
+
+import numpy as np
+
+
+# Numbers with a fractional part inside SVG path data and polygon points
+_SVG_GEOMETRY = re.compile(rb'(\sd|\spoints)="([^"]*)"')
+_SVG_NUMBER = re.compile(rb'-?\d+\.\d+')
+_SVG_COMMAND_SPACE = re.compile(rb'\s*([MLCQZmlcqz])\s*')
+
+# Attributes and groups rewritten by compact_svg()
+_SVG_STYLE = re.compile(rb' style="([^"]*)"')
+_SVG_CLIP_PATH = re.compile(rb' clip-path="([^"]*)"')
+_SVG_LEAF_GROUP = re.compile(rb'(<g id="[^"]*">)((?:(?!<g[ >]|</g>).)*?)(</g>)', re.DOTALL)
+
+# Ids Matplotlib derives from svg.hashsalt (random when unset): markers, clip
+# paths, hatches, path collection entries and images, as definitions or references
+_SVG_HASHED_ID = re.compile(rb'(?<=id=")((?:[mph]|C[0-9a-f]+_[0-9a-f]+_|image)[0-9a-f]{10})(?=")')
+_SVG_HASHED_REF = re.compile(rb'(?<=#)((?:[mph]|C[0-9a-f]+_[0-9a-f]+_|image)[0-9a-f]{10})(?=[")])')
+
+
+def height_bands(Z: np.ndarray, bands: int) -> np.ndarray:
+    """
+    Quantize heights into equally spaced colour bands.
+    
+    Args:
+        Z: Heights (any shape)
+        bands: Number of bands
+        
+    Returns:
+        Integer array of band indices in [0, bands), shaped like Z
+    """
+    z_min, z_max = float(Z.min()), float(Z.max())
+    span = z_max - z_min or 1.0
+    return np.minimum(((Z - z_min) / span * bands).astype(np.intp), bands - 1)
+
+
+def round_svg_coordinates(svg: bytes, digits: int = 2) -> bytes:
+    """
+    Round the coordinates in SVG path data and polygon points.
+    
+    Path data is also stripped of the line breaks and spaces Matplotlib puts
+    around its commands.
+    
+    Args:
+        svg: SVG document
+        digits: Decimal places to keep
+        
+    Returns:
+        SVG document with shorter coordinates
+    """
+    def round_number(match):
+        text = b'%.*f' % (digits, float(match.group(0)))
+        text = text.rstrip(b'0').rstrip(b'.')
+        return b'0' if text in (b'-0', b'') else text
+    
+    def round_attribute(match):
+        data = _SVG_NUMBER.sub(round_number, match.group(2))
+        data = _SVG_COMMAND_SPACE.sub(rb'\1', data).strip()
+        return match.group(1) + b'="' + data + b'"'
+    
+    return _SVG_GEOMETRY.sub(round_attribute, svg)
+
+
+def number_svg_ids(svg: bytes) -> bytes:
+    """
+    Replace Matplotlib's hashed SVG ids with numbers in document order.
+    
+    The hashes depend on rcParams['svg.hashsalt'], which is random unless
+    set and cannot be set per figure without racing other threads. Numbered
+    ids are the same on every render, whatever the salt.
+    
+    Args:
+        svg: SVG document written by Matplotlib
+        
+    Returns:
+        SVG document with short, reproducible ids
+    """
+    numbers: dict = {}
+    for hashed in _SVG_HASHED_ID.findall(svg):
+        numbers.setdefault(hashed, b'%s%x' % (hashed[:-10], len(numbers)))
+    
+    def renumber(match):
+        return numbers.get(match.group(1), match.group(1))
+    
+    return _SVG_HASHED_REF.sub(renumber, _SVG_HASHED_ID.sub(renumber, svg))
+
+
+def compact_svg(svg: bytes, digits: int = 2, min_uses: int = 4) -> bytes:
+    """
+    Shrink a Matplotlib SVG without changing how it renders.
+    
+    Coordinates are rounded, hashed ids are numbered (number_svg_ids()),
+    inline styles used at least min_uses times become CSS classes, and a
+    clip path shared by every element of a group is set once on the group.
+    
+    Args:
+        svg: SVG document written by Matplotlib
+        digits: Decimal places to keep in coordinates
+        min_uses: Inline styles repeated at least this often become classes
+        
+    Returns:
+        Compacted SVG document
+    """
+    svg = number_svg_ids(round_svg_coordinates(svg, digits))
+    
+    def hoist_clip_path(match):
+        body = match.group(2)
+        clip_paths = _SVG_CLIP_PATH.findall(body)
+        if len(set(clip_paths)) != 1 or body.count(b'<') != len(clip_paths):
+            return match.group(0)
+        return match.group(1)[:-1] + b' clip-path="' + clip_paths[0] + b'">' + _SVG_CLIP_PATH.sub(b'', body) + match.group(3)
+    
+    svg = _SVG_LEAF_GROUP.sub(hoist_clip_path, svg)
+    
+    counts: dict = {}
+    for style in _SVG_STYLE.findall(svg):
+        counts[style] = counts.get(style, 0) + 1
+    classes = {style: b'c%d' % i for i, style in enumerate(
+        sorted((style for style, count in counts.items() if count >= min_uses), key=lambda st: -counts[st])
+    )}
+    if not classes:
+        return svg
+    
+    svg = _SVG_STYLE.sub(
+        lambda m: b' class="' + classes[m.group(1)] + b'"' if m.group(1) in classes else m.group(0), svg
+    )
+    rules = b''.join(b'.' + name + b'{' + style + b'}' for style, name in classes.items())
+    return svg.replace(b'</style>', rules + b'</style>', 1)
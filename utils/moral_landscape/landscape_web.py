@@ -0,0 +1,142 @@
+"""
+Interactive web export for moral landscapes.
+
+Writes the height field as a compact quantized binary buffer plus a JSON
+document with its range metadata, colours, labels and actions. The static
+viewer in assets/landscape-viewer/ loads both and draws the landscape with
+WebGL, so readers can rotate it in the browser.
+
+Payload layout:
+    <name>.mesh.bin   rows * cols little-endian uint16 heights, row-major
+                      (row i is y_range[0] + i * dy, column j is x_range[0] + j * dx)
+    <name>.mesh.json  metadata; height = z_range[0] + q / 65535 * (z_range[1] - z_range[0])
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+from matplotlib.cm import ScalarMappable
+from matplotlib.colors import to_hex
+
+from landscape_options import WEB_SUFFIXES
+from moral_landscape_generator import LABEL_COLORS, MoralLandscape, default_label_position
+
+
+# Bumped whenever the payload layout changes
+WEB_FORMAT_VERSION = 1
+
+# Colours sampled from the colormap; the viewer interpolates between them
+COLORMAP_STOPS = 64
+
+
+def quantize_heights(Z: np.ndarray) -> Tuple[bytes, float, float]:
+    """
+    Quantize a height grid to 16-bit integers spanning its range.
+    
+    Args:
+        Z: Height grid
+        
+    Returns:
+        Tuple of (little-endian uint16 buffer, minimum height, maximum height)
+    """
+    z_min, z_max = float(Z.min()), float(Z.max())
+    span = z_max - z_min
+    scale = 65535 / span if span > 0 else 0.0
+    quantized = np.rint((Z - z_min) * scale).astype('<u2')
+    return quantized.tobytes(), z_min, z_max
+
+
+def colormap_stops(colormap: str, stops: int = COLORMAP_STOPS) -> List[str]:
+    """
+    Sample a Matplotlib colormap into evenly spaced hex colours.
+    
+    Args:
+        colormap: Matplotlib colormap name
+        stops: Number of colours
+        
+    Returns:
+        List of '#rrggbb' strings from the low to the high end
+    """
+    cmap = ScalarMappable(cmap=colormap).get_cmap()
+    return [to_hex(cmap(value)) for value in np.linspace(0, 1, stops)]
+
+
+def build_web_payload(
+    landscape: MoralLandscape,
+    labels: List[dict],
+    actions: List[dict],
+    heights_file: str,
+    title: str = '',
+    axes: Dict[str, str] = None,
+    colormap: str = 'viridis',
+    view: Tuple[float, float] = (25, 45)
+) -> Tuple[dict, bytes]:
+    """
+    Build the viewer payload for a generated landscape.
+    
+    Args:
+        landscape: MoralLandscape after generate_landscape()
+        labels: Keyword arguments of add_label() for every label
+        actions: Keyword arguments of add_action_arrow() plus 'path' for every action
+        heights_file: Name of the binary heights file, relative to the JSON
+        title: Plot title
+        axes: Axis labels keyed 'xlabel', 'ylabel' and 'zlabel'
+        colormap: Matplotlib colormap name
+        view: Initial (elevation, azimuth) in degrees
+        
+    Returns:
+        Tuple of (JSON-serializable metadata, binary heights)
+    """
+    if landscape.Z is None:
+        raise ValueError("Must call generate_landscape first")
+    heights, z_min, z_max = quantize_heights(landscape.Z)
+    
+    label_entries = []
+    for label in labels:
+        x, y, z = label['x'], label['y'], label['z']
+        position = label['label_position'] or default_label_position(x, y, z, label['label_type'])
+        color, marker_color = LABEL_COLORS.get(label['label_type'], LABEL_COLORS['neutral'])
+        label_entries.append({
+            'text': label['label'],
+            'type': label['label_type'],
+            'point': [float(x), float(y), float(z)],
+            'position': [float(v) for v in position],
+            'color': to_hex(color),
+            'marker': to_hex(marker_color),
+        })
+    
+    # Terrain-following actions are sampled exactly as the static render draws them
+    terrain = [action for action in actions if action['path'] != 'straight']
+    terrain_points = iter(landscape.action_path_points(terrain))
+    action_entries = []
+    for action in actions:
+        if action['path'] == 'straight':
+            points = [action['source_coords'], action['target_coords']]
+        else:
+            points = next(terrain_points).tolist()
+        alpha = action.get('alpha')
+        action_entries.append({
+            'text': action['label'],
+            'points': [[round(float(v), 4) for v in point] for point in points],
+            'color': to_hex(action.get('color') or 'darkblue'),
+            'alpha': 1.0 if alpha is None else alpha,
+            'dashed': (action.get('linestyle') or '--') not in ('-', 'solid'),
+        })
+    
+    rows, cols = landscape.Z.shape
+    metadata = {
+        'version': WEB_FORMAT_VERSION,
+        'title': title,
+        'axes': axes or {},
+        'heights': heights_file,
+        'encoding': 'uint16le',
+        'shape': [rows, cols],
+        'x_range': [float(v) for v in landscape.x_range],
+        'y_range': [float(v) for v in landscape.y_range],
+        'z_range': [z_min, z_max],
+        'colormap': colormap_stops(colormap),
+        'view': {'elevation': float(view[0]), 'azimuth': float(view[1])},
+        'labels': label_entries,
+        'actions': action_entries,
+    }
+    return metadata, heights
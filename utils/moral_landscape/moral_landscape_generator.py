@@ -5,28 +5,145 @@ A tool for creating 3D visualizations of moral landscapes for philosophical disc
 Allows labeling of peaks (moral highs) and troughs (moral lows).
 """
 
+import io
+import hashlib
+import tempfile
+from pathlib import Path
+
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib import cm
-from mpl_toolkits.mplot3d import Axes3D
-from typing import List, Tuple, Optional
+import matplotlib
+from matplotlib import cm, rcParams
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg, RendererAgg
+from matplotlib.patches import FancyArrowPatch
+from matplotlib.colors import to_rgba
+from matplotlib.transforms import Bbox
+from mpl_toolkits.mplot3d import Axes3D, proj3d
+from matplotlib.collections import LineCollection
+from mpl_toolkits.mplot3d.art3d import Line3DCollection, Poly3DCollection
+from typing import BinaryIO, Dict, List, Tuple, Optional
+
+from array_cache import ArrayCache
+from landscape_options import ACTION_PATH_MODES, GRID_STORAGE, PLOT_MODES, TILE_MEMORY_BUDGET
+from landscape_png import RGBA_BYTES, PNGStreamWriter
+from landscape_noise import NOISE_CACHE, LATTICE_CACHE, noise_blocks, noise_field, value_noise
+from landscape_vector import compact_svg, height_bands
+
+
+# Offset in points of 2D labels whose position is straight above or below the point
+LABEL_OFFSET_2D = 28
+
+# Cells per side of the resampled grid drawn by banded (vector) surfaces,
+# one fewer than the 50 rows and columns plot_surface() draws
+VECTOR_GRID_CELLS = 49
+
+# Grid rows that noise is added to at once
+NOISE_BLOCK_ROWS = 256
+
+# (label colour, marker colour) for each label type
+LABEL_COLORS = {
+    'peak': ('darkgreen', 'lime'),
+    'trough': ('darkred', 'red'),
+    'neutral': ('darkorange', 'yellow'),
+}
+
+# Caches of X/Y grid axes, keyed by (x_range, y_range, resolution), and of
+# synthesized Z fields, keyed by a digest of every input that shapes them
+GRID_CACHE = ArrayCache(max_bytes=64 * 1024 * 1024)
+SURFACE_CACHE = ArrayCache(max_bytes=256 * 1024 * 1024)
+
+
+def cache_stats() -> dict:
+    """
+    Get hit/miss statistics of the landscape synthesis caches in this process.
+    
+    Returns:
+        Dictionary mapping cache name to its ArrayCache.stats()
+    """
+    return {
+        'grids': GRID_CACHE.stats(),
+        'surfaces': SURFACE_CACHE.stats(),
+        'noise': NOISE_CACHE.stats(),
+        'lattices': LATTICE_CACHE.stats(),
+    }
+
+
+def clear_caches() -> None:
+    """Empty the landscape synthesis caches in this process."""
+    for cache in (GRID_CACHE, SURFACE_CACHE, NOISE_CACHE, LATTICE_CACHE):
+        cache.clear()
+
+
+def default_label_position(x: float, y: float, z: float, label_type: str) -> Tuple[float, float, float]:
+    """
+    Get where add_label() places a label when no position is given.
+    
+    Labels go above peaks, below troughs, and to the side of neutrals.
+    
+    Args:
+        x, y, z: Coordinates of the labelled point
+        label_type: 'peak', 'trough', or 'neutral'
+        
+    Returns:
+        (x, y, z) position of the label text
+    """
+    if label_type == 'peak':
+        return (x, y, z + 2.5)
+    if label_type == 'trough':
+        return (x, y, z - 2.5)
+    return (x + 1.5, y, z + 1.0)
+
+
+class Arrow3D(FancyArrowPatch):
+    """A 2D arrow patch whose endpoints are projected from 3D data coordinates."""
+    
+    def __init__(self, xs, ys, zs, *args, **kwargs):
+        super().__init__((0,0), (0,0), *args, **kwargs)
+        self._verts3d = xs, ys, zs
+    
+    def do_3d_projection(self, renderer=None):
+        xs3d, ys3d, zs3d = self._verts3d
+        xs, ys, zs = proj3d.proj_transform(xs3d, ys3d, zs3d, self.axes.M)
+        self.set_positions((xs[0],ys[0]),(xs[1],ys[1]))
+        return np.min(zs)
 
 
 class MoralLandscape:
-    """Generate and visualize 3D moral landscapes."""
+    """
+    Generate and visualize 3D moral landscapes.
     
-    def __init__(self, resolution: int = 100):
+    Each instance owns its Figure and Agg canvas and never touches pyplot's
+    global "current figure" state while plotting or saving, so separate
+    instances can be rendered concurrently from different threads. Only
+    show() hands the figure to pyplot, and must be called from the main
+    thread.
+    """
+    
+    def __init__(self, resolution: int = 100, headless: bool = False):
         """
         Initialize the moral landscape generator.
         
         Args:
             resolution: Grid resolution for the landscape (higher = smoother)
+            headless: Never import pyplot. Headless landscapes cannot be
+                displayed with show() and are meant for batch jobs, threads
+                and worker processes.
         """
         self.resolution = resolution
+        self.headless = headless
         self.fig = None
+        self.canvas = None
         self.ax = None
         self.surface = None
+        self.plot_mode = None
         
+        # Inputs of the last generated field, used by sample()
+        self.X = self.Y = self.Z = None
+        self.x_range = self.y_range = None
+        self.kernels = None
+        self.noise_level = 0.0
+        self._noise_source = None
+    
     def generate_landscape(
         self,
         x_range: Tuple[float, float] = (-5, 5),
@@ -34,7 +151,12 @@ class MoralLandscape:
         peaks: Optional[List[Tuple[float, float, float]]] = None,
         troughs: Optional[List[Tuple[float, float, float]]] = None,
         neutrals: Optional[List[Tuple[float, float, float]]] = None,
-        noise_level: float = 0.0
+        noise_level: float = 0.0,
+        seed: Optional[int] = None,
+        noise_type: str = 'white',
+        noise_scale: float = 8.0,
+        dtype=np.float64,
+        storage: str = 'memory'
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         Generate a moral landscape with specified peaks, troughs, and neutral points.
@@ -42,50 +164,187 @@ class MoralLandscape:
         Args:
             x_range: Range for x-axis (e.g., different ethical dimensions)
             y_range: Range for y-axis (e.g., different scenarios)
-            peaks: List of (x, y, height) tuples for moral peaks
-            troughs: List of (x, y, depth) tuples for moral troughs
-            neutrals: List of (x, y, height) tuples for neutral moral points
+            peaks: (x, y, height) rows for moral peaks, as a list of tuples
+                or an (N, 3) array
+            troughs: (x, y, depth) rows for moral troughs
+            neutrals: (x, y, height) rows for neutral moral points
             noise_level: Amount of random variation to add
+            seed: Seed for the noise field. With a seed the same inputs always
+                produce the same landscape; without one the global NumPy RNG
+                is used and every call differs.
+            noise_type: 'white' for per-point noise or 'value' for smooth noise
+            noise_scale: Lattice spacing in grid points for 'value' noise
+            dtype: Floating-point type of Z. float32 halves the grid and is
+                plenty for drawing; float64 keeps full precision for analysis.
+            storage: 'memory' for an ordinary array, or 'memmap' to back Z with
+                an unlinked temporary file through np.memmap, so very large
+                grids are paged by the OS instead of held in RAM
             
         Returns:
-            Tuple of (X, Y, Z) arrays for plotting
+            Tuple of (X, Y, Z) arrays for plotting. X is a (1, resolution) row
+            and Y a (resolution, 1) column that broadcast against Z; use
+            np.broadcast_arrays() where full grids are needed. X and Y, and Z
+            when the noise is seeded or disabled and storage is 'memory', are
+            shared with later calls through GRID_CACHE and SURFACE_CACHE and
+            are therefore read-only.
         """
-        # Create grid
-        x = np.linspace(x_range[0], x_range[1], self.resolution)
-        y = np.linspace(y_range[0], y_range[1], self.resolution)
-        X, Y = np.meshgrid(x, y)
+        dtype = np.dtype(dtype)
+        if dtype.kind != 'f':
+            raise ValueError(f"Landscape dtype must be a floating-point type, got {dtype}")
+        if storage not in GRID_STORAGE:
+            raise ValueError(f"Unknown grid storage {storage!r}; expected one of {GRID_STORAGE}")
         
-        # Initialize with base level
-        Z = np.zeros_like(X)
-        
-        # Add peaks (Gaussian hills)
         if peaks is None:
             peaks = [(0, 0, 5)]  # Default peak at center
-            
-        for peak_x, peak_y, height in peaks:
-            Z += height * np.exp(-((X - peak_x)**2 + (Y - peak_y)**2) / 2)
-        
-        # Add troughs (inverted Gaussians)
         if troughs is None:
             troughs = []
-            
-        for trough_x, trough_y, depth in troughs:
-            Z -= depth * np.exp(-((X - trough_x)**2 + (Y - trough_y)**2) / 2)
-        
-        # Add neutral points (flat plateaus at given height)
         if neutrals is None:
             neutrals = []
-            
-        for neutral_x, neutral_y, height in neutrals:
-            # Create a flatter Gaussian for neutral points
-            Z += height * np.exp(-((X - neutral_x)**2 + (Y - neutral_y)**2) / 4)
+        peaks, troughs, neutrals = (np.asarray(points, dtype=float).reshape(-1, 3)
+                                    for points in (peaks, troughs, neutrals))
+        
+        # Create grid axes (shared between renders with the same geometry)
+        grid_key = (tuple(x_range), tuple(y_range), self.resolution)
+        grid = GRID_CACHE.get(grid_key)
+        if grid is None:
+            x = np.linspace(x_range[0], x_range[1], self.resolution)
+            y = np.linspace(y_range[0], y_range[1], self.resolution)
+            grid = GRID_CACHE.put(grid_key, (x[None, :], y[:, None]))
+        X, Y = grid
+        shape = (self.resolution, self.resolution)
+        
+        # Record the analytic field for sample(): rows of (x, y, amplitude, width)
+        self.x_range = tuple(x_range)
+        self.y_range = tuple(y_range)
+        self.kernels = np.concatenate([
+            np.column_stack([points[:, :2], sign * points[:, 2], np.full(len(points), width)])
+            for points, sign, width in ((peaks, 1, 2.0), (troughs, -1, 2.0), (neutrals, 1, 4.0))
+        ])
+        self.noise_level = noise_level
+        self._noise_source = None
+        if noise_level > 0 and seed is not None:
+            self._noise_source = (shape, seed, noise_type, noise_scale)
         
-        # Add some noise for realism
+        # Reuse a previously synthesized surface unless the noise is unseeded
+        cacheable = (noise_level <= 0 or seed is not None) and storage == 'memory'
+        if cacheable:
+            surface_key = hashlib.sha256(repr((
+                grid_key, self.kernels.tobytes(),
+                noise_level, seed, noise_type, noise_scale, dtype.str
+            )).encode('utf-8')).hexdigest()
+            Z = SURFACE_CACHE.get(surface_key)
+            if Z is not None:
+                self.X, self.Y, self.Z = X, Y, Z
+                return X, Y, Z
+        
+        if storage == 'memmap':
+            # The file is unlinked at once; its pages live as long as the mapping
+            with tempfile.TemporaryFile(prefix='moral-landscape-') as backing:
+                Z = np.memmap(backing, dtype=dtype, mode='w+', shape=shape)
+        else:
+            Z = np.empty(shape, dtype=dtype)
+        
+        # Peaks and troughs are Gaussian hills and pits, neutrals flatter
+        # Gaussians. A Gaussian is separable, exp(-(dx^2 + dy^2) / w) =
+        # exp(-dx^2 / w) * exp(-dy^2 / w), so each feature is a pair of 1-D
+        # profiles and their sum over all features is one matrix product of
+        # (rows x features) and (features x columns), with no grid-sized
+        # temporaries per feature.
+        kernel_x, kernel_y, amplitude, width = self.kernels.T
+        profile_x = np.exp(-(X.ravel() - kernel_x[:, None]) ** 2 / width[:, None])
+        profile_y = np.exp(-(Y.ravel() - kernel_y[:, None]) ** 2 / width[:, None]) * amplitude[:, None]
+        np.matmul(profile_y.T.astype(dtype), profile_x.astype(dtype), out=Z)
+        
+        # Add some noise for realism, in row blocks so that neither the scaled
+        # noise nor (when seeded) the noise field itself is held at full size
         if noise_level > 0:
-            Z += noise_level * np.random.randn(*Z.shape)
+            if seed is not None:
+                blocks = noise_blocks(Z.shape, seed, noise_type, noise_scale, NOISE_BLOCK_ROWS)
+            else:
+                if noise_type == 'value':
+                    noise = value_noise(Z.shape, np.random.randint(2**31), noise_scale)
+                else:
+                    noise = np.random.randn(*Z.shape)
+                self._noise_source = noise
+                blocks = ((slice(start, start + NOISE_BLOCK_ROWS), noise[start:start + NOISE_BLOCK_ROWS])
+                          for start in range(0, Z.shape[0], NOISE_BLOCK_ROWS))
+            for rows, block in blocks:
+                Z[rows] += noise_level * block
+        
+        if cacheable:
+            SURFACE_CACHE.put(surface_key, Z)
+        self.X, self.Y, self.Z = X, Y, Z
         
         return X, Y, Z
     
+    def sample(
+        self,
+        xs,
+        ys,
+        method: str = 'analytic',
+        chunk_size: int = 4096
+    ) -> np.ndarray:
+        """
+        Evaluate the height of the last generated landscape at arbitrary points.
+        
+        Args:
+            xs, ys: Point coordinates (scalars or arrays, broadcast together)
+            method: 'analytic' sums every kernel exactly at each point and adds
+                bilinearly interpolated noise; 'grid' bilinearly interpolates
+                the generated Z grid (faster with many features, but off by
+                up to one grid cell on sharp peaks)
+            chunk_size: Points evaluated per vectorized block by 'analytic',
+                bounding the (points x kernels) temporaries
+            
+        Returns:
+            Array of heights with the broadcast shape of xs and ys
+        """
+        if self.Z is None:
+            raise ValueError("Must call generate_landscape first")
+        if method not in ('analytic', 'grid'):
+            raise ValueError(f"Unknown sampling method {method!r}; expected 'analytic' or 'grid'")
+        
+        xs, ys = np.broadcast_arrays(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+        shape = xs.shape
+        xs = xs.ravel()
+        ys = ys.ravel()
+        
+        if method == 'grid':
+            return self._interpolate_grid(self.Z, xs, ys).reshape(shape)
+        
+        kx, ky, amplitude, width = self.kernels.T
+        heights = np.empty(xs.size)
+        for start in range(0, xs.size, chunk_size):
+            stop = start + chunk_size
+            dx = xs[start:stop, None] - kx
+            dy = ys[start:stop, None] - ky
+            heights[start:stop] = np.exp(-(dx * dx + dy * dy) / width) @ amplitude
+        
+        if self.noise_level > 0:
+            noise = self._noise_source
+            if isinstance(noise, tuple):
+                noise = noise_field(*noise)
+            heights += self.noise_level * self._interpolate_grid(noise, xs, ys)
+        
+        return heights.reshape(shape)
+    
+    def _interpolate_grid(self, grid: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """Bilinearly interpolate a (resolution x resolution) grid at flat point arrays."""
+        last = self.resolution - 1
+        
+        def cell_positions(values, value_range):
+            position = (values - value_range[0]) / (value_range[1] - value_range[0]) * last
+            position = np.clip(position, 0, last)
+            cell = np.minimum(position.astype(np.intp), last - 1)
+            return cell, position - cell
+        
+        col, tx = cell_positions(xs, self.x_range)
+        row, ty = cell_positions(ys, self.y_range)
+        
+        top = grid[row, col] * (1 - tx) + grid[row, col + 1] * tx
+        bottom = grid[row + 1, col] * (1 - tx) + grid[row + 1, col + 1] * tx
+        return top * (1 - ty) + bottom * ty
+    
     def plot_landscape(
         self,
         X: np.ndarray,
@@ -96,30 +355,40 @@ class MoralLandscape:
         ylabel: str = "",
         zlabel: str = "Relative Moral Value",
         colormap: str = "RdYlGn",
-        figsize: Tuple[int, int] = (12, 9)
+        figsize: Tuple[int, int] = (12, 9),
+        color_bands: Optional[int] = None
     ):
         """
         Create a 3D plot of the moral landscape.
         
         Args:
-            X, Y, Z: Meshgrid arrays from generate_landscape
+            X, Y, Z: Arrays from generate_landscape (X and Y may be broadcastable axes)
             title: Plot title
             xlabel, ylabel, zlabel: Axis labels
             colormap: Matplotlib colormap name
             figsize: Figure size in inches
+            color_bands: Draw the surface as flat-coloured quads in this
+                many colour bands instead of plot_surface(), for compact
+                vector output
         """
-        self.fig = plt.figure(figsize=figsize)
+        # Build the figure directly on a private Agg canvas, bypassing pyplot
+        self.fig = Figure(figsize=figsize)
+        self.canvas = FigureCanvasAgg(self.fig)
         self.ax = self.fig.add_subplot(111, projection='3d', computed_zorder=False)
+        self.plot_mode = 'surface'
         
         # Plot surface
-        self.surface = self.ax.plot_surface(
-            X, Y, Z,
-            cmap=colormap,
-            alpha=0.8,
-            edgecolor='none',
-            antialiased=True,
-            zorder=0  # Surface at base layer, labels can be above or below
-        )
+        if color_bands is None:
+            self.surface = self.ax.plot_surface(
+                X, Y, Z,
+                cmap=colormap,
+                alpha=0.8,
+                edgecolor='none',
+                antialiased=True,
+                zorder=0  # Surface at base layer, labels can be above or below
+            )
+        else:
+            self.surface = self._plot_banded_surface(X, Y, Z, colormap, color_bands)
         
         # Labels and title
         
@@ -130,7 +399,110 @@ class MoralLandscape:
         
         # Better viewing angle
         self.ax.view_init(elev=25, azim=45)
+    
+    def plot_landscape_2d(
+        self,
+        X: np.ndarray,
+        Y: np.ndarray,
+        Z: np.ndarray,
+        mode: str = 'contour',
+        title: str = "Moral Landscape",
+        xlabel: str = "",
+        ylabel: str = "",
+        zlabel: str = "Relative Moral Value",
+        colormap: str = "RdYlGn",
+        figsize: Tuple[int, int] = (12, 9),
+        levels: int = 16
+    ):
+        """
+        Create a flat top-down plot of the moral landscape.
+        
+        Much cheaper to draw and encode than the 3D surface, for thumbnails
+        and overviews. Labels and actions added afterwards are drawn in 2D.
+        
+        Args:
+            X, Y, Z: Arrays from generate_landscape (X and Y may be broadcastable axes)
+            mode: 'contour' for filled contours or 'heatmap' for an image
+            title: Plot title
+            xlabel, ylabel: Axis labels
+            zlabel: Colorbar label
+            colormap: Matplotlib colormap name
+            figsize: Figure size in inches
+            levels: Number of contour levels in 'contour' mode
+        """
+        if mode not in PLOT_MODES or mode == 'surface':
+            raise ValueError(f"2D plot mode must be 'contour' or 'heatmap', got {mode!r}")
+        
+        self.fig = Figure(figsize=figsize)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot(111)
+        self.plot_mode = mode
+        
+        if mode == 'heatmap':
+            self.surface = self.ax.imshow(
+                Z,
+                cmap=colormap,
+                origin='lower',
+                extent=(X[0, 0], X[0, -1], Y[0, 0], Y[-1, 0]),
+                aspect='auto',
+                interpolation='nearest',
+                zorder=0
+            )
+        else:
+            # contourf() wants full grids; broadcasting the axes only makes views
+            X, Y, _ = np.broadcast_arrays(X, Y, Z)
+            self.surface = self.ax.contourf(X, Y, Z, levels=levels, cmap=colormap, zorder=0)
+            self.ax.contour(X, Y, Z, levels=levels, colors='black', linewidths=0.3, alpha=0.4, zorder=1)
+        
+        self.fig.colorbar(self.surface, ax=self.ax, label=zlabel, shrink=0.8)
+        self.ax.set_xlabel(xlabel, fontsize=10)
+        self.ax.set_ylabel(ylabel, fontsize=10)
+        self.ax.set_title(title, fontsize=14, fontweight='bold')
+    
+    def _plot_banded_surface(
+        self,
+        X: np.ndarray,
+        Y: np.ndarray,
+        Z: np.ndarray,
+        colormap: str,
+        bands: int
+    ) -> Poly3DCollection:
+        """
+        Draw the surface as quads with one flat colour per band.
+        
+        The surface is resampled onto a (VECTOR_GRID_CELLS + 1)-point square
+        grid, so it has no more quads than plot_surface() would draw. Each
+        quad is still its own polygon; the savings come from the few shared
+        colours, which compact_svg() turns into CSS classes.
+        """
+        xs = np.linspace(X[0, 0], X[0, -1], VECTOR_GRID_CELLS + 1)
+        ys = np.linspace(Y[0, 0], Y[-1, 0], VECTOR_GRID_CELLS + 1)
+        Xs, Ys = np.meshgrid(xs, ys)
+        if self.Z is Z:
+            Zs = self._interpolate_grid(Z, Xs.ravel(), Ys.ravel()).reshape(Xs.shape)
+        else:
+            # Not the generated field: sample rows and columns of the given grid
+            rows = np.linspace(0, Z.shape[0] - 1, VECTOR_GRID_CELLS + 1).round().astype(np.intp)
+            cols = np.linspace(0, Z.shape[1] - 1, VECTOR_GRID_CELLS + 1).round().astype(np.intp)
+            Xs, Ys, Zs = (grid[np.ix_(rows, cols)] for grid in np.broadcast_arrays(X, Y, Z))
+        
+        # One quad per cell, coloured by the band of its mean height
+        corners = [(slice(None, -1), slice(None, -1)), (slice(None, -1), slice(1, None)),
+                   (slice(1, None), slice(1, None)), (slice(1, None), slice(None, -1))]
+        verts = np.stack([np.stack([grid[corner].ravel() for corner in corners], axis=1)
+                          for grid in (Xs, Ys, Zs)], axis=2)
+        cell_bands = height_bands(verts[:, :, 2].mean(axis=1), bands)
         
+        cmap = cm.ScalarMappable(cmap=colormap).get_cmap()
+        colors = cmap((cell_bands + 0.5) / bands, alpha=0.8)
+        
+        # Edges in the face colour hide hairline seams between quads
+        surface = Poly3DCollection(verts, facecolors=colors, edgecolors=colors,
+                                   linewidths=0.3, zorder=0)
+        self.ax.add_collection3d(surface)
+        self.ax.auto_scale_xyz(X, Y, Z)
+        return surface
+    
     def add_label(
         self,
         x: float,
@@ -157,15 +529,11 @@ class MoralLandscape:
             raise ValueError("Must call plot_landscape first")
         
         # Color based on type
-        if label_type == 'peak':
-            color = 'darkgreen'
-            marker_color = 'lime'
-        elif label_type == 'trough':
-            color = 'darkred'
-            marker_color = 'red'
-        else:  # neutral
-            color = 'darkorange'
-            marker_color = 'yellow'
+        color, marker_color = LABEL_COLORS.get(label_type, LABEL_COLORS['neutral'])
+        
+        if self.plot_mode != 'surface':
+            self._add_label_2d(x, y, z, label, label_type, label_position, z_index, fontsize)
+            return
         
         # Calculate z-order for rendering
         # Base zorders: surface=0, markers=10, arrows=12, text=15
@@ -180,13 +548,7 @@ class MoralLandscape:
         
         # Auto-calculate label position if not provided
         if label_position is None:
-            # Place label above peaks, below troughs, and to the side for neutrals
-            if label_type == 'peak':
-                label_position = (x, y, z + 2.5)
-            elif label_type == 'trough':
-                label_position = (x, y, z - 2.5)
-            else:  # neutral
-                label_position = (x + 1.5, y, z + 1.0)
+            label_position = default_label_position(x, y, z, label_type)
         
         # Add text label with arrow
         self.ax.text(
@@ -205,20 +567,6 @@ class MoralLandscape:
         )
         
         # Draw arrow from label to point
-        from matplotlib.patches import FancyArrowPatch
-        from mpl_toolkits.mplot3d import proj3d
-        
-        class Arrow3D(FancyArrowPatch):
-            def __init__(self, xs, ys, zs, *args, **kwargs):
-                super().__init__((0,0), (0,0), *args, **kwargs)
-                self._verts3d = xs, ys, zs
-
-            def do_3d_projection(self, renderer=None):
-                xs3d, ys3d, zs3d = self._verts3d
-                xs, ys, zs = proj3d.proj_transform(xs3d, ys3d, zs3d, self.axes.M)
-                self.set_positions((xs[0],ys[0]),(xs[1],ys[1]))
-                return np.min(zs)
-        
         arrow = Arrow3D(
             [label_position[0], x],
             [label_position[1], y],
@@ -266,26 +614,16 @@ class MoralLandscape:
         linestyle = linestyle if linestyle is not None else '--'
         alpha = alpha if alpha is not None else 1.0
         
+        if self.plot_mode != 'surface':
+            points = np.array([source_coords, target_coords], dtype=float)
+            self._add_action_2d(points, label, z_index, to_rgba(color, alpha), linewidth, linestyle, fontsize)
+            return
+        
         # Calculate z-order for rendering
         # Actions use a different base z-order to distinguish from labels
         arrow_zorder = 20 if z_index is None else 20 + (z_index * 5)
         text_zorder = 22 if z_index is None else 22 + (z_index * 5)
         
-        # Draw arrow from source to target
-        from matplotlib.patches import FancyArrowPatch
-        from mpl_toolkits.mplot3d import proj3d
-        
-        class Arrow3D(FancyArrowPatch):
-            def __init__(self, xs, ys, zs, *args, **kwargs):
-                super().__init__((0,0), (0,0), *args, **kwargs)
-                self._verts3d = xs, ys, zs
-
-            def do_3d_projection(self, renderer=None):
-                xs3d, ys3d, zs3d = self._verts3d
-                xs, ys, zs = proj3d.proj_transform(xs3d, ys3d, zs3d, self.axes.M)
-                self.set_positions((xs[0],ys[0]),(xs[1],ys[1]))
-                return np.min(zs)
-        
         # Action arrows with customizable styling
         arrow = Arrow3D(
             [source_coords[0], target_coords[0]],
@@ -324,22 +662,517 @@ class MoralLandscape:
             zorder=text_zorder
         )
     
+    def steepest_paths(
+        self,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        max_steps: Optional[int] = None
+    ) -> List[np.ndarray]:
+        """
+        Trace steepest-ascent or steepest-descent paths for many actions at once.
+        
+        Each path starts at its source and climbs (if the target is higher) or
+        descends (if lower) along the gradient of the Z grid, one grid cell per
+        step, until it reaches the target, stops improving, or leaves the
+        landscape. All paths advance together as one vectorized step.
+        
+        Args:
+            sources: (N, 3) array of source coordinates
+            targets: (N, 3) array of target coordinates
+            max_steps: Step limit (default: four times the resolution)
+            
+        Returns:
+            List of N (K, 2) arrays of (x, y) points, each ending at its target
+        """
+        if self.Z is None:
+            raise ValueError("Must call generate_landscape first")
+        sources = np.asarray(sources, dtype=float).reshape(-1, 3)
+        targets = np.asarray(targets, dtype=float).reshape(-1, 3)
+        max_steps = max_steps or 4 * self.resolution
+        
+        x_step = (self.x_range[1] - self.x_range[0]) / (self.resolution - 1)
+        y_step = (self.y_range[1] - self.y_range[0]) / (self.resolution - 1)
+        step = min(x_step, y_step)
+        grad_y, grad_x = np.gradient(self.Z, y_step, x_step)
+        
+        direction = np.where(targets[:, 2] >= sources[:, 2], 1.0, -1.0)
+        position = sources[:, :2].copy()
+        height = self.sample(position[:, 0], position[:, 1], method='grid')
+        active = np.ones(len(sources), dtype=bool)
+        history = [position.copy()]
+        
+        for _ in range(max_steps):
+            if not active.any():
+                break
+            gx = self._interpolate_grid(grad_x, position[:, 0], position[:, 1])
+            gy = self._interpolate_grid(grad_y, position[:, 0], position[:, 1])
+            norm = np.hypot(gx, gy)
+            
+            moved = position + step * direction[:, None] * np.stack([gx, gy], axis=1) / np.maximum(norm, 1e-12)[:, None]
+            moved_height = self.sample(moved[:, 0], moved[:, 1], method='grid')
+            
+            inside = ((moved[:, 0] >= self.x_range[0]) & (moved[:, 0] <= self.x_range[1]) &
+                      (moved[:, 1] >= self.y_range[0]) & (moved[:, 1] <= self.y_range[1]))
+            improving = (moved_height - height) * direction > 0
+            active &= (norm > 1e-9) & inside & improving
+            
+            position = np.where(active[:, None], moved, position)
+            height = np.where(active, moved_height, height)
+            active &= np.hypot(*(targets[:, :2] - position).T) > step
+            history.append(np.where(active[:, None], position, np.nan))
+        
+        trace = np.stack(history, axis=1)
+        paths = []
+        for i in range(len(sources)):
+            points = trace[i][~np.isnan(trace[i, :, 0])]
+            # Finish with a straight run (in x/y) from where the climb stopped to the target
+            gap = np.hypot(*(targets[i, :2] - points[-1]))
+            count = max(int(np.ceil(gap / step)), 1)
+            tail = points[-1] + np.linspace(0, 1, count + 1)[1:, None] * (targets[i, :2] - points[-1])
+            paths.append(np.vstack([points, tail]))
+        return paths
+    
+    def action_path_points(self, actions: List[Dict], samples: int = 64) -> List[np.ndarray]:
+        """
+        Compute the 3D points of terrain-following action paths.
+        
+        Args:
+            actions: Dicts with 'source_coords', 'target_coords' and 'path'
+                ('surface' or 'steepest'), as accepted by add_action_paths()
+            samples: Points per 'surface' path
+            
+        Returns:
+            List of (K, 3) arrays of path points on the surface, one per action
+        """
+        if self.Z is None:
+            raise ValueError("Must call generate_landscape first")
+        if not actions:
+            return []
+        
+        sources = np.array([a['source_coords'] for a in actions], dtype=float)
+        targets = np.array([a['target_coords'] for a in actions], dtype=float)
+        
+        # Paths in (x, y): straight lines for 'surface', gradient traces for 'steepest'
+        t = np.linspace(0, 1, samples)[:, None]
+        paths_xy = [sources[i, :2] + t * (targets[i, :2] - sources[i, :2]) for i in range(len(actions))]
+        steepest = [i for i, a in enumerate(actions) if a.get('path') == 'steepest']
+        if steepest:
+            for i, path in zip(steepest, self.steepest_paths(sources[steepest], targets[steepest])):
+                paths_xy[i] = path
+        
+        # One batched height lookup for every point of every path
+        points = np.concatenate(paths_xy)
+        heights = self.sample(points[:, 0], points[:, 1])
+        bounds = np.cumsum([0] + [len(path) for path in paths_xy])
+        return [np.column_stack([points[a:b], heights[a:b]]) for a, b in zip(bounds[:-1], bounds[1:])]
+    
+    def add_action_paths(
+        self,
+        actions: List[Dict],
+        samples: int = 64
+    ):
+        """
+        Add action arrows that follow the terrain instead of cutting through it.
+        
+        Paths for all actions are sampled together with one batched height
+        lookup, and the lines are drawn as one Line3DCollection per z_index
+        rather than one artist per segment.
+        
+        Args:
+            actions: Dicts with the keyword arguments of add_action_arrow()
+                ('source_coords', 'target_coords', 'label', and optionally
+                'z_index', 'color', 'linewidth', 'linestyle', 'alpha',
+                'fontsize'), plus 'path': 'surface' to follow the surface
+                along the straight line in (x, y), 'steepest' to follow
+                steepest_paths(), or 'straight' for a plain 3D arrow
+            samples: Points per 'surface' path
+        """
+        if self.ax is None:
+            raise ValueError("Must call plot_landscape first")
+        
+        straight = [a for a in actions if a.get('path', 'surface') == 'straight']
+        terrain = [a for a in actions if a.get('path', 'surface') != 'straight']
+        for action in straight:
+            self.add_action_arrow(**{k: v for k, v in action.items() if k != 'path'})
+        if not terrain:
+            return
+        
+        paths = self.action_path_points(terrain, samples)
+        
+        groups: Dict[Optional[int], List[int]] = {}
+        for i, action in enumerate(terrain):
+            groups.setdefault(action.get('z_index'), []).append(i)
+        
+        for z_index, members in groups.items():
+            arrow_zorder = 20 if z_index is None else 20 + (z_index * 5)
+            text_zorder = 22 if z_index is None else 22 + (z_index * 5)
+            
+            styles = []
+            for i in members:
+                action = terrain[i]
+                color = action.get('color') or 'darkblue'
+                alpha = action.get('alpha')
+                styles.append((
+                    to_rgba(color, 1.0 if alpha is None else alpha),
+                    action.get('linewidth') or 2,
+                    action.get('linestyle') or '--'
+                ))
+            
+            if self.plot_mode != 'surface':
+                for i, (rgba, linewidth, linestyle) in zip(members, styles):
+                    action = terrain[i]
+                    self._add_action_2d(paths[i], action['label'], z_index, rgba, linewidth, linestyle,
+                                        action.get('fontsize') or 10)
+                continue
+            
+            self.ax.add_collection3d(Line3DCollection(
+                [paths[i] for i in members],
+                colors=[style[0] for style in styles],
+                linewidths=[style[1] for style in styles],
+                linestyles=[style[2] for style in styles],
+                zorder=arrow_zorder
+            ))
+            
+            for i, (rgba, linewidth, _) in zip(members, styles):
+                action = terrain[i]
+                path = paths[i]
+                
+                # Arrowhead on the final segment of the path
+                self.ax.add_artist(Arrow3D(
+                    path[-2:, 0], path[-2:, 1], path[-2:, 2],
+                    mutation_scale=25,
+                    lw=linewidth,
+                    arrowstyle='-|>',
+                    color=rgba,
+                    zorder=arrow_zorder
+                ))
+                
+                # Label slightly above the middle of the path
+                mid_x, mid_y, mid_z = path[len(path) // 2]
+                self.ax.text(
+                    mid_x,
+                    mid_y,
+                    mid_z + 0.5,
+                    action['label'],
+                    fontsize=action.get('fontsize') or 10,
+                    fontstyle='italic',
+                    color=rgba[:3],
+                    ha='center',
+                    va='center',
+                    bbox=dict(boxstyle='round,pad=0.5', facecolor='lightyellow',
+                             edgecolor=rgba[:3], linewidth=2, alpha=rgba[3]),
+                    zorder=text_zorder
+                )
+    
+    def _add_label_2d(
+        self,
+        x: float,
+        y: float,
+        z: float,
+        label: str,
+        label_type: str,
+        label_position: Optional[Tuple[float, float, float]],
+        z_index: Optional[int],
+        fontsize: int
+    ):
+        """Draw a label of a flat plot: the 3D label position projected onto the plane."""
+        color, marker_color = LABEL_COLORS.get(label_type, LABEL_COLORS['neutral'])
+        marker_zorder = 10 if z_index is None else 10 + (z_index * 5)
+        text_zorder = 15 if z_index is None else 15 + (z_index * 5)
+        
+        if label_position is None:
+            label_position = default_label_position(x, y, z, label_type)
+        
+        # A label straight above or below its point keeps that direction on screen
+        if np.hypot(label_position[0] - x, label_position[1] - y) < 1e-9:
+            direction = 1 if label_position[2] >= z else -1
+            text_position, text_coords = (0, direction * LABEL_OFFSET_2D), 'offset points'
+        else:
+            text_position, text_coords = (label_position[0], label_position[1]), 'data'
+        
+        self.ax.scatter([x], [y], color=marker_color, s=150, marker='*',
+                        edgecolors='black', linewidths=2, zorder=marker_zorder)
+        self.ax.annotate(
+            label,
+            xy=(x, y),
+            xytext=text_position,
+            textcoords=text_coords,
+            fontsize=fontsize,
+            fontweight='bold',
+            color='black',
+            ha='center',
+            va='center',
+            bbox=dict(boxstyle='round,pad=0.6', facecolor='white',
+                      edgecolor=color, linewidth=2.5, alpha=0.95),
+            arrowprops=dict(arrowstyle='-|>', color=color, lw=2, mutation_scale=20),
+            zorder=text_zorder
+        )
+    
+    def _add_action_2d(
+        self,
+        points: np.ndarray,
+        label: str,
+        z_index: Optional[int],
+        rgba: Tuple[float, float, float, float],
+        linewidth: float,
+        linestyle: str,
+        fontsize: int
+    ):
+        """Draw an action of a flat plot along the (x, y) projection of its path."""
+        arrow_zorder = 20 if z_index is None else 20 + (z_index * 5)
+        text_zorder = 22 if z_index is None else 22 + (z_index * 5)
+        
+        points = np.asarray(points)[:, :2]
+        self.ax.add_collection(LineCollection(
+            [points[:-1]] if len(points) > 2 else [],
+            colors=[rgba], linewidths=linewidth, linestyles=linestyle, zorder=arrow_zorder
+        ))
+        self.ax.annotate(
+            '',
+            xy=points[-1],
+            xytext=points[-2] if len(points) > 2 else points[0],
+            arrowprops=dict(arrowstyle='-|>', color=rgba, lw=linewidth, linestyle=linestyle,
+                            mutation_scale=25),
+            zorder=arrow_zorder
+        )
+        
+        middle = points[len(points) // 2] if len(points) > 2 else points.mean(axis=0)
+        self.ax.text(
+            middle[0],
+            middle[1],
+            label,
+            fontsize=fontsize,
+            fontstyle='italic',
+            color=rgba[:3],
+            ha='center',
+            va='center',
+            bbox=dict(boxstyle='round,pad=0.5', facecolor='lightyellow',
+                      edgecolor=rgba[:3], linewidth=2, alpha=rgba[3]),
+            zorder=text_zorder
+        )
+    
     def show(self):
-        """Display the plot."""
-        plt.tight_layout()
+        """
+        Display the plot in an interactive pyplot window.
+        
+        pyplot is only imported here. plt.figure() builds the pyplot figure
+        through a FigureClass that returns the landscape's own figure, so
+        pyplot gives it a canvas and manager of the active backend; plotting
+        stays independent of pyplot's global state until the figure is
+        actually displayed.
+        """
+        if self.fig is None:
+            raise ValueError("Must create a plot first")
+        if self.headless:
+            raise ValueError("Headless landscapes cannot be shown; use save() instead")
+        import matplotlib.pyplot as plt
+        
+        plt.figure(FigureClass=lambda *args, **kwargs: self.fig)
+        self.canvas = self.fig.canvas
+        
+        self.fig.tight_layout()
         plt.show()
     
-    def save(self, filename: str, dpi: int = 300):
+    def render(self, format: str = 'png', dpi: int = 300, max_bytes: Optional[int] = None) -> bytes:
+        """
+        Render the plot to an encoded image in memory.
+        
+        Args:
+            format: Image format understood by savefig (e.g. 'png', 'svg')
+            dpi: Resolution in dots per inch
+            max_bytes: Canvas memory budget for PNG output. A figure whose
+                RGBA canvas would be larger is rendered in strips with
+                write_png_tiled(). None always renders in one step.
+            
+        Returns:
+            Encoded image bytes, identical to what save() writes. SVG output
+            carries no timestamp and is shrunk with compact_svg(), so the
+            same plot always gives the same, small bytes.
+        """
+        if self.fig is None:
+            raise ValueError("Must create a plot first")
+        buffer = io.BytesIO()
+        if format == 'png' and max_bytes is not None and self.canvas_bytes(dpi) > max_bytes:
+            self.write_png_tiled(buffer, dpi, max_bytes)
+            return buffer.getvalue()
+        if format == 'svg':
+            # Without a date, and with compact_svg() numbering the ids that
+            # Matplotlib hashes with a random salt, the SVG is reproducible
+            self.fig.savefig(buffer, format=format, dpi=dpi, bbox_inches='tight',
+                             metadata={'Date': None})
+            return compact_svg(buffer.getvalue())
+        self.fig.savefig(buffer, format=format, dpi=dpi, bbox_inches='tight')
+        return buffer.getvalue()
+    
+    def canvas_bytes(self, dpi: int) -> int:
+        """
+        Get the size of the figure's RGBA canvas at a resolution.
+        
+        Args:
+            dpi: Resolution in dots per inch
+            
+        Returns:
+            Canvas size in bytes
+        """
+        width, height = self.fig.get_size_inches() * dpi
+        return int(width) * int(height) * RGBA_BYTES
+    
+    def get_tight_bbox(self, dpi: int) -> Bbox:
+        """
+        Get the area savefig(bbox_inches='tight') would save, without drawing pixels.
+        
+        The figure is drawn as usual onto a 1x1 pixel renderer at the target
+        dpi, which lays out every artist (text extents only depend on the
+        dpi) without allocating a canvas of the full output size.
+        
+        Args:
+            dpi: Resolution in dots per inch
+            
+        Returns:
+            Bounding box in inches, including savefig's padding
+        """
+        original_dpi = self.fig.dpi
+        self.fig.dpi = dpi
+        try:
+            renderer = RendererAgg(1, 1, dpi)
+            self.fig.draw(renderer)
+            return self.fig.get_tightbbox(renderer).padded(rcParams['savefig.pad_inches'])
+        finally:
+            self.fig.dpi = original_dpi
+    
+    def write_png_tiled(self, fileobj: BinaryIO, dpi: int = 300, max_bytes: int = TILE_MEMORY_BUDGET) -> Tuple[int, int]:
+        """
+        Render the plot as a PNG in horizontal strips, streaming them to a file.
+        
+        Each strip is drawn on its own canvas of at most max_bytes (at least
+        one row) and encoded before the next is drawn, so memory is bounded
+        by the budget rather than by the output size. The image covers the
+        same area and pixel grid as render(): strips are aligned to whole
+        pixels of the tight bounding box. Antialiasing of thin lines that
+        Agg clips to a strip's edges can differ by a few levels.
+        
+        Args:
+            fileobj: Binary file object to write the PNG to
+            dpi: Resolution in dots per inch
+            max_bytes: Canvas bytes to hold at once
+            
+        Returns:
+            Tuple of (width, height) of the image in pixels
+        """
+        if self.fig is None:
+            raise ValueError("Must create a plot first")
+        bbox = self.get_tight_bbox(dpi)
+        width, height = int(bbox.width * dpi), int(bbox.height * dpi)
+        strip_rows = max(1, max_bytes // (width * RGBA_BYTES))
+        
+        writer = PNGStreamWriter(
+            fileobj, width, height, dpi=dpi,
+            text={'Software': f"Matplotlib version{matplotlib.__version__}, https://matplotlib.org/"}
+        )
+        
+        class StripSink(io.RawIOBase):
+            """File object that savefig(format='rgba') writes a strip's canvas to."""
+            def __init__(self, rows: int):
+                super().__init__()
+                self.rows = rows
+            
+            def writable(self) -> bool:
+                return True
+            
+            def write(self, data) -> int:
+                writer.write_rows(np.frombuffer(data, dtype=np.uint8).reshape(self.rows, width, RGBA_BYTES))
+                return len(data)
+        
+        for top in range(0, height, strip_rows):
+            rows = min(strip_rows, height - top)
+            # Bottom edge of the strip, in pixels from the bottom of the tight box;
+            # the extra half row keeps int() from dropping a row to rounding
+            bottom = height - top - rows
+            strip = Bbox.from_bounds(bbox.x0, (bbox.y0 * dpi + bottom) / dpi, bbox.width, (rows + 0.5) / dpi)
+            self.fig.savefig(StripSink(rows), format='rgba', dpi=dpi, bbox_inches=strip)
+        
+        writer.close()
+        return width, height
+    
+    def render_rgba(self, dpi: Optional[int] = None) -> np.ndarray:
+        """
+        Draw the plot and return the Agg canvas pixels without copying.
+        
+        Unlike render(), the full figure area is returned (no tight bounding
+        box). The returned array is a view of the canvas buffer, so it is only
+        valid until the figure is drawn again; copy it if it must persist.
+        
+        Args:
+            dpi: Resolution in dots per inch (default: the figure's current dpi).
+                The figure's own dpi is restored afterwards.
+            
+        Returns:
+            Read-only (height, width, 4) uint8 array of RGBA pixels
+        """
+        if self.fig is None:
+            raise ValueError("Must create a plot first")
+        original_dpi = self.fig.dpi
+        if dpi is not None:
+            self.fig.set_dpi(dpi)
+        try:
+            self.canvas.draw()
+            pixels = np.asarray(self.canvas.buffer_rgba())
+        finally:
+            self.fig.set_dpi(original_dpi)
+        pixels.flags.writeable = False
+        return pixels
+    
+    def render_frames(self, views: List[Tuple[float, float]], dpi: Optional[int] = None) -> List[np.ndarray]:
+        """
+        Render the plot from several viewpoints, reusing the same figure.
+
+        Only the camera changes between frames, so the surface, labels and
+        arrows are built once and each frame costs a single canvas draw.
+
+        Args:
+            views: (elevation, azimuth) pairs, one per frame
+            dpi: Resolution in dots per inch (default: the figure's current dpi)
+
+        Returns:
+            List of (height, width, 3) uint8 RGB arrays, all the same size
+        """
+        if self.fig is None:
+            raise ValueError("Must create a plot first")
+        original_view = (self.ax.elev, self.ax.azim)
+        original_dpi = self.fig.dpi
+        # Set the dpi once, so every frame is drawn on the same canvas
+        if dpi is not None:
+            self.fig.set_dpi(dpi)
+        frames = []
+        try:
+            for elevation, azimuth in views:
+                self.ax.view_init(elev=elevation, azim=azimuth)
+                frames.append(self.render_rgba()[:, :, :3].copy())
+        finally:
+            self.ax.view_init(elev=original_view[0], azim=original_view[1])
+            self.fig.set_dpi(original_dpi)
+        return frames
+    
+    def save(self, filename: str, dpi: int = 300, max_bytes: Optional[int] = None):
         """
         Save the plot to a file.
         
         Args:
             filename: Output filename
             dpi: Resolution in dots per inch
+            max_bytes: Canvas memory budget for PNG output (see render()).
+                Strips are streamed straight to the file.
         """
         if self.fig is None:
             raise ValueError("Must create a plot first")
-        plt.savefig(filename, dpi=dpi, bbox_inches='tight')
+        image_format = Path(filename).suffix.lstrip('.') or 'png'
+        if image_format == 'png' and max_bytes is not None and self.canvas_bytes(dpi) > max_bytes:
+            with open(filename, 'wb') as f:
+                self.write_png_tiled(f, dpi, max_bytes)
+        else:
+            image_data = self.render(format=image_format, dpi=dpi)
+            with open(filename, 'wb') as f:
+                f.write(image_data)
         print(f"Saved landscape to {filename}")
 
 
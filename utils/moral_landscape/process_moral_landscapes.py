@@ -9,23 +9,124 @@ This script:
 5. Uses hash files to track YAML changes and avoid unnecessary regeneration
 """
 
+import io
 import os
 import re
 import sys
+import json
+import asyncio
 import argparse
+import mimetypes
 import threading
 import hashlib
+import shutil
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import List, Tuple, Optional, Set
+from typing import Dict, List, Tuple, Optional, Set
 import yaml
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext
-from PIL import Image, ImageTk
+import numpy as np
 
 # Add the moral landscape generator to the path
 sys.path.insert(0, str(Path(__file__).parent / 'utils' / 'moral_landscape'))
 
-from moral_landscape_generator import MoralLandscape
+from landscape_config import FEATURE_KINDS, LandscapeModel
+from landscape_options import ACTION_PATH_MODES, PLOT_MODES, TILE_MEMORY_BUDGET, WEB_SUFFIXES
+from landscape_noise import NOISE_TYPES
+import render_cache
+
+# Animated output formats assembled with Pillow when render.animation is set
+ANIMATION_FORMATS = ('gif', 'webp')
+
+# Default dpi of contour/heatmap renders, which are meant as thumbnails and overviews
+FLAT_MODE_DPI = 100
+
+# Render cost model behind --plan, in seconds on one core. Calibrated at run
+# time against the timings recorded in RENDER_TIMINGS_FILE.
+RENDER_COST_BASE = 0.1          # per render: figure setup and encoding
+RENDER_COST_PER_POINT = 1.5e-6  # per surface grid point (resolution squared)
+RENDER_COST_PER_FEATURE = 0.01  # per peak, trough, neutral or moral action
+RENDER_COST_PER_PIXEL = 4e-8    # per output pixel (dpi squared times figsize)
+RENDER_COST_PER_FRAME = 0.1     # per animation frame, on top of its pixels
+
+# Render times of serial runs, kept in the images directory (a dotfile, so Jekyll leaves it out)
+RENDER_TIMINGS_FILE = '.render-timings.json'
+RENDER_TIMINGS_VERSION = 1
+
+# Directories left out of the site, as in _config.yml; names starting with '.' are skipped too.
+# .github/scripts/fix_md_links.py applies the same rule.
+SITE_EXCLUDED_DIRS = ('_site', 'node_modules', 'utils', 'vendor')
+
+# Shard-local output of --shard runs, combined by --merge
+DEFAULT_SHARD_DIR = '.shards'
+SHARD_MANIFEST = 'manifest.json'
+SHARD_FORMAT_VERSION = 1
+
+# The renderer pulls in Matplotlib, which planning and validation never need.
+# It is imported on demand by _import_renderer().
+MoralLandscape = landscape_analysis = landscape_web = None
+
+# Tk and Pillow are only needed by the interactive editor. They are imported
+# on demand by _import_gui() so batch runs never load GUI machinery.
+tk = ttk = filedialog = messagebox = scrolledtext = None
+Image = ImageTk = None
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parse a --shard argument of the form K/N.
+    
+    Args:
+        value: Shard number and shard count, e.g. '2/4'
+        
+    Returns:
+        Tuple of (K, N) with 1 <= K <= N
+    """
+    try:
+        shard, shards = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shard must look like K/N (got {value!r})")
+    if not 1 <= shard <= shards:
+        raise argparse.ArgumentTypeError(f"shard K/N needs 1 <= K <= N (got {value!r})")
+    return shard, shards
+
+
+def shard_of(output_file: str, shards: int) -> int:
+    """
+    Get the shard a block belongs to, from a digest of its output file.
+    
+    Args:
+        output_file: The block's render.output_file
+        shards: Number of shards
+        
+    Returns:
+        Shard number between 1 and shards
+    """
+    digest = hashlib.sha256(output_file.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % shards + 1
+
+
+def is_site_excluded(name: str) -> bool:
+    """Check whether a directory or file name is left out of the site."""
+    return name.startswith('.') or name in SITE_EXCLUDED_DIRS
+
+
+def _import_renderer() -> None:
+    """Import the landscape renderer and the modules built on it."""
+    global MoralLandscape, landscape_analysis, landscape_web
+    from moral_landscape_generator import MoralLandscape
+    import landscape_analysis
+    import landscape_web
+
+
+def _import_gui() -> None:
+    """Import the Tk and Pillow modules used by the interactive editor."""
+    global tk, ttk, filedialog, messagebox, scrolledtext, Image, ImageTk
+    import tkinter as tk
+    from tkinter import ttk, filedialog, messagebox, scrolledtext
+    from PIL import Image, ImageTk
 
 
 class MoralLandscapeProcessor:
@@ -36,30 +137,47 @@ class MoralLandscapeProcessor:
         Initialize the processor.
         
         Args:
-            images_dir: Directory where images will be saved
+            images_dir: Directory where images will be saved. It is created
+                by the first write, so planning and reading never create it.
         """
         self.images_dir = Path(images_dir)
-        self.images_dir.mkdir(exist_ok=True)
+        
+        # Processes used to render animation frames (1 renders them in-process)
+        self.frame_jobs = 1
+        
+        # Plot mode forced on every still image, overriding 'render.mode' (None keeps each block's own)
+        self.render_mode = None
+        
+        # Canvas bytes a PNG render may hold at once; larger images are rendered in strips
+        self.tile_memory = TILE_MEMORY_BUDGET
+        
+        # Precision and storage of the surface grid that images are drawn from
+        self.grid_dtype = 'float32'
+        self.grid_storage = 'memory'
+        
+        # Render times of this run by output_file, saved by save_render_timings()
+        self.render_timings: Dict[str, dict] = {}
         
     def find_markdown_files(self, root_dir: str = ".") -> List[Path]:
         """
-        Find all .md files in the directory tree.
+        Find all .md files of the site.
+        
+        Hidden directories and SITE_EXCLUDED_DIRS are pruned during the walk.
         
         Args:
             root_dir: Root directory to search
             
         Returns:
-            List of Path objects for .md files
+            List of Path objects for .md files, in sorted walk order
         """
-        root = Path(root_dir)
         md_files = []
         
-        for md_file in root.rglob("*.md"):
-            # Skip files in node_modules, .git, etc.
-            if not any(part.startswith('.') or part == 'node_modules' 
-                      for part in md_file.parts):
-                md_files.append(md_file)
-
+        for dirpath, dirnames, filenames in os.walk(root_dir):
+            dirnames[:] = sorted(d for d in dirnames if not is_site_excluded(d))
+            for filename in sorted(filenames):
+                if filename.endswith('.md') and not is_site_excluded(filename):
+                    md_files.append(Path(os.path.normpath(os.path.join(dirpath, filename))))
+        
         return md_files
     
     def extract_yaml_blocks(self, content: str) -> List[Tuple[str, int, int, Optional[int], Optional[int]]]:
@@ -179,6 +297,30 @@ class MoralLandscapeProcessor:
                     elif landscape['noise_level'] < 0:
                         errors.append("'landscape.noise_level' must be non-negative")
                 
+                # Validate default action path
+                if 'action_path' in landscape and landscape['action_path'] not in ACTION_PATH_MODES:
+                    errors.append(f"'landscape.action_path' must be one of {list(ACTION_PATH_MODES)}")
+                
+                # Validate snap_to_surface
+                if 'snap_to_surface' in landscape and not isinstance(landscape['snap_to_surface'], bool):
+                    errors.append("'landscape.snap_to_surface' must be a boolean")
+                
+                # Validate noise type and scale
+                if 'noise_type' in landscape and landscape['noise_type'] not in NOISE_TYPES:
+                    errors.append(f"'landscape.noise_type' must be one of {list(NOISE_TYPES)}")
+                if 'noise_scale' in landscape:
+                    if not isinstance(landscape['noise_scale'], (int, float)) or isinstance(landscape['noise_scale'], bool):
+                        errors.append("'landscape.noise_scale' must be a number")
+                    elif landscape['noise_scale'] < 1:
+                        errors.append("'landscape.noise_scale' must be at least 1")
+                
+                # Validate seed
+                if 'seed' in landscape:
+                    if not isinstance(landscape['seed'], int) or isinstance(landscape['seed'], bool):
+                        errors.append("'landscape.seed' must be an integer")
+                    elif landscape['seed'] < 0:
+                        errors.append("'landscape.seed' must be non-negative")
+                
                 # Validate axes
                 if 'axes' in landscape:
                     if not isinstance(landscape['axes'], dict):
@@ -397,6 +539,9 @@ class MoralLandscapeProcessor:
                         elif not (0 <= action['alpha'] <= 1):
                             errors.append(f"moral_actions[{i}].alpha must be between 0 and 1")
                     
+                    if 'path' in action and action['path'] not in ACTION_PATH_MODES:
+                        errors.append(f"moral_actions[{i}].path must be one of {list(ACTION_PATH_MODES)}")
+                    
                     if 'fontsize' in action:
                         if not isinstance(action['fontsize'], int):
                             errors.append(f"moral_actions[{i}].fontsize must be an integer")
@@ -468,6 +613,58 @@ class MoralLandscapeProcessor:
                                     errors.append(f"'render.view.azimuth' must be between 0 and 360 (got {azim_val})")
                         except (ValueError, TypeError) as e:
                             errors.append(f"'render.view.azimuth' must be a number (got {type(azimuth).__name__}: {azimuth!r})")
+                
+                # Validate vector options
+                if 'vector' in render:
+                    vector = render['vector']
+                    if not isinstance(vector, dict):
+                        errors.append("'render.vector' must be an object")
+                    else:
+                        if 'bands' in vector:
+                            if not isinstance(vector['bands'], int) or isinstance(vector['bands'], bool):
+                                errors.append("'render.vector.bands' must be an integer")
+                            elif vector['bands'] < 2:
+                                errors.append("'render.vector.bands' must be at least 2")
+                
+                # Validate web export flag
+                if 'web' in render and not isinstance(render['web'], bool):
+                    errors.append("'render.web' must be a boolean")
+                
+                # Validate plot mode
+                if 'mode' in render:
+                    if render['mode'] not in PLOT_MODES:
+                        errors.append(f"'render.mode' must be one of {list(PLOT_MODES)}")
+                    elif render['mode'] != 'surface' and 'animation' in render:
+                        errors.append("'render.animation' requires 'render.mode' to be 'surface'")
+                
+                # Validate animation section
+                if 'animation' in render:
+                    animation = render['animation']
+                    if not isinstance(animation, dict):
+                        errors.append("'render.animation' must be an object")
+                    else:
+                        output_file = render.get('output_file')
+                        if isinstance(output_file, str) and Path(output_file).suffix.lstrip('.').lower() not in ANIMATION_FORMATS:
+                            errors.append(f"'render.output_file' must end in one of {['.' + f for f in ANIMATION_FORMATS]} when 'render.animation' is set")
+                        if 'frames' in animation:
+                            if not isinstance(animation['frames'], int) or isinstance(animation['frames'], bool):
+                                errors.append("'render.animation.frames' must be an integer")
+                            elif animation['frames'] < 2:
+                                errors.append("'render.animation.frames' must be at least 2")
+                        for key in ['fps', 'dpi']:
+                            if key in animation:
+                                value = animation[key]
+                                if not isinstance(value, (int, float)) or isinstance(value, bool):
+                                    errors.append(f"'render.animation.{key}' must be a number")
+                                elif value <= 0:
+                                    errors.append(f"'render.animation.{key}' must be positive")
+                        for key in ['azimuth', 'elevation']:
+                            if key in animation:
+                                sweep = animation[key]
+                                if not isinstance(sweep, list) or len(sweep) != 2:
+                                    errors.append(f"'render.animation.{key}' must be an array with exactly 2 numbers")
+                                elif not all(isinstance(x, (int, float)) and not isinstance(x, bool) for x in sweep):
+                                    errors.append(f"'render.animation.{key}' must contain only numbers")
         
         # Raise error if any validation errors occurred
         if errors:
@@ -478,12 +675,17 @@ class MoralLandscapeProcessor:
         """
         Calculate SHA256 hash of YAML content.
         
+        A forced render_mode is part of the hash, so images rendered with
+        an override are regenerated by the next normal run.
+        
         Args:
             yaml_content: YAML string
             
         Returns:
             Hex string of the hash
         """
+        if self.render_mode is not None:
+            yaml_content = f"{yaml_content}\n# render_mode: {self.render_mode}"
         return hashlib.sha256(yaml_content.encode('utf-8')).hexdigest()
     
     def get_hash_file_path(self, output_file: str) -> Path:
@@ -499,32 +701,40 @@ class MoralLandscapeProcessor:
         base_name = Path(output_file).stem
         return self.images_dir / f"{base_name}.hash"
     
-    def should_regenerate_image(self, yaml_content: str, output_file: str) -> bool:
+    def get_stored_hash(self, output_file: str) -> Optional[str]:
         """
-        Check if image needs to be regenerated based on YAML hash.
+        Get the YAML hash saved when an image was last rendered.
         
         Args:
-            yaml_content: YAML configuration string
             output_file: Name of the output image file
             
         Returns:
-            True if image should be regenerated, False otherwise
+            The stored hash, or None if there is no readable hash file
         """
         hash_file = self.get_hash_file_path(output_file)
-        current_hash = self.calculate_yaml_hash(yaml_content)
-        
-        # If hash file doesn't exist, regenerate
         if not hash_file.exists():
-            return True
+            return None
         
-        # If hash file exists, compare hashes
         try:
             with open(hash_file, 'r', encoding='utf-8') as f:
-                stored_hash = f.read().strip()
-            return stored_hash != current_hash
+                return f.read().strip()
         except Exception:
             # If we can't read the hash file, regenerate to be safe
-            return True
+            return None
+    
+    def should_regenerate_image(self, yaml_content: str, output_file: str) -> bool:
+        """
+        Check if image needs to be regenerated based on YAML hash.
+        
+        Args:
+            yaml_content: YAML configuration string
+            output_file: Name of the output image file
+            
+        Returns:
+            True if image should be regenerated, False otherwise
+        """
+        stored_hash = self.get_stored_hash(output_file)
+        return stored_hash is None or stored_hash != self.calculate_yaml_hash(yaml_content)
     
     def save_yaml_hash(self, yaml_content: str, output_file: str) -> None:
         """
@@ -537,64 +747,195 @@ class MoralLandscapeProcessor:
         hash_file = self.get_hash_file_path(output_file)
         current_hash = self.calculate_yaml_hash(yaml_content)
         
+        self.images_dir.mkdir(exist_ok=True)
         with open(hash_file, 'w', encoding='utf-8') as f:
             f.write(current_hash)
     
-    def generate_landscape_image(self, config: dict, yaml_content: str = None) -> Optional[str]:
+    def get_noise_seed(self, config: dict) -> int:
         """
-        Generate a moral landscape image from YAML configuration.
+        Get the seed for a landscape's noise field.
+        
+        An explicit landscape.seed wins. Otherwise the seed is derived from a
+        digest of the geometry (resolution, ranges and feature coordinates),
+        so identical landscapes always render identically while label and
+        style edits keep the same noise.
         
         Args:
             config: Parsed YAML configuration
             
         Returns:
-            Path to generated image or None if generation failed
+            Non-negative integer seed
         """
-        try:
-            # Extract configuration with defaults
-            landscape_config = config.get('landscape', {})
-            peaks_config = config.get('peaks', [])
-            troughs_config = config.get('troughs', [])
-            neutrals_config = config.get('neutrals', [])
-            render_config = config.get('render', {})
+        landscape_config = config.get('landscape', {})
+        if 'seed' in landscape_config:
+            return landscape_config['seed']
+        
+        geometry = {
+            'resolution': landscape_config.get('resolution', 100),
+            'x_range': landscape_config.get('x_range', [-5, 5]),
+            'y_range': landscape_config.get('y_range', [-5, 5]),
+            'peaks': [p['coords'] for p in config.get('peaks', [])],
+            'troughs': [t['coords'] for t in config.get('troughs', [])],
+            'neutrals': [n['coords'] for n in config.get('neutrals', [])],
+        }
+        digest = hashlib.sha256(json.dumps(geometry, sort_keys=True).encode('utf-8')).digest()
+        return int.from_bytes(digest[:8], 'little')
+    
+    def build_model(self, config: dict) -> LandscapeModel:
+        """
+        Parse a validated configuration into the model the renderer reads.
+        
+        Build it once per block and pass it to generate_surface() and
+        resolve_annotations(), rather than walking the feature dicts again.
+        
+        Args:
+            config: Parsed YAML configuration
             
-            # Create landscape generator
-            resolution = landscape_config.get('resolution', 100)
-            landscape = MoralLandscape(resolution=resolution)
-            
-            # Prepare peaks, troughs, and neutrals
-            peaks = [(p['coords'][0], p['coords'][1], p['coords'][2])
-                    for p in peaks_config]
-            troughs = [(t['coords'][0], t['coords'][1], t['coords'][2])
-                      for t in troughs_config]
-            neutrals = [(n['coords'][0], n['coords'][1], n['coords'][2])
-                       for n in neutrals_config]
-            
-            # Generate landscape
-            x_range = landscape_config.get('x_range', [-5, 5])
-            y_range = landscape_config.get('y_range', [-5, 5])
-            noise_level = landscape_config.get('noise_level', 0.1)
-            
-            X, Y, Z = landscape.generate_landscape(
-                x_range=tuple(x_range),
-                y_range=tuple(y_range),
-                peaks=peaks if peaks else None,
-                troughs=troughs if troughs else None,
-                neutrals=neutrals if neutrals else None,
-                noise_level=noise_level
-            )
+        Returns:
+            LandscapeModel of the block
+        """
+        return LandscapeModel.from_config(config, seed=self.get_noise_seed(config))
+    
+    def generate_surface(self, model: LandscapeModel, dtype: Optional[str] = None) -> 'MoralLandscape':
+        """
+        Generate the landscape surface of a block without plotting it.
+        
+        Args:
+            model: LandscapeModel from build_model()
+            dtype: Floating-point type of the grid (default: self.grid_dtype)
+            
+        Returns:
+            Headless MoralLandscape with X, Y and Z populated
+        """
+        _import_renderer()
+        
+        landscape = MoralLandscape(resolution=model.resolution, headless=True)
+        
+        # Without any peaks the generator falls back to its default centre peak
+        peaks = model.feature_points('peak')
+        landscape.generate_landscape(
+            x_range=model.x_range,
+            y_range=model.y_range,
+            peaks=peaks if len(peaks) else None,
+            troughs=model.feature_points('trough'),
+            neutrals=model.feature_points('neutral'),
+            noise_level=model.noise_level,
+            seed=model.seed,
+            noise_type=model.noise_type,
+            noise_scale=model.noise_scale,
+            dtype=dtype or self.grid_dtype,
+            storage=self.grid_storage
+        )
+        
+        return landscape
+    
+    def resolve_annotations(self, model: LandscapeModel, landscape: 'MoralLandscape') -> Tuple[List[dict], List[dict]]:
+        """
+        Resolve the labels and moral actions of a block to 3D coordinates.
+        
+        Args:
+            model: LandscapeModel from build_model()
+            landscape: MoralLandscape after generate_surface(), sampled when
+                points snap to the surface
+            
+        Returns:
+            Tuple of (labels, actions): keyword arguments for add_label(), and
+            for add_action_arrow() plus 'path' for each action
+        """
+        # Heights of the labelled points, or the actual surface height in one batched lookup
+        if model.snap_to_surface and len(model.centres):
+            heights = landscape.sample(model.centres[:, 0], model.centres[:, 1])
+        else:
+            heights = model.amplitudes
+        points = [(x, y, z) for (x, y), z in zip(model.centres.tolist(), heights.tolist())]
+        
+        labels = []
+        for point, kind, feature in zip(points, model.kinds.tolist(), model.features):
+            label_type = FEATURE_KINDS[kind]
+            
+            # Only peaks and troughs may be left unlabelled
+            if not feature.label and label_type != 'neutral':
+                continue
+            
+            if feature.label_offset:
+                # label_offset is treated as relative offset from the point
+                label_position = tuple(value + offset for value, offset in zip(point, feature.label_offset))
+            else:
+                label_position = None
+            
+            labels.append({
+                'x': point[0],
+                'y': point[1],
+                'z': point[2],
+                'label': feature.label,
+                'label_type': label_type,
+                'label_position': label_position,
+                'z_index': feature.z_index,
+                'fontsize': feature.fontsize
+            })
+        
+        # Resolve moral actions (arrows between points)
+        actions = []
+        for action in model.actions:
+            if action.source_index is None:
+                print(f"Warning: Source point '{action.source}' not found for action '{action.label}'")
+                continue
             
-            # Plot configuration
-            title = landscape_config.get('title', 'Moral Landscape')
-            axes = landscape_config.get('axes', {})
-            xlabel = axes.get('xlabel', '')
-            ylabel = axes.get('ylabel', '')
-            zlabel = axes.get('zlabel', 'Moral Value')
+            if action.target_index is None:
+                print(f"Warning: Target point '{action.target}' not found for action '{action.label}'")
+                continue
             
-            style = landscape_config.get('style', {})
-            colormap = style.get('colormap', 'viridis')
-            figsize = tuple(style.get('figsize', [12, 9]))
+            actions.append({
+                'source_coords': points[action.source_index],
+                'target_coords': points[action.target_index],
+                'label': action.label,
+                'z_index': action.z_index,
+                'color': action.color,
+                'linewidth': action.linewidth,
+                'linestyle': action.linestyle,
+                'alpha': action.alpha,
+                'fontsize': action.fontsize,
+                'path': action.path
+            })
+        
+        return labels, actions
+    
+    def build_landscape(self, config: dict) -> 'MoralLandscape':
+        """
+        Build a fully plotted moral landscape from YAML configuration.
+        
+        Args:
+            config: Parsed YAML configuration
             
+        Returns:
+            Headless MoralLandscape ready to be rendered
+        """
+        # Extract configuration with defaults
+        landscape_config = config.get('landscape', {})
+        render_config = config.get('render', {})
+        
+        model = self.build_model(config)
+        landscape = self.generate_surface(model)
+        X, Y, Z = landscape.X, landscape.Y, landscape.Z
+        
+        # Plot configuration
+        title = landscape_config.get('title', 'Moral Landscape')
+        axes = landscape_config.get('axes', {})
+        xlabel = axes.get('xlabel', '')
+        ylabel = axes.get('ylabel', '')
+        zlabel = axes.get('zlabel', 'Moral Value')
+        
+        style = landscape_config.get('style', {})
+        colormap = style.get('colormap', 'viridis')
+        figsize = tuple(style.get('figsize', [12, 9]))
+        
+        # SVG output draws a colour-banded surface so the file stays small
+        vector_options = {}
+        if Path(render_config.get('output_file', '')).suffix.lower() == '.svg':
+            vector_options = {'color_bands': render_config.get('vector', {}).get('bands', 16)}
+        
+        mode = self.get_plot_mode(render_config)
+        if mode == 'surface':
             landscape.plot_landscape(
                 X, Y, Z,
                 title=title,
@@ -602,212 +943,244 @@ class MoralLandscapeProcessor:
                 ylabel=ylabel,
                 zlabel=zlabel,
                 colormap=colormap,
+                figsize=figsize,
+                **vector_options
+            )
+        else:
+            landscape.plot_landscape_2d(
+                X, Y, Z,
+                mode=mode,
+                title=title,
+                xlabel=xlabel,
+                ylabel=ylabel,
+                zlabel=zlabel,
+                colormap=colormap,
                 figsize=figsize
             )
-            
-            # Hide axis tick labels if the axis label is empty string
-            if xlabel == '':
-                landscape.ax.set_xticklabels([])
-            if ylabel == '':
-                landscape.ax.set_yticklabels([])
-            if zlabel == '':
-                landscape.ax.set_zticklabels([])
-            
-            # Get default fontsize from style or use generator default
-            style = landscape_config.get('style', {})
-            default_label_fontsize = style.get('label_fontsize', 11)
-            
-            # Add labels for peaks
-            for peak in peaks_config:
-                coords = peak['coords']
-                label = peak.get('label')
-                label_offset = peak.get('label_offset')
-                z_index = peak.get('z_index')
-                fontsize = peak.get('fontsize', default_label_fontsize)
-                
-                # Only add label if it's not None and not empty string
-                if label:
-                    if label_offset:
-                        # label_offset is treated as relative offset from the point
-                        label_position = (
-                            coords[0] + label_offset[0],
-                            coords[1] + label_offset[1],
-                            coords[2] + label_offset[2]
-                        )
-                    else:
-                        label_position = None
-                    
-                    landscape.add_label(
-                        coords[0], coords[1], coords[2],
-                        label,
-                        label_type='peak',
-                        label_position=label_position,
-                        z_index=z_index,
-                        fontsize=fontsize
-                    )
-            
-            # Add labels for troughs
-            for trough in troughs_config:
-                coords = trough['coords']
-                label = trough.get('label')
-                label_offset = trough.get('label_offset')
-                z_index = trough.get('z_index')
-                fontsize = trough.get('fontsize', default_label_fontsize)
-                
-                # For troughs, the z-coordinate should be negative to represent the low point
-                trough_z = -coords[2]
-                
-                # Only add label if it's not None and not empty string
-                if label:
-                    if label_offset:
-                        # label_offset is treated as relative offset from the point
-                        label_position = (
-                            coords[0] + label_offset[0],
-                            coords[1] + label_offset[1],
-                            trough_z + label_offset[2]
-                        )
-                    else:
-                        label_position = None
-                    
-                    landscape.add_label(
-                        coords[0], coords[1], trough_z,
-                        label,
-                        label_type='trough',
-                        label_position=label_position,
-                        z_index=z_index,
-                        fontsize=fontsize
-                    )
-            
-            # Add labels for neutrals
-            for neutral in neutrals_config:
-                coords = neutral['coords']
-                label = neutral['label']
-                label_offset = neutral.get('label_offset')
-                z_index = neutral.get('z_index')
-                fontsize = neutral.get('fontsize', default_label_fontsize)
-                
-                if label_offset:
-                    # label_offset is treated as relative offset from the point
-                    label_position = (
-                        coords[0] + label_offset[0],
-                        coords[1] + label_offset[1],
-                        coords[2] + label_offset[2]
-                    )
-                else:
-                    label_position = None
-                
-                landscape.add_label(
-                    coords[0], coords[1], coords[2],
-                    label,
-                    label_type='neutral',
-                    label_position=label_position,
-                    z_index=z_index,
-                    fontsize=fontsize
-                )
-            
-            # Process moral actions (arrows between points)
-            moral_actions_config = config.get('moral_actions', [])
-            if moral_actions_config:
-                # Build a lookup dictionary for point labels to their coordinates
-                point_lookup = {}
-                
-                # Add peaks to lookup
-                for peak in peaks_config:
-                    label = peak['label']
-                    coords = peak['coords']
-                    point_lookup[label] = (coords[0], coords[1], coords[2])
-                
-                # Add troughs to lookup (with negated z)
-                for trough in troughs_config:
-                    label = trough['label']
-                    coords = trough['coords']
-                    point_lookup[label] = (coords[0], coords[1], -coords[2])
-                
-                # Add neutrals to lookup
-                for neutral in neutrals_config:
-                    label = neutral['label']
-                    coords = neutral['coords']
-                    point_lookup[label] = (coords[0], coords[1], coords[2])
-                
-                # Draw action arrows
-                for action in moral_actions_config:
-                    source_label = action['source']
-                    target_label = action['target']
-                    action_label = action['label']
-                    z_index = action.get('z_index')
-                    
-                    # Extract optional style attributes
-                    color = action.get('color')
-                    linewidth = action.get('linewidth')
-                    linestyle = action.get('linestyle')
-                    alpha = action.get('alpha')
-                    fontsize = action.get('fontsize', 10)  # Default for action arrows is 10
-                    
-                    # Look up coordinates
-                    if source_label not in point_lookup:
-                        print(f"Warning: Source point '{source_label}' not found for action '{action_label}'")
-                        continue
-                    
-                    if target_label not in point_lookup:
-                        print(f"Warning: Target point '{target_label}' not found for action '{action_label}'")
-                        continue
-                    
-                    source_coords = point_lookup[source_label]
-                    target_coords = point_lookup[target_label]
-                    
-                    landscape.add_action_arrow(
-                        source_coords,
-                        target_coords,
-                        action_label,
-                        z_index=z_index,
-                        color=color,
-                        linewidth=linewidth,
-                        linestyle=linestyle,
-                        alpha=alpha,
-                        fontsize=fontsize
-                    )
-            
-            # Set view angle
-            view = render_config.get('view', {})
-            elevation = view.get('elevation', 25)
-            azimuth = view.get('azimuth', 45)
-            
-            # Ensure elevation and azimuth are numeric
-            if isinstance(elevation, str):
-                try:
-                    elevation = float(elevation)
-                except ValueError:
-                    elevation = 25
-            
-            if isinstance(azimuth, str):
-                try:
-                    azimuth = float(azimuth)
-                except ValueError:
-                    azimuth = 45
-            
+        
+        # Hide axis tick labels if the axis label is empty string
+        if xlabel == '':
+            landscape.ax.set_xticklabels([])
+        if ylabel == '':
+            landscape.ax.set_yticklabels([])
+        if zlabel == '' and mode == 'surface':
+            landscape.ax.set_zticklabels([])
+        
+        labels, actions = self.resolve_annotations(model, landscape)
+        for label in labels:
+            landscape.add_label(**label)
+        
+        # Draw action arrows (terrain-following paths are drawn together below)
+        terrain_actions = []
+        for action in actions:
+            if action['path'] != 'straight':
+                terrain_actions.append(action)
+                continue
+            landscape.add_action_arrow(**{k: v for k, v in action.items() if k != 'path'})
+        
+        if terrain_actions:
+            landscape.add_action_paths(terrain_actions)
+        
+        # Set view angle (flat plots are always seen from above)
+        if mode == 'surface':
+            elevation, azimuth = self.get_view(render_config)
             landscape.ax.view_init(elev=elevation, azim=azimuth)
+        
+        return landscape
+    
+    def get_plot_mode(self, render_config: dict) -> str:
+        """
+        Get the plot mode of a block: the forced render_mode, else 'render.mode'.
+        
+        Animations always rotate the 3D surface and ignore render_mode.
+        
+        Args:
+            render_config: The 'render' section of the YAML configuration
             
-            # Save image
-            output_file = render_config['output_file']
-            output_path = self.images_dir / output_file
-            dpi = render_config.get('dpi', 300)
+        Returns:
+            One of PLOT_MODES
+        """
+        if 'animation' in render_config:
+            return 'surface'
+        if self.render_mode is not None:
+            return self.render_mode
+        return render_config.get('mode', 'surface')
+    
+    def get_view(self, render_config: dict) -> Tuple[float, float]:
+        """
+        Get the camera angles from the render configuration.
+        
+        Args:
+            render_config: The 'render' section of the YAML configuration
             
-            # Ensure dpi is an integer
-            if isinstance(dpi, (list, tuple)):
-                dpi = dpi[0] if dpi else 300
+        Returns:
+            Tuple of (elevation, azimuth) in degrees
+        """
+        view = render_config.get('view', {})
+        elevation = view.get('elevation', 25)
+        azimuth = view.get('azimuth', 45)
+        
+        # Ensure elevation and azimuth are numeric
+        if isinstance(elevation, str):
+            try:
+                elevation = float(elevation)
+            except ValueError:
+                elevation = 25
+        
+        if isinstance(azimuth, str):
+            try:
+                azimuth = float(azimuth)
+            except ValueError:
+                azimuth = 45
+        
+        return elevation, azimuth
+    
+    def get_render_dpi(self, render_config: dict) -> int:
+        """
+        Get the output resolution from the render configuration.
+        
+        Without 'render.dpi', contour and heatmap renders default to
+        FLAT_MODE_DPI and surfaces to 300.
+        
+        Args:
+            render_config: The 'render' section of the YAML configuration
             
-            # Handle string values (from documentation/spec files)
-            if isinstance(dpi, str):
-                try:
-                    dpi = int(dpi)
-                except ValueError:
-                    dpi = 300  # Use default if string is not a valid number
-            else:
+        Returns:
+            Resolution in dots per inch
+        """
+        default = 300 if self.get_plot_mode(render_config) == 'surface' else FLAT_MODE_DPI
+        dpi = render_config.get('dpi', default)
+        
+        # Ensure dpi is an integer
+        if isinstance(dpi, (list, tuple)):
+            dpi = dpi[0] if dpi else default
+        
+        # Handle string values (from documentation/spec files)
+        if isinstance(dpi, str):
+            try:
                 dpi = int(dpi)
+            except ValueError:
+                dpi = default  # Use default if string is not a valid number
+        else:
+            dpi = int(dpi)
+        
+        return dpi
+    
+    def estimate_render_cost(self, config: dict) -> float:
+        """
+        Estimate how long a block takes to render, before calibration.
+        
+        The estimate grows with the surface grid (resolution squared), the
+        number of features and the output pixels (dpi squared times the
+        figure size, for every frame of an animation).
+        
+        Args:
+            config: Parsed YAML configuration
             
-            landscape.save(str(output_path), dpi=dpi)
+        Returns:
+            Estimated render time in seconds
+        """
+        landscape_config = config.get('landscape', {})
+        render_config = config['render']
+        resolution = landscape_config.get('resolution', 100)
+        width, height = landscape_config.get('style', {}).get('figsize', [12, 9])
+        features = sum(len(config.get(key) or []) for key in ('peaks', 'troughs', 'neutrals', 'moral_actions'))
+        
+        seconds = (RENDER_COST_BASE + RENDER_COST_PER_POINT * resolution ** 2
+                   + RENDER_COST_PER_FEATURE * features)
+        if 'animation' in render_config:
+            animation = render_config['animation']
+            frame_pixels = width * height * animation.get('dpi', 80) ** 2
+            frames = len(self.get_animation_views(render_config))
+            return seconds + frames * (RENDER_COST_PER_FRAME + RENDER_COST_PER_PIXEL * frame_pixels)
+        return seconds + RENDER_COST_PER_PIXEL * width * height * self.get_render_dpi(render_config) ** 2
+    
+    def get_render_timings_path(self) -> Path:
+        """Get the path of the file recording render times."""
+        return self.images_dir / RENDER_TIMINGS_FILE
+    
+    def load_render_timings(self) -> Dict[str, dict]:
+        """
+        Load the render times recorded by earlier runs.
+        
+        Returns:
+            Dict mapping output_file to its 'seconds' and uncalibrated 'estimate'
+            (empty if nothing usable was recorded)
+        """
+        try:
+            with open(self.get_render_timings_path(), 'r', encoding='utf-8') as f:
+                recorded = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(recorded, dict) or recorded.get('version') != RENDER_TIMINGS_VERSION:
+            return {}
+        return recorded.get('renders', {})
+    
+    def record_render_time(self, config: dict, seconds: float) -> None:
+        """
+        Record how long a block took to render, to calibrate later estimates.
+        
+        Args:
+            config: Parsed YAML configuration
+            seconds: Measured render time
+        """
+        self.render_timings[config['render']['output_file']] = {
+            'seconds': round(seconds, 4),
+            'estimate': round(self.estimate_render_cost(config), 4)
+        }
+    
+    def save_render_timings(self) -> None:
+        """Merge the render times of this run into the recorded ones."""
+        if not self.render_timings:
+            return
+        renders = self.load_render_timings()
+        renders.update(self.render_timings)
+        self.images_dir.mkdir(exist_ok=True)
+        with open(self.get_render_timings_path(), 'w', encoding='utf-8') as f:
+            json.dump({'version': RENDER_TIMINGS_VERSION, 'renders': renders}, f, indent=2, sort_keys=True)
+    
+    def get_cost_calibration(self) -> Tuple[float, int]:
+        """
+        Get the factor that scales estimates to the recorded render times.
+        
+        The median ratio of measured to estimated time is used, so a few
+        slow outliers do not skew it.
+        
+        Returns:
+            Tuple of (scale factor, number of recorded timings it is based on)
+        """
+        ratios = [timing['seconds'] / timing['estimate']
+                  for timing in self.load_render_timings().values()
+                  if timing.get('estimate', 0) > 0]
+        if not ratios:
+            return 1.0, 0
+        return float(np.median(ratios)), len(ratios)
+    
+    def render_landscape_image(self, config: dict) -> Optional[bytes]:
+        """
+        Render a moral landscape from YAML configuration to in-memory image bytes.
+        
+        The image format follows the extension of render.output_file, so
+        the bytes match what generate_landscape_image() would write to disk.
+        
+        Args:
+            config: Parsed YAML configuration
             
-            return str(output_path)
+        Returns:
+            Encoded image bytes or None if rendering failed
+        """
+        try:
+            render_config = config.get('render', {})
+            if 'animation' in render_config:
+                return self.render_animation(config)
+            
+            landscape = self.build_landscape(config)
+            image_format = Path(render_config['output_file']).suffix.lstrip('.') or 'png'
+            return landscape.render(
+                format=image_format,
+                dpi=self.get_render_dpi(render_config),
+                max_bytes=self.tile_memory
+            )
         
         except Exception as e:
             print(f"Error generating landscape: {e}")
@@ -815,49 +1188,349 @@ class MoralLandscapeProcessor:
             traceback.print_exc()
             return None
     
-    def create_image_tag(self, image_path: str, alt_text: str) -> str:
+    def render_preview_image(self, config: dict) -> Optional[bytes]:
         """
-        Create a markdown image tag.
+        Render a block to image bytes that Pillow can open, for the editor preview.
+        
+        SVG output is drawn with the same colour-banded surface and rasterised
+        to PNG, since Pillow cannot read SVG. Every other format is rendered
+        as render_landscape_image() would.
         
         Args:
-            image_path: Path to the image (relative to markdown file)
-            alt_text: Alt text for the image
+            config: Parsed YAML configuration
             
         Returns:
-            Markdown image tag
+            Encoded image bytes or None if rendering failed
         """
-        # Use just the filename for the alt text identifier
-        return f"\n![{alt_text}]({image_path})\n"
+        render_config = config.get('render', {})
+        if Path(render_config.get('output_file', '')).suffix.lower() != '.svg':
+            return self.render_landscape_image(config)
+        
+        try:
+            return self.build_landscape(config).render(
+                format='png',
+                dpi=self.get_render_dpi(render_config),
+                max_bytes=self.tile_memory
+            )
+        except Exception as e:
+            print(f"Error generating landscape: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
     
-    def process_file(self, file_path: Path) -> bool:
+    def get_animation_views(self, render_config: dict) -> List[Tuple[float, float]]:
         """
-        Process a single markdown file.
+        Get the (elevation, azimuth) of every frame of an animation.
+        
+        Both angles are swept linearly between the two values given in
+        render.animation; an angle that is not swept stays at render.view.
+        A sweep over whole turns leaves out the last frame so the loop
+        does not repeat its first view.
         
         Args:
-            file_path: Path to the markdown file
+            render_config: The 'render' section of the YAML configuration
             
         Returns:
-            True if file was modified, False otherwise
+            List of (elevation, azimuth) pairs, one per frame
+        """
+        animation = render_config['animation']
+        view = render_config.get('view', {})
+        frames = animation.get('frames', 36)
+        elevation = float(view.get('elevation', 25))
+        azimuth = float(view.get('azimuth', 45))
+        
+        sweeps = []
+        for key, fixed in (('elevation', elevation), ('azimuth', azimuth)):
+            start, end = animation.get(key, [fixed, fixed])
+            full_turn = start != end and (end - start) % 360 == 0
+            sweeps.append(np.linspace(start, end, frames, endpoint=not full_turn))
+        return list(zip(sweeps[0].tolist(), sweeps[1].tolist()))
+    
+    def render_animation(self, config: dict) -> bytes:
+        """
+        Render an animated GIF or WebP that sweeps the camera around the landscape.
+        
+        The landscape is built once per process and only the view changes
+        between frames. With frame_jobs > 1 the frames are split into
+        contiguous chunks rendered across a process pool. Frame size is set
+        by render.animation.dpi (default 80) and figsize.
+        
+        Args:
+            config: Parsed YAML configuration with render.animation set
+            
+        Returns:
+            Encoded animation bytes
+        """
+        from PIL import Image as PILImage
+        
+        render_config = config['render']
+        animation = render_config['animation']
+        image_format = Path(render_config['output_file']).suffix.lstrip('.').lower()
+        dpi = animation.get('dpi', 80)
+        views = self.get_animation_views(render_config)
+        
+        start = time.perf_counter()
+        jobs = min(self.frame_jobs, len(views))
+        if jobs > 1:
+            chunk_size = -(-len(views) // jobs)
+            chunks = [views[i:i + chunk_size] for i in range(0, len(views), chunk_size)]
+            with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+                frames = [
+                    frame
+                    for chunk_frames in pool.map(
+                        _render_frames_worker,
+                        [str(self.images_dir)] * len(chunks),
+                        [config] * len(chunks),
+                        chunks,
+                        [dpi] * len(chunks)
+                    )
+                    for frame in chunk_frames
+                ]
+        else:
+            frames = self.build_landscape(config).render_frames(views, dpi)
+        elapsed = time.perf_counter() - start
+        print(f"Rendered {len(frames)} frames in {elapsed:.2f}s ({len(frames) / elapsed:.1f} frames/s)")
+        
+        images = [PILImage.fromarray(frame) for frame in frames]
+        if image_format == 'gif':
+            # One shared palette keeps colours stable from frame to frame
+            palette = images[0].quantize(colors=256)
+            images = [image.quantize(palette=palette, dither=PILImage.Dither.NONE) for image in images]
+        
+        buffer = io.BytesIO()
+        images[0].save(
+            buffer,
+            format=image_format.upper(),
+            save_all=True,
+            append_images=images[1:],
+            duration=round(1000 / animation.get('fps', 12)),
+            loop=0
+        )
+        return buffer.getvalue()
+    
+    def generate_landscape_image(self, config: dict, yaml_content: str = None) -> Optional[str]:
+        """
+        Generate a moral landscape image from YAML configuration.
+        
+        Args:
+            config: Parsed YAML configuration
+            
+        Returns:
+            Path to generated image or None if generation failed
+        """
+        image_data = self.render_landscape_image(config)
+        if image_data is None:
+            return None
+        
+        return self.write_landscape_image(config, image_data)
+    
+    def write_landscape_image(self, config: dict, image_data: bytes) -> str:
+        """
+        Write rendered image bytes to the configured output file.
+        
+        Args:
+            config: Parsed YAML configuration
+            image_data: Encoded image from render_landscape_image()
+            
+        Returns:
+            Path to the written image
+        """
+        output_path = self.images_dir / config['render']['output_file']
+        self.images_dir.mkdir(exist_ok=True)
+        with open(output_path, 'wb') as f:
+            f.write(image_data)
+        print(f"Saved landscape to {output_path}")
+        
+        if config['render'].get('web', False):
+            self.write_web_payload(config)
+        
+        return str(output_path)
+    
+    def get_web_payload_files(self, output_file: str) -> Tuple[str, str]:
+        """
+        Get the web payload filenames written next to an image.
+        
+        Args:
+            output_file: Image filename from render.output_file
+            
+        Returns:
+            Tuple of (metadata JSON filename, binary heights filename)
+        """
+        stem = Path(output_file).stem
+        return tuple(f"{stem}{suffix}" for suffix in WEB_SUFFIXES)
+    
+    def write_web_payload(self, config: dict) -> str:
+        """
+        Write the interactive viewer payload for a landscape.
+        
+        Only the surface is synthesized; nothing is plotted.
+        
+        Args:
+            config: Parsed YAML configuration
+            
+        Returns:
+            Path to the written metadata JSON
+        """
+        landscape_config = config.get('landscape', {})
+        render_config = config['render']
+        model = self.build_model(config)
+        landscape = self.generate_surface(model)
+        labels, actions = self.resolve_annotations(model, landscape)
+        
+        json_file, heights_file = self.get_web_payload_files(render_config['output_file'])
+        metadata, heights = landscape_web.build_web_payload(
+            landscape,
+            labels,
+            actions,
+            heights_file,
+            title=landscape_config.get('title', 'Moral Landscape'),
+            axes=landscape_config.get('axes', {}),
+            colormap=landscape_config.get('style', {}).get('colormap', 'viridis'),
+            view=self.get_view(render_config)
+        )
+        
+        self.images_dir.mkdir(exist_ok=True)
+        with open(self.images_dir / heights_file, 'wb') as f:
+            f.write(heights)
+        json_path = self.images_dir / json_file
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False, separators=(',', ':'))
+        print(f"Saved web payload to {json_path} ({len(heights) + json_path.stat().st_size} bytes)")
+        return str(json_path)
+    
+    def create_image_tag(self, image_path: str, alt_text: str) -> str:
+        """
+        Create a markdown image tag.
+        
+        Args:
+            image_path: Path to the image (relative to markdown file)
+            alt_text: Alt text for the image
+            
+        Returns:
+            Markdown image tag
+        """
+        # Use just the filename for the alt text identifier
+        return f"\n![{alt_text}]({image_path})\n"
+    
+    def has_image_tag(self, content: str, output_file: str, end_pos: int,
+                      details_start_pos: Optional[int]) -> bool:
+        """
+        Check whether a YAML block already has its image tag next to it.
+        
+        The tag is looked for in the 500 characters before the block's
+        <details> tag, or after the block when it has none.
+        
+        Args:
+            content: Markdown file content
+            output_file: The block's render.output_file (the tag's alt text)
+            end_pos: Position after the YAML block
+            details_start_pos: Position of the block's <details> tag, if any
+            
+        Returns:
+            True if the image tag exists
+        """
+        image_tag_pattern = rf'!\[{re.escape(output_file)}\]'
+        
+        # Determine search range for existing tag
+        if details_start_pos is not None:
+            search_start = max(0, details_start_pos - 500)
+            search_region = content[search_start:details_start_pos]
+        else:
+            search_region = content[end_pos:end_pos + 500]
+        
+        return re.search(image_tag_pattern, search_region) is not None
+    
+    def plan_file_renders(self, content: str) -> List[Tuple[str, dict, str]]:
+        """
+        List the YAML blocks in a markdown file whose images are out of date.
+        
+        Blocks that fail to parse are left out; process_file() reports them.
+        
+        Args:
+            content: Markdown file content
+            
+        Returns:
+            List of tuples: (output_file, config, yaml_content)
+        """
+        renders = []
+        for yaml_content, *_ in self.extract_yaml_blocks(content):
+            try:
+                config = self.parse_yaml_config(yaml_content)
+            except ValueError:
+                continue
+            if not config:
+                continue
+            output_file = config['render']['output_file']
+            if self.should_regenerate_image(yaml_content, output_file):
+                renders.append((output_file, config, yaml_content))
+        return renders
+    
+    def process_file(
+        self,
+        file_path: Path,
+        content: Optional[str] = None,
+        rendered_images: Optional[Dict[str, Optional[bytes]]] = None
+    ) -> bool:
+        """
+        Process a single markdown file.
+        
+        Args:
+            file_path: Path to the markdown file
+            content: File content if already read (default: read from file_path)
+            rendered_images: Pre-rendered image bytes keyed by output_file, as
+                produced by the asyncio pipeline. Stale blocks missing from it
+                are rendered here. None renders every stale block here.
+            
+        Returns:
+            True if file was modified, False otherwise
         """
         print(f"\nProcessing {file_path}...")
         
         # Read the file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        if content is None:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
         
-        original_content = content
+        new_content = self.update_landscape_tags(file_path, content, rendered_images)
         
+        # Write back if modified
+        if new_content != content:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(new_content)
+            print(f"  ✓ File updated")
+            return True
+        
+        return False
+    
+    def update_landscape_tags(
+        self,
+        file_path: Path,
+        content: str,
+        rendered_images: Optional[Dict[str, Optional[bytes]]] = None
+    ) -> str:
+        """
+        Render stale landscapes of a markdown file and add missing image tags, in memory.
+        
+        Images, web payloads and hash files are written; the markdown is not.
+        
+        Args:
+            file_path: Path to the markdown file (image tags are relative to it)
+            content: File content
+            rendered_images: Pre-rendered image bytes keyed by output_file (see process_file)
+            
+        Returns:
+            The content with any missing image tags inserted
+        """
         # Extract YAML blocks
         yaml_blocks = self.extract_yaml_blocks(content)
         
         if not yaml_blocks:
             print(f"  No YAML blocks found")
-            return False
+            return content
         
         print(f"  Found {len(yaml_blocks)} YAML block(s)")
         
         # Process blocks in reverse order to maintain positions
-        modified = False
         for block_idx, (yaml_content, start_pos, end_pos, details_start_pos, details_end_pos) in enumerate(reversed(yaml_blocks)):
             # Parse YAML
             try:
@@ -883,18 +1556,14 @@ class MoralLandscapeProcessor:
             
             if not needs_regeneration:
                 print(f"  ✓ Skipping {output_file} (YAML unchanged)")
-                # Still need to check if image tag exists
-                image_tag_pattern = rf'!\[{re.escape(output_file)}\]'
-                
-                # Determine search range for existing tag
-                if details_start_pos is not None:
-                    search_start = max(0, details_start_pos - 500)
-                    search_region = content[search_start:details_start_pos]
-                else:
-                    search_region = content[end_pos:end_pos + 500]
                 
+                # Write a missing web payload without re-rendering the image
+                if config['render'].get('web', False):
+                    json_file, _ = self.get_web_payload_files(output_file)
+                    if not (self.images_dir / json_file).exists():
+                        self.write_web_payload(config)
                 # If tag doesn't exist, add it without regenerating
-                if not re.search(image_tag_pattern, search_region):
+                if not self.has_image_tag(content, output_file, end_pos, details_start_pos):
                     image_path = self.images_dir / output_file
                     if image_path.exists():
                         rel_path = os.path.relpath(image_path, file_path.parent)
@@ -903,26 +1572,23 @@ class MoralLandscapeProcessor:
                         
                         insert_pos = details_start_pos if details_start_pos is not None else end_pos
                         content = content[:insert_pos] + image_tag + content[insert_pos:]
-                        modified = True
                         print(f"  ✓ Added missing image tag for {output_file}")
                 continue
             
             print(f"  Regenerating {output_file} (YAML changed)")
             
             # Check if image tag already exists
-            image_tag_pattern = rf'!\[{re.escape(output_file)}\]'
+            tag_exists = self.has_image_tag(content, output_file, end_pos, details_start_pos)
             
-            # Determine search range for existing tag
-            if details_start_pos is not None:
-                search_start = max(0, details_start_pos - 500)
-                search_region = content[search_start:details_start_pos]
+            # Generate the image (or write the one rendered ahead of time)
+            if rendered_images is not None and output_file in rendered_images:
+                image_data = rendered_images[output_file]
+                image_path = self.write_landscape_image(config, image_data) if image_data else None
             else:
-                search_region = content[end_pos:end_pos + 500]
-            
-            tag_exists = re.search(image_tag_pattern, search_region)
-            
-            # Generate the image
-            image_path = self.generate_landscape_image(config, yaml_content)
+                start = time.perf_counter()
+                image_path = self.generate_landscape_image(config, yaml_content)
+                if image_path:
+                    self.record_render_time(config, time.perf_counter() - start)
             
             if not image_path:
                 print(f"  Failed to generate image for {output_file}")
@@ -950,68 +1616,122 @@ class MoralLandscapeProcessor:
                 
                 # Insert the image tag
                 content = content[:insert_pos] + image_tag + content[insert_pos:]
-                modified = True
                 
                 print(f"  ✓ Generated: {image_path}")
                 print(f"  ✓ Added image tag at position {insert_pos}")
             else:
                 print(f"  ✓ Regenerated: {image_path}")
         
-        # Write back if modified
-        if modified:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
-            print(f"  ✓ File updated")
-            return True
-        
-        return False
+        return content
     
-    def cleanup_orphaned_images(self, referenced_images: Set[str]) -> int:
+    def find_orphaned_files(
+        self,
+        referenced_images: Set[str],
+        rendered_images: Set[str] = frozenset()
+    ) -> List[Tuple[Path, str]]:
         """
-        Delete images and hash files in the images directory that are not referenced by any markdown file.
+        List the files in the images directory that cleanup would delete.
+        
+        These are images and web payloads not referenced by any markdown
+        file ('image'), their hash files ('image-hash'), and hash files
+        left without an image ('hash').
         
         Args:
             referenced_images: Set of image filenames that are referenced
+            rendered_images: Image filenames that do not exist yet but will
+                be written before cleanup, so their hash files are kept
             
         Returns:
-            Number of files deleted (images + hash files)
+            List of (path, kind) in deletion order
         """
         if not self.images_dir.exists():
-            return 0
+            return []
         
-        deleted_count = 0
+        orphans = []
+        deleted: Set[Path] = set()
         
-        # Get all PNG files in the images directory
-        for image_file in self.images_dir.glob("*.png"):
+        # Get all rendered images and web payloads in the images directory
+        patterns = ["*.png", "*.svg", "*.gif", "*.webp"] + [f"*{suffix}" for suffix in WEB_SUFFIXES]
+        for image_file in [f for pattern in patterns for f in self.images_dir.glob(pattern)]:
             filename = image_file.name
             
             if filename not in referenced_images:
-                print(f"  Deleting orphaned image: {filename}")
-                image_file.unlink()
-                deleted_count += 1
+                orphans.append((image_file, 'image'))
+                deleted.add(image_file)
                 
                 # Also delete associated hash file
                 hash_file = self.get_hash_file_path(filename)
-                if hash_file.exists():
-                    hash_file.unlink()
-                    deleted_count += 1
+                if hash_file.exists() and hash_file not in deleted:
+                    orphans.append((hash_file, 'image-hash'))
+                    deleted.add(hash_file)
         
         # Clean up orphaned hash files (hash files without corresponding images)
         for hash_file in self.images_dir.glob("*.hash"):
+            if hash_file in deleted:
+                continue
             base_name = hash_file.stem
             # Check if there's a corresponding image file
             has_image = False
-            for ext in ['.png', '.jpg', '.jpeg', '.gif']:
-                if (self.images_dir / f"{base_name}{ext}").exists():
+            for ext in ['.png', '.svg', '.jpg', '.jpeg', '.gif', '.webp']:
+                image_file = self.images_dir / f"{base_name}{ext}"
+                if image_file.name in rendered_images or (image_file.exists() and image_file not in deleted):
                     has_image = True
                     break
             
             if not has_image:
-                print(f"  Deleting orphaned hash file: {hash_file.name}")
-                hash_file.unlink()
-                deleted_count += 1
+                orphans.append((hash_file, 'hash'))
         
-        return deleted_count
+        return orphans
+    
+    def cleanup_orphaned_images(self, referenced_images: Set[str]) -> int:
+        """
+        Delete images and hash files in the images directory that are not referenced by any markdown file.
+        
+        Args:
+            referenced_images: Set of image filenames that are referenced
+            
+        Returns:
+            Number of files deleted (images + hash files)
+        """
+        orphans = self.find_orphaned_files(referenced_images)
+        for path, kind in orphans:
+            if kind == 'image':
+                print(f"  Deleting orphaned image: {path.name}")
+            elif kind == 'hash':
+                print(f"  Deleting orphaned hash file: {path.name}")
+            path.unlink()
+        
+        return len(orphans)
+    
+    def collect_referenced_images(self, md_file: Path, content: str) -> Set[str]:
+        """
+        Collect the output files referenced by the YAML blocks of a markdown file.
+        
+        Args:
+            md_file: Path to the markdown file (used in messages)
+            content: Markdown file content
+            
+        Returns:
+            Set of referenced image filenames
+        """
+        referenced_images: Set[str] = set()
+        
+        yaml_blocks = self.extract_yaml_blocks(content)
+        for yaml_content, start_pos, *_ in yaml_blocks:
+            try:
+                config = self.parse_yaml_config(yaml_content)
+                if config and 'render' in config and 'output_file' in config['render']:
+                    referenced_images.add(config['render']['output_file'])
+                    if config['render'].get('web', False):
+                        referenced_images.update(self.get_web_payload_files(config['render']['output_file']))
+            except ValueError as e:
+                # Skip YAML blocks with validation errors (likely spec/documentation files)
+                lines_before = content[:start_pos].count('\n')
+                print(f"\n  Skipping YAML block in {md_file} at line {lines_before + 1}:")
+                print(f"    Reason: Contains type placeholders (documentation/spec file)")
+                continue
+        
+        return referenced_images
     
     def process_all(self, root_dir: str = ".") -> None:
         """
@@ -1036,27 +1756,428 @@ class MoralLandscapeProcessor:
             with open(md_file, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            yaml_blocks = self.extract_yaml_blocks(content)
-            for yaml_content, start_pos, *_ in yaml_blocks:
+            referenced_images |= self.collect_referenced_images(md_file, content)
+            
+            # Process the file
+            if self.process_file(md_file, content):
+                modified_count += 1
+        
+        self._finish_run(referenced_images, modified_count)
+    
+    def process_all_async(
+        self,
+        root_dir: str = ".",
+        jobs: Optional[int] = None,
+        max_in_flight: Optional[int] = None
+    ) -> None:
+        """
+        Process all markdown files, overlapping file I/O with parallel rendering.
+        
+        Markdown files are read concurrently, stale blocks are rendered in a
+        process pool, and each file's tags are written as soon as its renders
+        finish. The resulting markdown and images match process_all().
+        
+        Args:
+            root_dir: Root directory to search
+            jobs: Number of renderer processes (default: CPU count)
+            max_in_flight: Maximum renders submitted to the pool at once
+                (default: twice the number of jobs)
+        """
+        asyncio.run(self._process_all_async(root_dir, jobs, max_in_flight))
+    
+    async def _process_all_async(
+        self,
+        root_dir: str,
+        jobs: Optional[int],
+        max_in_flight: Optional[int]
+    ) -> None:
+        """Coroutine behind process_all_async()."""
+        md_files = self.find_markdown_files(root_dir)
+        
+        if not md_files:
+            print("No markdown files found")
+            return
+        
+        jobs = jobs or os.cpu_count() or 1
+        print(f"Found {len(md_files)} markdown file(s), rendering with {jobs} process(es)")
+        
+        loop = asyncio.get_running_loop()
+        in_flight = asyncio.Semaphore(max_in_flight or 2 * jobs)
+        
+        # Read all markdown files concurrently
+        contents = await asyncio.gather(*(
+            asyncio.to_thread(Path(md_file).read_text, encoding='utf-8')
+            for md_file in md_files
+        ))
+        
+        referenced_images: Set[str] = set()
+        for md_file, content in zip(md_files, contents):
+            referenced_images |= self.collect_referenced_images(md_file, content)
+        
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_render_worker,
+            initargs=(str(self.images_dir), self.render_mode, self.tile_memory,
+                      self.grid_dtype, self.grid_storage)
+        ) as pool:
+            async def render(yaml_content: str) -> Optional[bytes]:
+                # Backpressure: only max_in_flight renders are handed to the pool
+                async with in_flight:
+                    return await loop.run_in_executor(pool, _render_worker, yaml_content)
+            
+            async def update_file(md_file, content, render_tasks, earlier_writers) -> bool:
+                rendered_images: Dict[str, Optional[bytes]] = {}
+                for output_file, task in render_tasks:
+                    image_data = await task
+                    # With duplicate output files the first block wins, as in a serial run
+                    rendered_images.setdefault(output_file, image_data)
+                
+                # Images shared with earlier files are written after them, as in a serial run
+                for task in earlier_writers:
+                    await task
+                
+                return self.process_file(md_file, content, rendered_images)
+            
+            file_tasks = []
+            last_writer: Dict[str, asyncio.Task] = {}
+            for md_file, content in zip(md_files, contents):
+                render_tasks = [
+                    (output_file, asyncio.ensure_future(render(yaml_content)))
+                    for output_file, _, yaml_content in self.plan_file_renders(content)
+                ]
+                earlier_writers = {last_writer[output_file] for output_file, _ in render_tasks
+                                   if output_file in last_writer}
+                
+                task = asyncio.ensure_future(
+                    update_file(md_file, content, render_tasks, earlier_writers)
+                )
+                for output_file, _ in render_tasks:
+                    last_writer[output_file] = task
+                file_tasks.append(task)
+            
+            modified = await asyncio.gather(*file_tasks)
+        
+        self._finish_run(referenced_images, sum(modified))
+    
+    def get_shard_dir(self, shard_root: str, shard: int, shards: int) -> Path:
+        """
+        Get the directory holding the output of one shard.
+        
+        Args:
+            shard_root: Directory holding all shard outputs
+            shard: Shard number (1-based)
+            shards: Number of shards
+            
+        Returns:
+            Path of the shard's directory
+        """
+        return Path(shard_root) / f"shard-{shard}-of-{shards}"
+    
+    def render_shard(self, root_dir: str = ".", shard: int = 1, shards: int = 1,
+                     shard_root: str = DEFAULT_SHARD_DIR) -> None:
+        """
+        Render the stale blocks assigned to one shard into shard-local output.
+        
+        Blocks are assigned by shard_of(output_file). Images go to the shard's
+        directory under the digest of their YAML, listed in a manifest;
+        nothing in the markdown files or the images directory is touched.
+        Run merge_shards() once every shard has finished.
+        
+        Args:
+            root_dir: Root directory to search
+            shard: Shard number (1-based)
+            shards: Number of shards
+            shard_root: Directory holding all shard outputs
+        """
+        out_dir = self.get_shard_dir(shard_root, shard, shards)
+        if out_dir.exists():
+            shutil.rmtree(out_dir)
+        out_dir.mkdir(parents=True)
+        
+        md_files = self.find_markdown_files(root_dir)
+        print(f"Found {len(md_files)} markdown file(s), rendering shard {shard}/{shards}")
+        
+        renders = []
+        seen: Set[str] = set()
+        start = time.perf_counter()
+        for md_file in md_files:
+            with open(md_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            for output_file, config, yaml_content in self.plan_file_renders(content):
+                yaml_hash = self.calculate_yaml_hash(yaml_content)
+                if shard_of(output_file, shards) != shard or yaml_hash in seen:
+                    continue
+                seen.add(yaml_hash)
+                
+                print(f"  Rendering {output_file} from {md_file}")
+                image_data = self.render_landscape_image(config)
+                entry = {'output_file': output_file, 'yaml_hash': yaml_hash,
+                         'source': Path(md_file).as_posix(), 'file': None, 'sha256': None}
+                if image_data is not None:
+                    entry['file'] = yaml_hash + Path(output_file).suffix
+                    entry['sha256'] = hashlib.sha256(image_data).hexdigest()
+                    with open(out_dir / entry['file'], 'wb') as f:
+                        f.write(image_data)
+                else:
+                    print(f"  Failed to render {output_file}")
+                renders.append(entry)
+        
+        manifest = {'version': SHARD_FORMAT_VERSION, 'shard': shard, 'shards': shards, 'renders': renders}
+        with open(out_dir / SHARD_MANIFEST, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        
+        print(f"\nShard {shard}/{shards}: rendered {len(renders)} block(s) in "
+              f"{time.perf_counter() - start:.1f}s into {out_dir}")
+    
+    def load_shard_renders(self, shard_root: str = DEFAULT_SHARD_DIR) -> Dict[str, Optional[Path]]:
+        """
+        Collect the renders of every shard, verifying their digests.
+        
+        Args:
+            shard_root: Directory holding all shard outputs
+            
+        Returns:
+            Dict mapping YAML hashes to rendered image files (None for
+            blocks whose render failed)
+            
+        Raises:
+            ValueError: If manifests disagree on the shard count, use another
+                format version, or a rendered file is missing or corrupt
+        """
+        manifests = sorted(Path(shard_root).glob(f"shard-*/{SHARD_MANIFEST}"))
+        if not manifests:
+            raise ValueError(f"No shard manifests found in {shard_root}")
+        
+        renders: Dict[str, Optional[Path]] = {}
+        found: Set[int] = set()
+        shard_count = None
+        for manifest_path in manifests:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != SHARD_FORMAT_VERSION:
+                raise ValueError(f"{manifest_path}: unsupported shard format {manifest.get('version')!r}")
+            if shard_count is None:
+                shard_count = manifest['shards']
+            elif manifest['shards'] != shard_count:
+                raise ValueError(f"{manifest_path}: written for {manifest['shards']} shards, expected {shard_count}")
+            found.add(manifest['shard'])
+            
+            for entry in manifest['renders']:
+                if entry['file'] is None:
+                    renders[entry['yaml_hash']] = None
+                    continue
+                image_path = manifest_path.parent / entry['file']
+                try:
+                    digest = hashlib.sha256(image_path.read_bytes()).hexdigest()
+                except OSError as e:
+                    raise ValueError(f"{manifest_path}: cannot read {entry['file']}: {e}")
+                if digest != entry['sha256']:
+                    raise ValueError(f"{manifest_path}: {entry['file']} does not match its digest")
+                renders[entry['yaml_hash']] = image_path
+        
+        missing = sorted(set(range(1, shard_count + 1)) - found)
+        if missing:
+            print(f"Warning: no output from shard(s) {missing} of {shard_count}; their blocks are rendered here")
+        print(f"Loaded {len(renders)} render(s) from {len(found)} shard(s)")
+        return renders
+    
+    def shard_rendered_images(
+        self,
+        content: str,
+        shard_renders: Dict[str, Optional[Path]]
+    ) -> Dict[str, Optional[bytes]]:
+        """
+        Look up the shard renders of a markdown file's stale blocks.
+        
+        Args:
+            content: Markdown file content
+            shard_renders: Renders from load_shard_renders()
+            
+        Returns:
+            Image bytes keyed by output_file, for process_file(). Stale blocks
+            no shard rendered are left out, so process_file() renders them.
+        """
+        rendered_images: Dict[str, Optional[bytes]] = {}
+        for output_file, _, yaml_content in self.plan_file_renders(content):
+            yaml_hash = self.calculate_yaml_hash(yaml_content)
+            if yaml_hash not in shard_renders or output_file in rendered_images:
+                continue
+            image_path = shard_renders[yaml_hash]
+            rendered_images[output_file] = image_path.read_bytes() if image_path else None
+        return rendered_images
+    
+    def merge_shards(self, root_dir: str = ".", shard_root: str = DEFAULT_SHARD_DIR) -> None:
+        """
+        Combine shard outputs and update the markdown files, like process_all().
+        
+        Files are processed in the same order as process_all(), taking each
+        stale block's image from the shards instead of rendering it.
+        
+        Args:
+            root_dir: Root directory to search
+            shard_root: Directory holding all shard outputs
+        """
+        shard_renders = self.load_shard_renders(shard_root)
+        md_files = self.find_markdown_files(root_dir)
+        
+        if not md_files:
+            print("No markdown files found")
+            return
+        
+        print(f"Found {len(md_files)} markdown file(s)")
+        
+        modified_count = 0
+        referenced_images: Set[str] = set()
+        
+        for md_file in md_files:
+            with open(md_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            referenced_images |= self.collect_referenced_images(md_file, content)
+            
+            rendered_images = self.shard_rendered_images(content, shard_renders)
+            if self.process_file(md_file, content, rendered_images):
+                modified_count += 1
+        
+        self._finish_run(referenced_images, modified_count)
+    
+    def get_rendered_files(self, output_file: str) -> List[str]:
+        """
+        List the files in the images directory that belong to one output file.
+        
+        Args:
+            output_file: Name of the output image file
+            
+        Returns:
+            The image and any web payload files that exist
+        """
+        names = [output_file, *self.get_web_payload_files(output_file)]
+        return [name for name in names if (self.images_dir / name).is_file()]
+    
+    def export_cache(self, archive_path: str, root_dir: str = ".") -> None:
+        """
+        Pack the current renders of every block into a portable archive.
+        
+        Each block whose image is up to date with its YAML hash is exported
+        with its image and web payload; see render_cache for the format.
+        
+        Args:
+            archive_path: Archive file to create
+            root_dir: Root directory to search
+        """
+        entries = []
+        files: Dict[str, bytes] = {}
+        exported: Set[str] = set()
+        for md_file in self.find_markdown_files(root_dir):
+            with open(md_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            for yaml_content, *_ in self.extract_yaml_blocks(content):
                 try:
                     config = self.parse_yaml_config(yaml_content)
-                    if config and 'render' in config and 'output_file' in config['render']:
-                        referenced_images.add(config['render']['output_file'])
-                except ValueError as e:
-                    # Skip YAML blocks with validation errors (likely spec/documentation files)
-                    lines_before = content[:start_pos].count('\n')
-                    print(f"\n  Skipping YAML block in {md_file} at line {lines_before + 1}:")
-                    print(f"    Reason: Contains type placeholders (documentation/spec file)")
+                except ValueError:
+                    continue
+                if not config:
+                    continue
+                output_file = config['render']['output_file']
+                if output_file in exported or self.should_regenerate_image(yaml_content, output_file):
                     continue
+                exported.add(output_file)
+                
+                entry_files = {}
+                for name in self.get_rendered_files(output_file):
+                    data = (self.images_dir / name).read_bytes()
+                    digest = hashlib.sha256(data).hexdigest()
+                    files[digest] = data
+                    entry_files[name] = digest
+                entries.append({
+                    'output_file': output_file,
+                    'yaml_hash': self.calculate_yaml_hash(yaml_content),
+                    'files': entry_files
+                })
+        
+        size = render_cache.write_archive(archive_path, entries, files, render_cache.renderer_version())
+        print(f"Exported {len(entries)} render(s), {len(files)} file(s) to {archive_path} ({size / 1e6:.2f} MB)")
+    
+    def import_cache(self, archive_path: str, root_dir: str = ".", force: bool = False) -> int:
+        """
+        Hydrate the images directory from an archive written by export_cache().
+        
+        Only renders whose output file and YAML hash match a block in the
+        markdown files are written, with their hash files, so the next run
+        skips those blocks instead of rendering them.
+        
+        Args:
+            archive_path: Archive file to read
+            root_dir: Root directory to search
+            force: Import even if the archive was made by another renderer version
             
-            # Process the file
-            if self.process_file(md_file):
-                modified_count += 1
+        Returns:
+            Number of renders imported
+            
+        Raises:
+            ValueError: If the archive is invalid or, without force, comes
+                from another renderer version
+        """
+        manifest, files = render_cache.read_archive(archive_path)
+        if manifest['renderer_version'] != render_cache.renderer_version():
+            if not force:
+                raise ValueError(f"{archive_path} was made by another renderer version; "
+                                 f"use --force to import it anyway")
+            print("Warning: importing renders made by another renderer version")
+        
+        # YAML hashes of the blocks as they are now, keyed by output file
+        wanted: Dict[str, Set[str]] = {}
+        for md_file in self.find_markdown_files(root_dir):
+            with open(md_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            for yaml_content, *_ in self.extract_yaml_blocks(content):
+                try:
+                    config = self.parse_yaml_config(yaml_content)
+                except ValueError:
+                    continue
+                if config:
+                    wanted.setdefault(config['render']['output_file'], set()).add(
+                        self.calculate_yaml_hash(yaml_content))
+        
+        imported = stale = current = 0
+        for entry in manifest['entries']:
+            output_file = entry['output_file']
+            if entry['yaml_hash'] not in wanted.get(output_file, ()):
+                stale += 1
+                continue
+            
+            hash_file = self.get_hash_file_path(output_file)
+            up_to_date = hash_file.exists() and hash_file.read_text(encoding='utf-8').strip() == entry['yaml_hash']
+            if up_to_date and all((self.images_dir / name).is_file() for name in entry['files']):
+                current += 1
+                continue
+            
+            self.images_dir.mkdir(exist_ok=True)
+            for name, digest in entry['files'].items():
+                with open(self.images_dir / name, 'wb') as f:
+                    f.write(files[digest])
+            with open(hash_file, 'w', encoding='utf-8') as f:
+                f.write(entry['yaml_hash'])
+            print(f"  Imported {output_file}")
+            imported += 1
+        
+        print(f"Imported {imported} render(s) from {archive_path}; "
+              f"{current} already up to date, {stale} no longer used")
+        return imported
+    
+    def _finish_run(self, referenced_images: Set[str], modified_count: int) -> None:
+        """
+        Delete orphaned images and print the run summary.
         
+        Args:
+            referenced_images: Image filenames referenced by any markdown file
+            modified_count: Number of markdown files modified in this run
+        """
         # Cleanup orphaned images
         print(f"\n{'='*50}")
         print("Checking for orphaned images...")
         deleted_count = self.cleanup_orphaned_images(referenced_images)
+        self.save_render_timings()
         
         if deleted_count > 0:
             print(f"Deleted {deleted_count} orphaned image(s)")
@@ -1067,6 +2188,195 @@ class MoralLandscapeProcessor:
         print(f"Processing complete!")
         print(f"Modified {modified_count} file(s)")
         print(f"{'='*50}")
+    
+    def plan_all(self, root_dir: str = ".") -> dict:
+        """
+        Work out what a run would do, without rendering or writing anything.
+        
+        Blocks are checked the way update_landscape_tags() checks them,
+        including hashes a run would save before reaching a later block
+        with the same output file. The renderer is not imported.
+        
+        Args:
+            root_dir: Root directory to search
+            
+        Returns:
+            Dict with the 'renders' (each with its estimated 'seconds'),
+            'missing_tags', 'web_payloads', 'orphans' and 'invalid_blocks'
+            of the run, the total estimated 'seconds' and the 'calibration'
+        """
+        scale, samples = self.get_cost_calibration()
+        plan = {'renders': [], 'missing_tags': [], 'web_payloads': [], 'orphans': [], 'invalid_blocks': []}
+        
+        referenced_images: Set[str] = set()
+        saved_hashes: Dict[str, str] = {}
+        written_payloads: Set[str] = set()
+        for md_file in self.find_markdown_files(root_dir):
+            with open(md_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            # Blocks are visited in reverse, as update_landscape_tags() does
+            for yaml_content, start_pos, end_pos, details_start_pos, _ in reversed(self.extract_yaml_blocks(content)):
+                lines_before = content[:start_pos].count('\n')
+                source = f"{md_file.as_posix()}:{lines_before + 1}"
+                try:
+                    config = self.parse_yaml_config(yaml_content)
+                except ValueError:
+                    plan['invalid_blocks'].append(source)
+                    continue
+                if not config:
+                    continue
+                
+                render_config = config['render']
+                output_file = render_config['output_file']
+                web = render_config.get('web', False)
+                referenced_images.add(output_file)
+                if web:
+                    referenced_images.update(self.get_web_payload_files(output_file))
+                
+                current_hash = self.calculate_yaml_hash(yaml_content)
+                stored_hash = saved_hashes[output_file] if output_file in saved_hashes else self.get_stored_hash(output_file)
+                tag_exists = self.has_image_tag(content, output_file, end_pos, details_start_pos)
+                
+                if stored_hash == current_hash:
+                    json_file, _ = self.get_web_payload_files(output_file)
+                    if web and output_file not in written_payloads and not (self.images_dir / json_file).exists():
+                        plan['web_payloads'].append({'output_file': output_file, 'source': source})
+                        written_payloads.add(output_file)
+                    if not tag_exists and (output_file in saved_hashes or (self.images_dir / output_file).exists()):
+                        plan['missing_tags'].append({'output_file': output_file, 'source': source})
+                    continue
+                
+                plan['renders'].append({
+                    'output_file': output_file,
+                    'source': source,
+                    'reason': 'new' if stored_hash is None else 'changed',
+                    'mode': self.get_plot_mode(render_config),
+                    'resolution': config.get('landscape', {}).get('resolution', 100),
+                    'dpi': render_config['animation'].get('dpi', 80) if 'animation' in render_config
+                           else self.get_render_dpi(render_config),
+                    'frames': len(self.get_animation_views(render_config)) if 'animation' in render_config else 1,
+                    'seconds': round(scale * self.estimate_render_cost(config), 3)
+                })
+                saved_hashes[output_file] = current_hash
+                if web:
+                    written_payloads.add(output_file)
+                if not tag_exists:
+                    plan['missing_tags'].append({'output_file': output_file, 'source': source})
+        
+        plan['orphans'] = [
+            {'file': path.name, 'kind': kind}
+            for path, kind in self.find_orphaned_files(referenced_images, set(saved_hashes))
+        ]
+        plan['seconds'] = round(sum(render['seconds'] for render in plan['renders']), 3)
+        plan['calibration'] = {'scale': round(scale, 4), 'samples': samples}
+        return plan
+    
+    def format_plan(self, plan: dict) -> str:
+        """
+        Format a plan from plan_all() as a readable report.
+        
+        Args:
+            plan: Plan returned by plan_all()
+            
+        Returns:
+            The report text
+        """
+        lines = [f"Plan: {len(plan['renders'])} render(s), {len(plan['missing_tags'])} missing image tag(s), "
+                 f"{len(plan['web_payloads'])} web payload(s), {len(plan['orphans'])} orphaned file(s)"]
+        
+        if plan['renders']:
+            lines.append("\nStale blocks to render:")
+            for render in plan['renders']:
+                frames = f", {render['frames']} frames" if render['frames'] > 1 else ""
+                lines.append(f"  {render['seconds']:7.2f}s  {render['output_file']} ({render['reason']}; "
+                             f"{render['mode']}, resolution {render['resolution']}, {render['dpi']} dpi{frames})"
+                             f"  {render['source']}")
+        for key, title in (('missing_tags', 'Image tags to add'), ('web_payloads', 'Web payloads to write')):
+            if plan[key]:
+                lines.append(f"\n{title}:")
+                lines.extend(f"  {item['output_file']}  {item['source']}" for item in plan[key])
+        if plan['orphans']:
+            lines.append("\nOrphaned files to delete:")
+            lines.extend(f"  {orphan['file']} ({orphan['kind']})" for orphan in plan['orphans'])
+        if plan['invalid_blocks']:
+            lines.append("\nInvalid blocks that would be skipped:")
+            lines.extend(f"  {source}" for source in plan['invalid_blocks'])
+        
+        calibration = plan['calibration']
+        if calibration['samples']:
+            basis = f"calibrated x{calibration['scale']:.2f} from {calibration['samples']} recorded render(s)"
+        else:
+            basis = "uncalibrated, no recorded renders"
+        lines.append(f"\nEstimated render time: {plan['seconds']:.1f}s ({basis})")
+        return "\n".join(lines) + "\n"
+    
+    def analyze_file(self, md_file: Path, content: str) -> List[dict]:
+        """
+        Analyze the generated surface of every landscape block in a markdown file.
+        
+        Only the surface is synthesized; nothing is plotted or written.
+        
+        Args:
+            md_file: Path to the markdown file (recorded as the report source)
+            content: Markdown file content
+            
+        Returns:
+            List of reports with 'source', 'output_file' and 'analysis' keys
+        """
+        reports = []
+        for yaml_content, start_pos, *_ in self.extract_yaml_blocks(content):
+            try:
+                config = self.parse_yaml_config(yaml_content)
+            except ValueError:
+                continue
+            if not config:
+                continue
+            
+            model = self.build_model(config)
+            declared = [
+                {'kind': FEATURE_KINDS[kind], 'label': feature.label, 'x': x, 'y': y, 'z': z}
+                for (x, y), z, kind, feature in zip(model.centres.tolist(), model.amplitudes.tolist(),
+                                                    model.kinds.tolist(), model.features)
+            ]
+            
+            # Reported heights keep full precision whatever images are drawn with
+            landscape = self.generate_surface(model, dtype='float64')
+            lines_before = content[:start_pos].count('\n')
+            reports.append({
+                'source': f"{md_file}:{lines_before + 1}",
+                'output_file': config['render']['output_file'],
+                'analysis': landscape_analysis.analyze_landscape(landscape, declared)
+            })
+        return reports
+    
+    def analyze_all(self, root_dir: str = ".", output_format: str = 'json', output_path: Optional[str] = None) -> None:
+        """
+        Analyze every landscape block and export extrema, basins and saddles.
+        
+        Args:
+            root_dir: Root directory to search
+            output_format: 'json' or 'csv'
+            output_path: File to write the report to (default: stdout)
+        """
+        _import_renderer()
+        reports = []
+        for md_file in self.find_markdown_files(root_dir):
+            with open(md_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+            reports.extend(self.analyze_file(md_file, content))
+        
+        if output_format == 'csv':
+            report = landscape_analysis.to_csv(reports)
+        else:
+            report = landscape_analysis.to_json(reports)
+        
+        if output_path is None:
+            sys.stdout.write(report)
+            return
+        with open(output_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(report)
+        print(f"Analyzed {len(reports)} landscape(s), report written to {output_path}")
 
 
 class MoralLandscapeEditor:
@@ -1079,6 +2389,7 @@ class MoralLandscapeEditor:
         Args:
             processor: MoralLandscapeProcessor instance for reusing functionality
         """
+        _import_gui()
         self.processor = processor
         self.root = tk.Tk()
         self.root.title("Moral Landscape Editor")
@@ -1089,7 +2400,7 @@ class MoralLandscapeEditor:
         self.yaml_blocks: List[Tuple[str, int, int, Optional[int], Optional[int]]] = []
         self.current_block_index: int = -1
         self.debounce_timer: Optional[threading.Timer] = None
-        self.preview_image_path: Optional[str] = None
+        self.preview_image: Optional[bytes] = None
         
         self._setup_ui()
         self._setup_close_handler()
@@ -1266,24 +2577,24 @@ class MoralLandscapeEditor:
             self.root.after(0, lambda: self._show_preview_error("Invalid YAML configuration"))
             return
         
-        # Generate preview image
+        # Render preview image in memory (previews must not overwrite images/)
         try:
-            image_path = self.processor.generate_landscape_image(config)
+            image_data = self.processor.render_preview_image(config)
             
-            if image_path:
-                self.preview_image_path = image_path
-                self.root.after(0, lambda: self._display_preview(image_path))
+            if image_data:
+                self.preview_image = image_data
+                self.root.after(0, lambda: self._display_preview(image_data))
             else:
                 self.root.after(0, lambda: self._show_preview_error("Failed to generate image"))
                 
         except Exception as e:
             self.root.after(0, lambda: self._show_preview_error(f"Error: {str(e)}"))
             
-    def _display_preview(self, image_path: str):
+    def _display_preview(self, image_data: bytes):
         """Display the preview image on the canvas."""
         try:
             # Load image
-            img = Image.open(image_path)
+            img = Image.open(io.BytesIO(image_data))
             
             # Resize if too large (keep aspect ratio)
             max_width = 800
@@ -1393,6 +2704,241 @@ class MoralLandscapeEditor:
         self.root.mainloop()
 
 
+# Per-process processor used by render pool workers (see _init_render_worker)
+_worker_processor: Optional[MoralLandscapeProcessor] = None
+
+# Small landscape rendered once per worker to pay import and font-cache costs up front
+_WARMUP_YAML = """
+landscape:
+  resolution: 10
+peaks:
+  - coords: [0, 0, 1]
+    label: "Warm-up"
+render:
+  output_file: "warmup.png"
+  dpi: 72
+  view:
+    elevation: 25
+    azimuth: 45
+"""
+
+
+def _init_render_worker(images_dir: str, render_mode: Optional[str] = None,
+                        tile_memory: int = TILE_MEMORY_BUDGET, grid_dtype: str = 'float32',
+                        grid_storage: str = 'memory') -> None:
+    """Initialize a render pool worker and warm up matplotlib."""
+    global _worker_processor
+    _worker_processor = MoralLandscapeProcessor(images_dir=images_dir)
+    _worker_processor.render_mode = render_mode
+    _worker_processor.tile_memory = tile_memory
+    _worker_processor.grid_dtype = grid_dtype
+    _worker_processor.grid_storage = grid_storage
+    _worker_processor.render_landscape_image(yaml.safe_load(_WARMUP_YAML))
+
+
+def _render_worker(yaml_content: str) -> Optional[bytes]:
+    """Render a validated YAML configuration inside a pool worker."""
+    config = _worker_processor.parse_yaml_config(yaml_content)
+    return _worker_processor.render_landscape_image(config)
+
+
+def _render_frames_worker(
+    images_dir: str,
+    config: dict,
+    views: List[Tuple[float, float]],
+    dpi: int
+) -> List[np.ndarray]:
+    """Build a landscape once and render a chunk of animation frames inside a pool worker."""
+    processor = MoralLandscapeProcessor(images_dir=images_dir)
+    return processor.build_landscape(config).render_frames(views, dpi)
+
+
+class MoralLandscapeRenderServer:
+    """Local HTTP service rendering moralgraph YAML to images with warm workers."""
+    
+    def __init__(
+        self,
+        processor: MoralLandscapeProcessor,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        workers: Optional[int] = None,
+        max_queue: int = 32,
+        cache_size: int = 128,
+        max_body: int = 1024 * 1024
+    ):
+        """
+        Initialize the render server.
+        
+        Args:
+            processor: MoralLandscapeProcessor instance for parsing and validation
+            host: Interface to bind to
+            port: TCP port to listen on
+            workers: Number of renderer processes (default: CPU count)
+            max_queue: Maximum renders queued or in progress before rejecting with 503
+            cache_size: Maximum number of rendered images kept in memory
+            max_body: Largest request body in bytes accepted before rejecting with 413
+        """
+        self.processor = processor
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self.max_body = max_body
+        
+        self.cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.queue_slots = threading.BoundedSemaphore(max_queue)
+        self.inflight: Dict[str, Future] = {}
+        self.stats = {'requests': 0, 'hits': 0, 'misses': 0, 'rejected': 0, 'errors': 0}
+        self.pool: Optional[ProcessPoolExecutor] = None
+    
+    def render(self, yaml_content: str) -> Tuple[int, str, bytes]:
+        """
+        Render a YAML configuration, using the digest-keyed cache when possible.
+        
+        Args:
+            yaml_content: moralgraph YAML configuration
+            
+        Returns:
+            Tuple of (HTTP status, content type, response body)
+        """
+        # Malformed YAML can fail validation with any of these instead of a ValueError
+        try:
+            config = self.processor.parse_yaml_config(yaml_content)
+            if not config:
+                message = "Not a moralgraph configuration (render.output_file is required)"
+                return 400, 'text/plain; charset=utf-8', message.encode('utf-8')
+            content_type = mimetypes.guess_type(config['render']['output_file'])[0] or 'image/png'
+        except (ValueError, TypeError, KeyError, AttributeError, yaml.YAMLError) as e:
+            message = f"Invalid moralgraph configuration: {e}"
+            return 400, 'text/plain; charset=utf-8', message.encode('utf-8')
+        
+        digest = self.processor.calculate_yaml_hash(yaml_content)
+        
+        with self.cache_lock:
+            self.stats['requests'] += 1
+            if digest in self.cache:
+                self.cache.move_to_end(digest)
+                self.stats['hits'] += 1
+                return 200, content_type, self.cache[digest]
+            
+            # Identical requests already being rendered share one render
+            future = self.inflight.get(digest)
+            if future is None:
+                if not self.queue_slots.acquire(blocking=False):
+                    self.stats['rejected'] += 1
+                    return 503, 'text/plain; charset=utf-8', b"Render queue is full"
+                self.stats['misses'] += 1
+                try:
+                    future = self.pool.submit(_render_worker, yaml_content)
+                except RuntimeError as e:
+                    # The pool is broken or shutting down
+                    self.queue_slots.release()
+                    self.stats['errors'] += 1
+                    print(f"Error rendering landscape: {e}")
+                    return 500, 'text/plain; charset=utf-8', b"Failed to render landscape"
+                future.add_done_callback(lambda f: self.queue_slots.release())
+                self.inflight[digest] = future
+        
+        try:
+            image_data = future.result()
+        except Exception as e:
+            image_data = None
+            print(f"Error rendering landscape: {e}")
+        
+        with self.cache_lock:
+            self.inflight.pop(digest, None)
+            if image_data is None:
+                self.stats['errors'] += 1
+                return 500, 'text/plain; charset=utf-8', b"Failed to render landscape"
+            self.cache[digest] = image_data
+            self.cache.move_to_end(digest)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        
+        return 200, content_type, image_data
+    
+    def _make_handler(self):
+        """Create the request handler class bound to this server."""
+        server = self
+        
+        class RenderRequestHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                except ValueError:
+                    self._reject(400, b"Content-Length must be an integer")
+                    return
+                if length < 0:
+                    self._reject(400, b"Content-Length must not be negative")
+                    return
+                if length == 0:
+                    self._reject(411, b"A moralgraph YAML body with a Content-Length is required")
+                    return
+                if length > server.max_body:
+                    self._reject(413, f"Request body is larger than {server.max_body} bytes".encode('utf-8'))
+                    return
+                
+                try:
+                    yaml_content = self.rfile.read(length).decode('utf-8')
+                except UnicodeDecodeError:
+                    self._respond(400, 'text/plain; charset=utf-8', b"Request body must be UTF-8 text")
+                    return
+                status, content_type, body = server.render(yaml_content)
+                self._respond(status, content_type, body)
+            
+            def _reject(self, status, message):
+                # The body was not read, so the connection cannot be reused
+                self.close_connection = True
+                self._respond(status, 'text/plain; charset=utf-8', message)
+            
+            def do_GET(self):
+                if self.path.rstrip('/') not in ('', '/health'):
+                    self._respond(404, 'text/plain; charset=utf-8', b"Not found")
+                    return
+                with server.cache_lock:
+                    health = dict(server.stats, cached=len(server.cache),
+                                  inflight=len(server.inflight), workers=server.workers)
+                self._respond(200, 'application/json', json.dumps(health).encode('utf-8'))
+            
+            def _respond(self, status, content_type, body):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                if status == 503:
+                    self.send_header('Retry-After', '1')
+                self.end_headers()
+                self.wfile.write(body)
+        
+        return RenderRequestHandler
+    
+    def run(self):
+        """Start the worker pool and serve requests until interrupted."""
+        print(f"Starting {self.workers} renderer process(es)...")
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_render_worker,
+            initargs=(str(self.processor.images_dir), self.processor.render_mode, self.processor.tile_memory,
+                      self.processor.grid_dtype, self.processor.grid_storage)
+        )
+        
+        # Start every worker now so the first requests do not pay for start-up
+        warmup = [self.pool.submit(os.getpid) for _ in range(self.workers)]
+        for future in warmup:
+            future.result()
+        
+        httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        print(f"Serving moral landscape renders on http://{self.host}:{self.port}/")
+        print("POST a moralgraph YAML body to render it; GET /health for statistics")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\nShutting down render server")
+        finally:
+            httpd.server_close()
+            self.pool.shutdown(cancel_futures=True)
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -1403,15 +2949,222 @@ def main():
         action='store_true',
         help='Launch interactive editor UI for editing YAML blocks'
     )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Render with this many processes using the asyncio pipeline (default: 1, serial)'
+    )
+    parser.add_argument(
+        '--max-in-flight',
+        type=int,
+        default=None,
+        help='Maximum renders queued in the pool with --jobs (default: twice --jobs)'
+    )
+    parser.add_argument(
+        '--frame-jobs',
+        type=int,
+        default=1,
+        help='Render animation frames with this many processes (default: 1, in-process)'
+    )
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='Run a local HTTP render service that turns POSTed YAML into images'
+    )
+    parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help='Interface for --serve to bind to (default: 127.0.0.1)'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=8765,
+        help='Port for --serve to listen on (default: 8765)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help='Number of renderer processes for --serve (default: CPU count)'
+    )
+    parser.add_argument(
+        '--max-queue',
+        type=int,
+        default=32,
+        help='Maximum queued renders for --serve before rejecting requests (default: 32)'
+    )
+    parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=128,
+        help='Number of rendered images --serve keeps in memory (default: 128)'
+    )
+    
+    parser.add_argument(
+        '--analyze',
+        action='store_true',
+        help='Report detected extrema, basin areas and saddle heights of every landscape without rendering'
+    )
+    parser.add_argument(
+        '--analysis-format',
+        choices=['json', 'csv'],
+        default='json',
+        help='Report format for --analyze (default: json)'
+    )
+    parser.add_argument(
+        '--analysis-output',
+        default=None,
+        help='File to write the --analyze report to (default: stdout)'
+    )
+    
+    parser.add_argument(
+        '--plan',
+        action='store_true',
+        help='Report the stale blocks, missing image tags and orphaned files of a run and its estimated '
+             'render time, without rendering or writing anything'
+    )
+    parser.add_argument(
+        '--plan-format',
+        choices=['text', 'json'],
+        default='text',
+        help='Report format for --plan (default: text)'
+    )
+    parser.add_argument(
+        '--max-cost',
+        type=float,
+        default=None,
+        metavar='SECONDS',
+        help='With --plan, exit with status 1 if the estimated render time exceeds this'
+    )
+    
+    parser.add_argument(
+        '--render-mode',
+        choices=list(PLOT_MODES),
+        default=None,
+        help="Force every still image to this plot mode, e.g. 'heatmap' for fast previews (default: each block's render.mode)"
+    )
+    
+    parser.add_argument(
+        '--tile-memory',
+        type=float,
+        default=TILE_MEMORY_BUDGET / 2 ** 20,
+        metavar='MB',
+        help='Render PNG images whose canvas would exceed this many MB in strips, '
+             f'streamed to the encoder (default: {TILE_MEMORY_BUDGET // 2 ** 20})'
+    )
+    parser.add_argument(
+        '--dtype',
+        choices=['float32', 'float64'],
+        default='float32',
+        help='Precision of the surface grid images are drawn from (default: float32; --analyze always uses float64)'
+    )
+    parser.add_argument(
+        '--memmap',
+        action='store_true',
+        help='Back surface grids with memory-mapped temporary files instead of RAM, for very high resolutions'
+    )
+    
+    parser.add_argument(
+        '--shard',
+        type=parse_shard,
+        default=None,
+        metavar='K/N',
+        help='Render only the stale blocks of shard K of N into --shard-dir, leaving markdown and images untouched'
+    )
+    parser.add_argument(
+        '--merge',
+        action='store_true',
+        help='Combine the shard outputs in --shard-dir and update markdown and images as a single run would'
+    )
+    parser.add_argument(
+        '--shard-dir',
+        default=DEFAULT_SHARD_DIR,
+        help=f'Directory for shard outputs (default: {DEFAULT_SHARD_DIR})'
+    )
+    
+    subparsers = parser.add_subparsers(dest='command')
+    cache_parser = subparsers.add_parser(
+        'cache',
+        help='Export or import an archive of rendered images, to start another checkout warm'
+    )
+    cache_parser.add_argument('action', choices=['export', 'import'])
+    cache_parser.add_argument(
+        'archive',
+        nargs='?',
+        default='render-cache.tar.gz',
+        help='Archive file (default: render-cache.tar.gz)'
+    )
+    cache_parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Import renders made by another renderer version'
+    )
     
     args = parser.parse_args()
+    if args.shard and args.merge:
+        parser.error('--shard and --merge cannot be combined')
     
     processor = MoralLandscapeProcessor(images_dir="images")
+    processor.frame_jobs = args.frame_jobs
+    processor.render_mode = args.render_mode
+    processor.tile_memory = int(args.tile_memory * 2 ** 20)
+    processor.grid_dtype = args.dtype
+    processor.grid_storage = 'memmap' if args.memmap else 'memory'
     
-    if args.editor:
+    if args.command == 'cache':
+        # Move renders between checkouts
+        try:
+            if args.action == 'export':
+                processor.export_cache(args.archive)
+            else:
+                processor.import_cache(args.archive, force=args.force)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    elif args.plan:
+        # Report what a run would do without doing it
+        plan = processor.plan_all(".")
+        if args.plan_format == 'json':
+            sys.stdout.write(json.dumps(plan, indent=2) + "\n")
+        else:
+            sys.stdout.write(processor.format_plan(plan))
+        if args.max_cost is not None and plan['seconds'] > args.max_cost:
+            print(f"Estimated render time {plan['seconds']:.1f}s exceeds --max-cost {args.max_cost:g}s",
+                  file=sys.stderr)
+            sys.exit(1)
+    elif args.editor:
         # Launch editor UI
         editor = MoralLandscapeEditor(processor)
         editor.run()
+    elif args.shard:
+        # Render one shard of the stale blocks
+        processor.render_shard(".", *args.shard, shard_root=args.shard_dir)
+    elif args.merge:
+        # Apply the renders of every shard
+        try:
+            processor.merge_shards(".", shard_root=args.shard_dir)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    elif args.analyze:
+        # Export surface metrics without rendering
+        processor.analyze_all(".", output_format=args.analysis_format, output_path=args.analysis_output)
+    elif args.serve:
+        # Run local render service
+        server = MoralLandscapeRenderServer(
+            processor,
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            max_queue=args.max_queue,
+            cache_size=args.cache_size
+        )
+        server.run()
+    elif args.jobs > 1:
+        # Run batch processing with parallel renders
+        processor.process_all_async(".", jobs=args.jobs, max_in_flight=args.max_in_flight)
     else:
         # Run batch processing
         processor.process_all(".")
@@ -0,0 +1,158 @@
+"""
+Portable archives of rendered landscapes.
+
+An archive is a gzip-compressed tar holding a manifest.json and the rendered
+files stored once each under objects/<sha256>. The manifest lists, for each
+output file, the hash of the YAML it was rendered from and the digests of
+its files (the image and any web payload), together with the renderer
+version. Renders only carry over between checkouts with the same renderer
+version, since another version may draw the same YAML differently.
+
+The images are already compressed, so gzip is used rather than xz: the
+archive is a few percent larger but packs and unpacks about ten times
+faster.
+"""
+
+import io
+import json
+import re
+import gzip
+import hashlib
+import tarfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+CACHE_FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+OBJECTS_DIR = 'objects'
+
+# Modules whose code decides what a render looks like
+RENDERER_MODULES = (
+    'moral_landscape_generator.py',
+    'landscape_options.py',
+    'landscape_config.py',
+    'landscape_noise.py',
+    'landscape_vector.py',
+    'landscape_png.py',
+    'landscape_web.py',
+    'array_cache.py',
+    'process_moral_landscapes.py',
+)
+
+# Digests stored as object names, and plain file names allowed in images/
+_SHA256 = re.compile(r'[0-9a-f]{64}')
+_FILE_NAME = re.compile(r'[^/\\]+')
+
+
+def renderer_version() -> str:
+    """
+    Identify the renderer: its source code and the libraries it draws with.
+    
+    Returns:
+        Hex digest over RENDERER_MODULES and the NumPy, Matplotlib and
+        Pillow versions
+    """
+    import numpy
+    import matplotlib
+    
+    try:
+        import PIL
+        pillow_version = PIL.__version__
+    except ImportError:
+        pillow_version = 'none'
+    
+    digest = hashlib.sha256()
+    module_dir = Path(__file__).parent
+    for name in RENDERER_MODULES:
+        digest.update(name.encode('utf-8') + b'\0')
+        digest.update((module_dir / name).read_bytes())
+    for library, version in [('numpy', numpy.__version__), ('matplotlib', matplotlib.__version__),
+                             ('pillow', pillow_version)]:
+        digest.update(f"{library}={version}\0".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def write_archive(archive_path: str, entries: List[dict], files: Dict[str, bytes], version: str) -> int:
+    """
+    Write a render archive.
+    
+    Args:
+        archive_path: Archive file to create
+        entries: Manifest entries with 'output_file', 'yaml_hash' and 'files'
+            (a dict mapping each file name to its sha256)
+        files: File contents keyed by sha256
+        version: Renderer version the files were rendered with
+    
+    Returns:
+        Size of the archive in bytes
+    """
+    manifest = {
+        'version': CACHE_FORMAT_VERSION,
+        'renderer_version': version,
+        'entries': entries
+    }
+    
+    def add(tar: tarfile.TarFile, name: str, data: bytes) -> None:
+        # Fixed metadata so the same renders always give the same archive
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mode = 0o644
+        tar.addfile(info, io.BytesIO(data))
+    
+    # No name or timestamp in the gzip header keeps the archive reproducible too
+    with open(archive_path, 'wb') as raw, gzip.GzipFile(filename='', fileobj=raw, mode='wb', mtime=0) as compressed:
+        with tarfile.open(fileobj=compressed, mode='w') as tar:
+            add(tar, MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+            for digest in sorted(files):
+                add(tar, f"{OBJECTS_DIR}/{digest}", files[digest])
+    return Path(archive_path).stat().st_size
+
+
+def read_archive(archive_path: str) -> Tuple[dict, Dict[str, bytes]]:
+    """
+    Read a render archive and verify every file against its digest.
+    
+    Members are read one by one; nothing is extracted to disk.
+    
+    Args:
+        archive_path: Archive file to read
+    
+    Returns:
+        Tuple of (manifest, file contents keyed by sha256)
+    
+    Raises:
+        ValueError: If the archive is malformed, uses another format
+            version, or a file does not match its digest
+    """
+    files: Dict[str, bytes] = {}
+    manifest = None
+    try:
+        with tarfile.open(archive_path, 'r:*') as tar:
+            for member in tar:
+                if not member.isfile():
+                    continue
+                data = tar.extractfile(member).read()
+                if member.name == MANIFEST_NAME:
+                    manifest = json.loads(data)
+                    continue
+                directory, _, digest = member.name.partition('/')
+                if directory != OBJECTS_DIR or not _SHA256.fullmatch(digest):
+                    raise ValueError(f"unexpected archive member {member.name!r}")
+                if hashlib.sha256(data).hexdigest() != digest:
+                    raise ValueError(f"{member.name} does not match its digest")
+                files[digest] = data
+    except (tarfile.TarError, OSError) as e:
+        raise ValueError(f"cannot read {archive_path}: {e}")
+    
+    if manifest is None:
+        raise ValueError(f"{archive_path} has no {MANIFEST_NAME}")
+    if manifest.get('version') != CACHE_FORMAT_VERSION:
+        raise ValueError(f"unsupported cache format {manifest.get('version')!r}")
+    
+    for entry in manifest['entries']:
+        for name, digest in entry['files'].items():
+            if not _FILE_NAME.fullmatch(name) or name in ('.', '..'):
+                raise ValueError(f"invalid file name {name!r} in {MANIFEST_NAME}")
+            if digest not in files:
+                raise ValueError(f"{name} is missing from the archive")
+    return manifest, files